@@ -1,31 +1,30 @@
 import requests
 from bs4 import BeautifulSoup
 import time
-import json
 import os
 import logging
-from typing import Dict, Optional, List
-from tqdm import tqdm
+from typing import Dict
 from fake_useragent import UserAgent
 import re
 
 from config import (
-    BIBLE_COM_BASE_URL, BIBLE_COM_VERSION_IDS, VERSION, REQUEST_TIMEOUT, 
-    REQUEST_DELAY, MAX_RETRIES, RETRY_BACKOFF, OUTPUT_FILE, LOG_FILE, ENCODING,
-    TOTAL_VERSES_EXPECTED
-)
-from books_data import BOOKS, BOOK_ORDER
-
-# Setup Logging
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    BIBLE_COM_BASE_URL, BIBLE_COM_VERSION_IDS, VERSION, REQUEST_TIMEOUT,
+    LOG_FILE, OUTPUT_MODE, ARCHIVE_RAW
 )
+from books_data import BOOKS
+from shard_store import write_json_atomic
+from crawl_pipeline import crawl_chapters
+from page_archive import ArchiveWriter
+from corpus import output_file_for
+from crawl_logging import setup_logging
 
 class BibleComCrawler:
-    def __init__(self):
+    def __init__(self, version: str = VERSION, archive: bool = ARCHIVE_RAW):
+        self.version = version
+        # Output, shards and the previous crawl used for validation all follow the crawled version
+        self.output_file = output_file_for("biblecom", version)
+        # Raw responses for offline re-parsing (main.py --reparse)
+        self.archive = ArchiveWriter.for_version("biblecom", version) if archive else None
         self.session = requests.Session()
         self.ua = UserAgent()
         self.results: Dict[str, str] = {}
@@ -41,34 +40,41 @@ class BibleComCrawler:
         """
         Fetches all verses for a given book and chapter from Bible.com
         Example URL: https://www.bible.com/bible/111/GEN.1.NIV
+        A single attempt: crawl_all retries failed chapters through its RetryQueue.
         """
-        version_id = BIBLE_COM_VERSION_IDS.get(VERSION)
-        if not version_id:
-            logging.error(f"Version ID for {VERSION} not found.")
+        try:
+            return self._request_chapter(book_abbr, chapter)
+        except Exception as e:
+            logging.error(f"Error fetching {book_abbr} {chapter}: {e}",
+                          extra={"version": self.version, "book": book_abbr, "chapter": chapter})
             return {}
 
+    def _log_fetch(self, book_abbr: str, chapter: int, status: int, start: float):
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        logging.info(f"Fetched {book_abbr} {chapter} in {latency_ms:.0f}ms",
+                     extra={"version": self.version, "book": book_abbr, "chapter": chapter,
+                            "status": status, "latency_ms": latency_ms})
+
+    def _request_chapter(self, book_abbr: str, chapter: int) -> Dict[str, str]:
+        """One request for a chapter; raises on network/HTTP errors."""
+        version_id = BIBLE_COM_VERSION_IDS.get(self.version)
+        if not version_id:
+            raise ValueError(f"Version ID for {self.version} not found.")
+
         book_url_abbr = BOOKS[book_abbr]['url_abbr'].upper()
-        url = f"{BIBLE_COM_BASE_URL}/{version_id}/{book_url_abbr}.{chapter}.{VERSION}"
+        url = f"{BIBLE_COM_BASE_URL}/{version_id}/{book_url_abbr}.{chapter}.{self.version}"
         
-        retries = 0
-        while retries <= MAX_RETRIES:
-            try:
-                response = self.session.get(
-                    url, 
-                    headers=self._get_headers(), 
-                    timeout=REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                return self._parse_verses(book_abbr, chapter, response.text)
-            except Exception as e:
-                retries += 1
-                wait_time = RETRY_BACKOFF ** retries
-                logging.error(f"Error fetching {book_abbr} {chapter}: {e}. Retry {retries}/{MAX_RETRIES} in {wait_time}s")
-                if retries > MAX_RETRIES:
-                    logging.critical(f"Failed to fetch {book_abbr} {chapter} after {MAX_RETRIES} retries.")
-                    return {}
-                time.sleep(wait_time)
-        return {}
+        start = time.perf_counter()
+        response = self.session.get(
+            url, 
+            headers=self._get_headers(), 
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        self._log_fetch(book_abbr, chapter, response.status_code, start)
+        if self.archive:
+            self.archive.write("biblecom", self.version, book_abbr, chapter, response.url, response.status_code, response.text)
+        return self._parse_verses(book_abbr, chapter, response.text)
 
     def _parse_verses(self, book_abbr: str, chapter: int, html_content: str) -> Dict[str, str]:
         """
@@ -118,26 +124,24 @@ class BibleComCrawler:
         return chapter_verses
 
     def crawl_all(self):
-        logging.info(f"Starting crawl for {VERSION} from Bible.com")
-        
-        with tqdm(total=TOTAL_VERSES_EXPECTED, desc=f"Progress {VERSION}") as pbar:
-            for book_abbr in BOOK_ORDER:
-                book_info = BOOKS[book_abbr]
-                for chapter in range(1, book_info['chapters'] + 1):
-                    chapter_data = self.fetch_chapter(book_abbr, chapter)
-                    if chapter_data:
-                        self.results.update(chapter_data)
-                        pbar.update(len(chapter_data))
-                    time.sleep(REQUEST_DELAY)
-                    
-        self.save_to_json()
+        # Records go through a queue to a background writer thread (first call wins)
+        setup_logging(LOG_FILE)
+        logging.info(f"Starting crawl for {self.version} from Bible.com")
+        self.results = crawl_chapters(self._request_chapter, self.output_file, desc=f"Progress {self.version}",
+                                      on_finished=self.close_archive)
+        if OUTPUT_MODE != "shards":
+            self.save_to_json()
+
+    def close_archive(self):
+        """Flushes and closes the raw page archive once no more pages will be fetched."""
+        if self.archive:
+            self.archive.close()
+            self.archive = None
 
     def save_to_json(self):
-        os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
         try:
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
-            print(f"\n💾 JSON saved: {OUTPUT_FILE}")
+            write_json_atomic(self.output_file, self.results)
+            print(f"\n💾 JSON saved: {self.output_file}")
             print(f"📊 Total verses: {len(self.results):,} items")
         except Exception as e:
             logging.error(f"Error saving JSON: {e}")
@@ -146,5 +150,6 @@ if __name__ == "__main__":
     # Test for Genesis 1 NIV
     import os
     os.environ["BIBLE_VERSION"] = "NIV"
+    setup_logging(LOG_FILE)
     crawler = BibleComCrawler()
     print(crawler.fetch_chapter("창", 1))
@@ -0,0 +1,148 @@
+"""
+Book name resolution over a character trie built once at import.
+
+Every abbr, name, english_name and url_abbr in books_data is inserted, plus
+common English abbreviations ("Gen", "1 Cor", "Matt"), alternative Korean
+names (공동번역 "탈출기", GoodTV's "눅") and chosung shortcuts of the Korean
+names ("ㅊㅅㄱ" -> 창세기) where they are unambiguous.
+
+Keys are case-folded with spaces and dots removed, and the same characters are
+skipped while walking, so "1 Cor.", "1cor" and "1 COR" all resolve to 고전.
+A lookup walks the trie once: O(length of the name).
+
+    resolve_book("1 Cor")               # "고전"
+    match_prefixes("요일 3:1")            # [(1, "요"), (2, "요일")]: every name starting at 0
+
+Parsing and free-text extraction of whole references live in verse_range.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from books_data import BOOKS
+from verse_keys import ABBR_ALIASES
+
+# Standard English abbreviations (SBL style and common short forms)
+ENGLISH_ALIASES: Dict[str, List[str]] = {
+    "창": ["Gen", "Gn"], "출": ["Ex", "Exod"], "레": ["Lev", "Lv"], "민": ["Num", "Nm"],
+    "신": ["Deut", "Dt"], "수": ["Josh"], "삿": ["Judg", "Jdg"], "룻": ["Rth"],
+    "삼상": ["1 Sam", "1 Sm", "I Samuel"], "삼하": ["2 Sam", "2 Sm", "II Samuel"],
+    "왕상": ["1 Kgs", "I Kings"], "왕하": ["2 Kgs", "II Kings"],
+    "대상": ["1 Chr", "1 Chron", "I Chronicles"], "대하": ["2 Chr", "2 Chron", "II Chronicles"],
+    "스": ["Ezr"], "느": ["Neh"], "에": ["Esth"], "욥": ["Jb"],
+    "시": ["Ps", "Psa", "Psalm", "Pss"], "잠": ["Prov", "Prv"], "전": ["Eccl", "Eccles", "Qoh"],
+    "아": ["Song", "Song of Solomon", "SOS", "Cant"], "사": ["Isa"], "렘": ["Jer"], "애": ["Lam"],
+    "겔": ["Ezek", "Ezk"], "단": ["Dn"], "호": ["Hos"], "욜": ["Jl"], "암": ["Amo"],
+    "옵": ["Obad", "Ob"], "욘": ["Jon"], "미": ["Mic"], "나": ["Nah"], "합": ["Hab"],
+    "습": ["Zeph"], "학": ["Hag"], "슥": ["Zech"], "말": ["Mal"],
+    "마": ["Matt", "Mt"], "막": ["Mk", "Mrk"], "누": ["Lk", "Luk"], "요": ["Jn", "Joh"],
+    "행": ["Act"], "롬": ["Rm"], "고전": ["1 Cor", "I Corinthians"], "고후": ["2 Cor", "II Corinthians"],
+    "갈": ["Gal"], "엡": ["Ephes"], "빌": ["Phil"], "골": ["Col"],
+    "살전": ["1 Thess", "1 Th", "I Thessalonians"], "살후": ["2 Thess", "2 Th", "II Thessalonians"],
+    "딤전": ["1 Tim", "I Timothy"], "딤후": ["2 Tim", "II Timothy"], "딛": ["Tit"],
+    "몬": ["Phlm", "Philem"], "히": ["Heb"], "약": ["Jas", "Jm"],
+    "벧전": ["1 Pet", "1 Pt", "I Peter"], "벧후": ["2 Pet", "2 Pt", "II Peter"],
+    "요일": ["1 Jn", "I John"], "요이": ["2 Jn", "II John"], "요삼": ["3 Jn", "III John"],
+    "유": ["Jd"], "계": ["Rev", "Rv", "Apocalypse"],
+}
+
+# Other Korean names in use (공동번역 titles, spelling variants)
+KOREAN_ALIASES: Dict[str, List[str]] = {
+    "출": ["탈출기"], "삿": ["판관기"], "단": ["다니엘"], "아": ["아가서"],
+    "요일": ["요한1서"], "요이": ["요한2서"], "요삼": ["요한3서"],
+}
+
+_END = ""  # terminal marker; never a character of a key
+_SKIPPED = " ."
+
+# Initial consonants (chosung) in Unicode order
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+def chosung(text: str) -> str:
+    """"창세기" -> "ㅊㅅㄱ"; characters that are not Hangul syllables are kept."""
+    return "".join(CHOSUNG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+
+def _normalize(name: str) -> str:
+    return "".join(ch for ch in name.casefold() if ch not in _SKIPPED)
+
+
+class BookTrie:
+    """Character trie of book names; each terminal node holds a books_data abbreviation."""
+
+    def __init__(self):
+        self.root: Dict = {}
+        self.size = 0
+
+    def add(self, name: str, abbr: str):
+        node = self.root
+        for ch in _normalize(name):
+            if ch not in node:
+                node[ch] = {}
+                self.size += 1
+            node = node[ch]
+        # The first spelling inserted wins, so canonical names shadow later aliases
+        node.setdefault(_END, abbr)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Whole-string lookup; None unless `name` is exactly a known spelling."""
+        node = self.root
+        for ch in name.casefold():
+            if ch in _SKIPPED:
+                continue
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def match_prefixes(self, text: str, start: int = 0) -> List[Tuple[int, str]]:
+        """(end, abbr) for every known name that starts at text[start], shortest first."""
+        matches = []
+        node = self.root
+        pos = start
+        while pos < len(text):
+            ch = text[pos].casefold()
+            if ch in _SKIPPED and pos > start:
+                pos += 1
+                continue
+            node = node.get(ch)
+            if node is None:
+                break
+            pos += 1
+            if _END in node:
+                matches.append((pos, node[_END]))
+        return matches
+
+
+def _build() -> BookTrie:
+    trie = BookTrie()
+    for abbr, info in BOOKS.items():
+        for name in (info['abbr'], info['name'], info['english_name'], info['url_abbr']):
+            trie.add(name, abbr)
+    for alias, abbr in ABBR_ALIASES.items():
+        trie.add(alias, abbr)
+    for aliases in (KOREAN_ALIASES, ENGLISH_ALIASES):
+        for abbr, names in aliases.items():
+            for name in names:
+                trie.add(name, abbr)
+
+    # Chosung of the full Korean name, only where no other book shares it
+    shortcuts: Dict[str, List[str]] = {}
+    for abbr, info in BOOKS.items():
+        shortcuts.setdefault(chosung(info['name']), []).append(abbr)
+    for shortcut, abbrs in shortcuts.items():
+        if len(abbrs) == 1:
+            trie.add(shortcut, abbrs[0])
+    return trie
+
+
+BOOK_TRIE = _build()
+
+
+def resolve_book(name: str) -> Optional[str]:
+    """Maps "창", "창세기", "Genesis", "gen", "1 Cor", "ㅊㅅㄱ", "눅" ... to the books_data abbreviation."""
+    return BOOK_TRIE.resolve(name.strip())
+
+
+def match_prefixes(text: str, start: int = 0) -> List[Tuple[int, str]]:
+    return BOOK_TRIE.match_prefixes(text, start)
@@ -0,0 +1,171 @@
+"""
+Per-chapter cost estimates for longest-processing-time-first (LPT) dispatch.
+
+Threaded crawls used to submit chapters in canonical order, so a heavy chapter
+near the end (e.g. 시119, 176 verses) could start last and stretch the run.
+Dispatching the most expensive chapters first bounds that tail by the cost of
+the *smallest* remaining chapter instead of the largest.
+
+Estimates come from, in order:
+    1. output/reports/chapter_costs.json: measured fetch seconds from previous runs (EWMA)
+    2. verse counts per chapter in an existing crawl output
+    3. nothing: tasks keep canonical order
+
+    python chapter_costs.py --bench     # offline makespan simulation, canonical vs LPT
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from books_data import BOOKS, BOOK_ORDER
+from config import OUTPUT_DIR
+from corpus import discover_outputs, load_version
+from shard_store import write_json_atomic
+from verse_keys import parse_key
+
+# Kept out of OUTPUT_DIR itself, where validate_all.py reads every *.json as a Bible
+COST_FILE = os.path.join(OUTPUT_DIR, "reports", "chapter_costs.json")
+LEGACY_COST_FILE = os.path.join(OUTPUT_DIR, "chapter_costs.json")
+EWMA_ALPHA = 0.3  # weight of the newest measurement
+
+# Versions crawl in parallel threads and each records its costs at the end
+_cost_file_lock = threading.Lock()
+
+
+def chapter_label(book_abbr: str, chapter: int) -> str:
+    return f"{book_abbr}{chapter}"
+
+
+def _largest_output(outputs: Dict[str, str]) -> str:
+    """Most complete previous crawl (by file size; shard directories count as 0)."""
+    return max(outputs.values(), key=lambda p: os.path.getsize(p) if os.path.isfile(p) else 0)
+
+
+def verse_counts_from_output(path: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for key in load_version(path):
+        parsed = parse_key(key)
+        if parsed:
+            label = chapter_label(parsed[0], parsed[1])
+            counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+def _move_legacy_cost_file(path: str):
+    """Earlier runs kept the cost file next to the Bible outputs; move it under reports/."""
+    if path == COST_FILE and os.path.exists(LEGACY_COST_FILE) and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(LEGACY_COST_FILE, path)
+
+
+def load_costs(path: str = COST_FILE, source: Optional[str] = None) -> Dict[str, float]:
+    """
+    Expected cost per chapter label. `source` selects a section of the cost file
+    (e.g. "goodtv"); without measurements, falls back to the largest crawl output's verse counts.
+    """
+    _move_legacy_cost_file(path)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            measured = json.load(f).get(source or "default", {})
+        if measured:
+            return {label: entry["seconds"] for label, entry in measured.items()}
+
+    outputs = discover_outputs()
+    if not outputs:
+        return {}
+    return {label: float(count) for label, count in verse_counts_from_output(_largest_output(outputs)).items()}
+
+
+def record_costs(seconds: Dict[str, float], path: str = COST_FILE, source: Optional[str] = None):
+    """Merges measured fetch seconds per chapter label into the cost file (EWMA)."""
+    with _cost_file_lock:
+        _move_legacy_cost_file(path)
+        data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        section = data.setdefault(source or "default", {})
+        for label, elapsed in seconds.items():
+            previous = section.get(label)
+            if previous:
+                elapsed = EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * previous["seconds"]
+            section[label] = {"seconds": round(elapsed, 4)}
+        write_json_atomic(path, data)
+
+
+def order_longest_first(tasks: Iterable[Hashable], cost: Callable[[Hashable], Optional[float]]) -> List[Hashable]:
+    """
+    Sorts tasks by descending expected cost. Tasks without an estimate get the median
+    known cost; ties keep their original (canonical) order.
+    """
+    tasks = list(tasks)
+    costs = [cost(task) for task in tasks]
+    known = sorted(c for c in costs if c is not None)
+    default = known[len(known) // 2] if known else 0.0
+    order = sorted(range(len(tasks)), key=lambda i: -(costs[i] if costs[i] is not None else default))
+    return [tasks[i] for i in order]
+
+
+def simulate_makespan(costs: List[float], workers: int) -> float:
+    """Wall-clock time of a FIFO thread pool processing `costs` in the given order."""
+    finish = [0.0] * workers
+    for cost in costs:
+        start = heapq.heappop(finish)
+        heapq.heappush(finish, start + cost)
+    return max(finish)
+
+
+def _synthetic_verse_counts(seed: int = 7) -> Dict[str, int]:
+    """Skewed verse counts with the known heavy chapters, when no crawl output is available."""
+    rng = random.Random(seed)
+    counts = {chapter_label(abbr, ch): max(5, int(rng.gauss(26, 9)))
+              for abbr in BOOK_ORDER for ch in range(1, BOOKS[abbr]['chapters'] + 1)}
+    heavy = [("시", 119, 176), ("민", 7, 89), ("대상", 6, 81), ("누", 1, 80), ("마", 26, 75), ("누", 22, 71), ("계", 22, 21)]
+    for abbr, chapter, verses in heavy:
+        counts[chapter_label(abbr, chapter)] = verses
+    return counts
+
+
+def run_benchmark(workers: int = 10, trials: int = 20, seed: int = 1):
+    outputs = discover_outputs()
+    counts = verse_counts_from_output(_largest_output(outputs)) if outputs else {}
+    if len(counts) < 1000:
+        counts = _synthetic_verse_counts()
+        print("Using synthetic verse counts (no full crawl output found).")
+
+    labels = [chapter_label(abbr, ch) for abbr in BOOK_ORDER for ch in range(1, BOOKS[abbr]['chapters'] + 1)]
+    rng = random.Random(seed)
+    canonical_total = lpt_total = 0.0
+    for _ in range(trials):
+        # Fetch latency model: fixed round trip + per-verse payload/parse time, with noise
+        true_cost = {label: rng.uniform(0.8, 1.2) * (0.15 + 0.01 * counts.get(label, 25)) for label in labels}
+        # Estimates come from a previous run with its own noise
+        estimate = {label: cost * rng.uniform(0.8, 1.2) for label, cost in true_cost.items()}
+        canonical_total += simulate_makespan([true_cost[l] for l in labels], workers)
+        lpt_total += simulate_makespan([true_cost[l] for l in order_longest_first(labels, estimate.get)], workers)
+
+    canonical, lpt = canonical_total / trials, lpt_total / trials
+    print(f"{len(labels)} chapters, {workers} workers, {trials} trials (simulated seconds per version)")
+    print(f"  canonical order : {canonical:8.2f}s")
+    print(f"  longest first   : {lpt:8.2f}s  ({(1 - lpt / canonical) * 100:.1f}% faster)")
+    print(f"  lower bound     : {sum(0.15 + 0.01 * counts.get(l, 25) for l in labels) / workers:8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chapter cost estimates for LPT scheduling")
+    parser.add_argument("--bench", action="store_true", help="Run the offline scheduling benchmark")
+    parser.add_argument("--workers", type=int, default=10)
+    args = parser.parse_args()
+    if args.bench:
+        run_benchmark(workers=args.workers)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Inline validation stage for the crawlers.
+
+Each chapter is checked right after it is parsed, instead of validating the
+whole file after an hour-long crawl. A chapter with errors is refetched through
+the crawl's RetryQueue; if too many chapters fail (a systematic parse failure,
+e.g. a heading format the parser does not know), the crawl is aborted early.
+
+Errors (refetch, then keep the last result and report it):
+    no verses parsed, keys of another book/chapter, empty text,
+    overly long text (verses bleeding together), a chapter heading inside a verse
+Warnings (reported only):
+    gaps in verse numbers, verse count differing from the previous crawl
+"""
+
+import logging
+import os
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from chapter_costs import chapter_label, verse_counts_from_output
+from config import VALIDATION_ABORT_RATIO, VALIDATION_MIN_CHAPTERS, MAX_VERSE_CHARS
+from verse_keys import parse_key
+
+HEADING_PATTERN = re.compile(r'제\s*\d+\s*[장편]')
+
+
+class ChapterValidationError(ValueError):
+    """Raised from a chapter fetch so the retry queue refetches it."""
+
+
+class CrawlAborted(RuntimeError):
+    """Too many chapters failed validation; continuing would waste the crawl."""
+
+
+def reference_verse_counts(path: str) -> Dict[str, int]:
+    """Verse counts per chapter label from a previous crawl of the same version, if any."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        return verse_counts_from_output(path)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read previous crawl {path} for verse counts: {e}")
+        return {}
+
+
+def check_chapter(book_abbr: str, chapter: int, verses: Dict[str, str],
+                  expected_count: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """Returns (errors, warnings) for one parsed chapter."""
+    errors: List[str] = []
+    warnings: List[str] = []
+    if not verses:
+        return ["no verses parsed"], warnings
+
+    numbers = []
+    for key, text in verses.items():
+        parsed = parse_key(key)
+        if parsed is None or parsed[:2] != (book_abbr, chapter):
+            errors.append(f"unexpected key {key}")
+            continue
+        numbers.append(parsed[2])
+        if not isinstance(text, str) or not text.strip():
+            errors.append(f"empty text at {key}")
+        elif len(text) > MAX_VERSE_CHARS:
+            errors.append(f"{key} has {len(text)} characters")
+        elif HEADING_PATTERN.search(text):
+            errors.append(f"chapter heading inside {key}")
+
+    if numbers:
+        missing = sorted(set(range(1, max(numbers) + 1)) - set(numbers))
+        if missing:
+            warnings.append(f"missing verse numbers {missing[:10]}")
+    if expected_count and len(verses) != expected_count:
+        warnings.append(f"{len(verses)} verses, previous crawl had {expected_count}")
+    return errors, warnings
+
+
+class ChapterValidator:
+    """
+    Validates chapters as they stream in. Not thread-safe: call it from the
+    thread that drives the crawl (run_sequential's attempt callback).
+    """
+
+    def __init__(self, reference_counts: Optional[Dict[str, int]] = None,
+                 abort_ratio: float = VALIDATION_ABORT_RATIO, min_chapters: int = VALIDATION_MIN_CHAPTERS):
+        self.reference_counts = reference_counts or {}
+        self.abort_ratio = abort_ratio
+        self.min_chapters = min_chapters
+        self.checked = 0
+        self.bad = 0
+        self.refetched = 0
+        self.errors: Dict[Hashable, List[str]] = {}
+        self.warnings: Dict[Hashable, List[str]] = {}
+
+    def validate(self, book_abbr: str, chapter: int, verses: Dict[str, str], retries_left: bool) -> Dict[str, str]:
+        """
+        Checks one chapter and returns it unchanged. Raises ChapterValidationError on
+        errors while retries are left; on the last attempt the chapter is kept and reported.
+        """
+        task = (book_abbr, chapter)
+        errors, warnings = check_chapter(book_abbr, chapter, verses,
+                                         self.reference_counts.get(chapter_label(book_abbr, chapter)))
+        self.checked += 1
+        if warnings:
+            self.warnings[task] = warnings
+            logging.warning(f"Validation warnings for {book_abbr} {chapter}: {warnings}")
+        if not errors:
+            self.errors.pop(task, None)
+            return verses
+
+        self.bad += 1
+        if retries_left:
+            self.refetched += 1
+            raise ChapterValidationError(f"{book_abbr} {chapter}: {'; '.join(errors[:3])}")
+        self.errors[task] = errors
+        logging.error(f"Keeping {book_abbr} {chapter} despite validation errors: {errors[:3]}")
+        return verses
+
+    def check_abort(self):
+        """Raises CrawlAborted once the share of bad chapter results crosses abort_ratio."""
+        if self.checked >= self.min_chapters and self.bad / self.checked >= self.abort_ratio:
+            raise CrawlAborted(
+                f"{self.bad} of {self.checked} chapter results failed validation "
+                f"(threshold {self.abort_ratio:.0%}); the parser is likely broken for this source"
+            )
+
+    def summary(self) -> str:
+        lines = [f"🔍 Inline validation: {self.checked} chapter results checked, "
+                 f"{self.refetched} refetched, {len(self.errors)} kept with errors, "
+                 f"{len(self.warnings)} with warnings"]
+        for (book_abbr, chapter), errors in self.errors.items():
+            lines.append(f"  ❌ {book_abbr} {chapter}: {'; '.join(errors[:3])}")
+        for (book_abbr, chapter), warnings in list(self.warnings.items())[:20]:
+            lines.append(f"  ⚠️ {book_abbr} {chapter}: {'; '.join(warnings)}")
+        if len(self.warnings) > 20:
+            lines.append(f"  ... {len(self.warnings) - 20} more chapters with warnings (see log)")
+        return "\n".join(lines)
@@ -0,0 +1,285 @@
+"""
+Concordance and word-frequency tables over all crawled versions.
+
+Build (offline, `python concordance.py build`):
+    Korean versions are tokenized into Hangul runs (eojeol, particles kept),
+    English versions into case-folded words. Each version's tokens become one
+    integer array of term ids, and every table below comes from a sort or
+    bincount over the combined arrays, not a Python loop.
+
+Files in output/concordance/ (numpy .npy, opened with mmap_mode="r"):
+    vocab.npy           sorted terms (fixed-width unicode); term id = position
+    term_counts.npy     (term x version) token counts
+    post_offsets.npy    CSR offsets into the postings, per term
+    post_version.npy    postings: version index      (one per term/version/verse)
+    post_verse.npy      postings: verse id (BBCCCVVV)
+    chap_offsets.npy    CSR offsets into the chapter counts, per term
+    chap_version.npy    chapter counts: version index
+    chap_ordinal.npy    chapter counts: chapter ordinal (0..1188, see verse_range)
+    chap_count.npy      chapter counts: tokens
+    meta.json           version names and languages
+
+Because the vocabulary is sorted, a prefix query ("하나님" -> 하나님이, 하나님의,
+...) is one contiguous id range found with two binary searches.
+
+    python concordance.py build
+    python concordance.py freq 하나님 --prefix
+    python concordance.py where love --version kjv_en
+    python concordance.py top --version krv
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import OUTPUT_DIR
+from corpus import discover_outputs, iter_verses, load_version, version_lang
+from divergence import CHAPTER_LABELS, chapter_ordinals
+from shard_store import write_json_atomic
+from verse_keys import BOOK_INDEX, split_verse_id
+
+CONCORDANCE_DIR = os.path.join(OUTPUT_DIR, "concordance")
+
+TOKEN_PATTERNS = {
+    "ko": re.compile(r'[가-힣]+'),
+    "en": re.compile(r"[a-z]+(?:'[a-z]+)?"),
+}
+
+ARRAYS = ("vocab", "term_counts", "post_offsets", "post_version", "post_verse",
+          "chap_offsets", "chap_version", "chap_ordinal", "chap_count")
+
+
+def tokenize(text: str, lang: str) -> List[str]:
+    return TOKEN_PATTERNS[lang].findall(text.casefold() if lang == "en" else text)
+
+
+def _csr_offsets(sorted_term_ids: np.ndarray, n_terms: int) -> np.ndarray:
+    """offsets[t]..offsets[t + 1] is term t's slice of an array sorted by term id."""
+    return np.searchsorted(sorted_term_ids, np.arange(n_terms + 1)).astype(np.int64)
+
+
+def _sorted_unique(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """np.unique(keys, return_counts=True) via one in-place sort (faster here than numpy's hash path)."""
+    keys = np.sort(keys)
+    if not len(keys):
+        return keys, np.array([], dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, len(keys)))
+    return keys[starts], counts
+
+
+def build_concordance(outputs: Optional[Dict[str, str]] = None,
+                      out_dir: str = CONCORDANCE_DIR) -> Dict[str, int]:
+    """Tokenizes every version and writes the tables. Returns sizes for the summary."""
+    if outputs is None:
+        outputs = discover_outputs()
+    names = list(outputs)
+    meta_path = os.path.join(out_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # Pass 1: tokens -> provisional ids, one id/verse/version array per version
+    provisional: Dict[str, int] = {}
+    term_parts, verse_parts, version_parts = [], [], []
+    for version_index, name in enumerate(names):
+        lang = version_lang(name)
+        verse_ids, token_lists = [], []
+        for vid, _, _, _, text in iter_verses(load_version(outputs[name])):
+            verse_ids.append(vid)
+            token_lists.append(tokenize(text, lang))
+        tokens = [token for token_list in token_lists for token in token_list]
+        for token in set(tokens).difference(provisional):
+            provisional[token] = len(provisional)
+        term_parts.append(np.fromiter(map(provisional.__getitem__, tokens), dtype=np.int32, count=len(tokens)))
+        verse_parts.append(np.repeat(np.array(verse_ids, dtype=np.int32),
+                                     np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))))
+        version_parts.append(np.full(len(tokens), version_index, dtype=np.int8))
+
+    # Renumber so term ids follow the sorted vocabulary
+    terms = np.array(list(provisional), dtype=str) if provisional else np.array([], dtype='<U1')
+    order = np.argsort(terms, kind="stable")
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    vocab = terms[order]
+    n_terms, n_versions = len(vocab), len(names)
+
+    term_ids = remap[np.concatenate(term_parts)] if term_parts else np.array([], dtype=np.int32)
+    verse_of = np.concatenate(verse_parts) if verse_parts else np.array([], dtype=np.int32)
+    version_of = np.concatenate(version_parts) if version_parts else np.array([], dtype=np.int8)
+
+    # (term x version) token counts
+    term_counts = np.bincount(term_ids.astype(np.int64) * n_versions + version_of,
+                              minlength=n_terms * n_versions).astype(np.int32).reshape(n_terms, n_versions)
+
+    # Postings: unique (term, version, verse), sorted by term then version then verse
+    posting_keys, _ = _sorted_unique((term_ids.astype(np.int64) * 256 + version_of) * 1_000_000_000 + verse_of)
+    post_term = (posting_keys // 1_000_000_000 // 256).astype(np.int32)
+    post_version = (posting_keys // 1_000_000_000 % 256).astype(np.int8)
+    post_verse = (posting_keys % 1_000_000_000).astype(np.int32)
+
+    # Chapter counts: unique (term, version, chapter ordinal) with token counts
+    ordinals = chapter_ordinals(verse_of.astype(np.int64))
+    valid = ordinals >= 0
+    chapter_keys, chap_count = _sorted_unique(
+        (term_ids[valid].astype(np.int64) * 256 + version_of[valid]) * 2048 + ordinals[valid])
+    chap_term = (chapter_keys // 2048 // 256).astype(np.int32)
+
+    tables = {
+        "vocab": vocab,
+        "term_counts": term_counts,
+        "post_offsets": _csr_offsets(post_term, n_terms),
+        "post_version": post_version,
+        "post_verse": post_verse,
+        "chap_offsets": _csr_offsets(chap_term, n_terms),
+        "chap_version": (chapter_keys // 2048 % 256).astype(np.int8),
+        "chap_ordinal": (chapter_keys % 2048).astype(np.int16),
+        "chap_count": chap_count.astype(np.int32),
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for name, array in tables.items():
+        path = os.path.join(out_dir, f"{name}.npy")
+        with open(f"{path}.tmp", 'wb') as f:
+            np.save(f, array)
+        os.replace(f"{path}.tmp", path)
+    # Written last: a directory without meta.json is an incomplete build
+    write_json_atomic(meta_path,
+                      {"versions": names, "langs": [version_lang(n) for n in names]})
+    return {"versions": n_versions, "terms": n_terms, "tokens": len(term_ids), "postings": len(post_verse)}
+
+
+class Concordance:
+    """Read-only view over a built concordance; all arrays are memory-mapped."""
+
+    def __init__(self, directory: str = CONCORDANCE_DIR):
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.versions: List[str] = meta["versions"]
+        self.arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+
+    def term_range(self, word: str, prefix: bool = False) -> Tuple[int, int]:
+        """[start, end) of term ids equal to (or starting with) `word`."""
+        vocab = self.arrays["vocab"]
+        word = word.casefold() if word.isascii() else word
+        start = int(np.searchsorted(vocab, word, side="left"))
+        if not prefix:
+            found = start < len(vocab) and vocab[start] == word
+            return start, start + 1 if found else start
+        # Every term with the prefix sorts before prefix + the highest code point
+        return start, int(np.searchsorted(vocab, word + "\U0010ffff", side="left"))
+
+    def _version_index(self, version: Optional[str]) -> Optional[int]:
+        if version is None:
+            return None
+        if version not in self.versions:
+            raise KeyError(f"Unknown version: {version}")
+        return self.versions.index(version)
+
+    def frequency(self, word: str, prefix: bool = False) -> Dict[str, int]:
+        """Token count per version."""
+        start, end = self.term_range(word, prefix)
+        totals = np.asarray(self.arrays["term_counts"][start:end]).sum(axis=0)
+        return {name: int(count) for name, count in zip(self.versions, totals) if count}
+
+    def occurrences(self, word: str, version: Optional[str] = None, prefix: bool = False,
+                    limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(version, "창1:1") for every verse containing the word, in canonical order per version."""
+        start, end = self.term_range(word, prefix)
+        offsets = self.arrays["post_offsets"]
+        lo, hi = int(offsets[start]), int(offsets[end])
+        versions = np.asarray(self.arrays["post_version"][lo:hi])
+        verses = np.asarray(self.arrays["post_verse"][lo:hi])
+        wanted = self._version_index(version)
+        if wanted is not None:
+            keep = versions == wanted
+            versions, verses = versions[keep], verses[keep]
+        if prefix:
+            # Several terms: merge into (version, verse) order without duplicates
+            pairs = np.unique(versions.astype(np.int64) * 1_000_000_000 + verses)
+            versions, verses = pairs // 1_000_000_000, pairs % 1_000_000_000
+        results = []
+        for version_index, vid in zip(versions[:limit], verses[:limit]):
+            abbr, chapter, verse = split_verse_id(int(vid))
+            results.append((self.versions[int(version_index)], f"{abbr}{chapter}:{verse}"))
+        return results
+
+    def chapter_counts(self, word: str, version: Optional[str] = None, prefix: bool = False) -> Dict[str, int]:
+        """Token count per chapter label ("창1"), over one or all versions."""
+        start, end = self.term_range(word, prefix)
+        offsets = self.arrays["chap_offsets"]
+        lo, hi = int(offsets[start]), int(offsets[end])
+        ordinals = np.asarray(self.arrays["chap_ordinal"][lo:hi])
+        counts = np.asarray(self.arrays["chap_count"][lo:hi])
+        wanted = self._version_index(version)
+        if wanted is not None:
+            keep = np.asarray(self.arrays["chap_version"][lo:hi]) == wanted
+            ordinals, counts = ordinals[keep], counts[keep]
+        totals = np.bincount(ordinals, weights=counts, minlength=len(CHAPTER_LABELS))
+        return {CHAPTER_LABELS[i]: int(totals[i]) for i in np.flatnonzero(totals)}
+
+    def book_counts(self, word: str, version: Optional[str] = None, prefix: bool = False) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for label, count in self.chapter_counts(word, version, prefix).items():
+            book_abbr = label.rstrip("0123456789")
+            totals[book_abbr] = totals.get(book_abbr, 0) + count
+        return dict(sorted(totals.items(), key=lambda item: BOOK_INDEX[item[0]]))
+
+    def top_words(self, version: Optional[str] = None, n: int = 20) -> List[Tuple[str, int]]:
+        counts = self.arrays["term_counts"]
+        wanted = self._version_index(version)
+        column = np.asarray(counts[:, wanted]) if wanted is not None else np.asarray(counts).sum(axis=1)
+        top = np.argsort(column)[::-1][:n]
+        return [(str(self.arrays["vocab"][i]), int(column[i])) for i in top if column[i]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concordance and word-frequency tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Tokenize all outputs and write the tables")
+    for name, help_text in (("freq", "Token count per version"), ("where", "Verses containing a word"),
+                            ("books", "Count per book for a word")):
+        query = sub.add_parser(name, help=help_text)
+        query.add_argument("word")
+        query.add_argument("--prefix", action="store_true", help="Match every term starting with WORD")
+        query.add_argument("--version", help="Restrict to one version")
+        query.add_argument("--limit", type=int, default=50)
+    top = sub.add_parser("top", help="Most frequent words")
+    top.add_argument("--version", help="Restrict to one version")
+    top.add_argument("-n", type=int, default=20)
+    parser.add_argument("--dir", default=CONCORDANCE_DIR, help=f"Table directory (default: {CONCORDANCE_DIR})")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        outputs = discover_outputs()
+        if not outputs:
+            print(f"No crawl outputs found in {OUTPUT_DIR}.")
+            return
+        start = time.perf_counter()
+        sizes = build_concordance(outputs, args.dir)
+        print(f"💾 Concordance saved: {args.dir} ({time.perf_counter() - start:.2f}s)")
+        print(f"  {sizes['versions']} versions, {sizes['tokens']:,} tokens, "
+              f"{sizes['terms']:,} distinct terms, {sizes['postings']:,} postings")
+        return
+
+    concordance = Concordance(args.dir)
+    if args.command == "freq":
+        for name, count in concordance.frequency(args.word, args.prefix).items():
+            if args.version in (None, name):
+                print(f"  {name:<12} {count:>7,}")
+    elif args.command == "where":
+        for name, key in concordance.occurrences(args.word, args.version, args.prefix, args.limit):
+            print(f"  {name:<12} {key}")
+    elif args.command == "books":
+        for book_abbr, count in concordance.book_counts(args.word, args.version, args.prefix).items():
+            print(f"  {book_abbr:<4} {count:>6,}")
+    else:
+        for word, count in concordance.top_words(args.version, args.n):
+            print(f"  {word:<16} {count:>8,}")
+
+
+if __name__ == "__main__":
+    main()
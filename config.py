@@ -58,6 +58,47 @@ LOG_DIR = os.path.join(BASE_DIR, "logs")
 output_filename = VERSION_FILES.get(VERSION, "bible_data.json")
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, output_filename)
 LOG_FILE = os.path.join(LOG_DIR, "crawler.log")
+LOG_FORMAT = os.getenv("BIBLE_LOG_FORMAT", "json")  # "json" (JSON lines) or "text"
+LOG_RATE_BURST = 5       # similar warnings/errors let through per window (crawl_logging.py)
+LOG_RATE_WINDOW = 10.0   # seconds
+
+# Output mode
+# "json": one file per version (OUTPUT_FILE)
+# "shards": per-book shards + manifest under SHARD_DIR/<file stem>/
+OUTPUT_MODE = os.getenv("BIBLE_OUTPUT_MODE", "json")
+SHARD_DIR = os.path.join(OUTPUT_DIR, "shards")
+SHARD_COMPRESSION = os.getenv("BIBLE_SHARD_COMPRESSION", "gzip")  # none, gzip, zstd
+SHARD_WORKERS = 4
+
+# Inline validation while crawling (chapter_validation.py)
+VALIDATE_INLINE = os.getenv("BIBLE_VALIDATE_INLINE", "1") == "1"
+VALIDATION_ABORT_RATIO = 0.5  # abort when this share of chapter results fails validation...
+VALIDATION_MIN_CHAPTERS = 20  # ...after at least this many were checked
+MAX_VERSE_CHARS = 1500        # longer "verses" are usually several verses run together
+VALIDATION_CACHE_FILE = os.path.join(OUTPUT_DIR, "reports", "validation_cache.json")  # validate_all.py results
+
+# Raw page archive (page_archive.py, python main.py --reparse)
+ARCHIVE_DIR = os.path.join(OUTPUT_DIR, "archive")
+ARCHIVE_RAW = os.getenv("BIBLE_ARCHIVE", "0") == "1"  # append every raw response while crawling
+
+# Sampling profiler (profiler.py, --profile on main.py / goodtv_crawler.py)
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")
+PROFILE_INTERVAL = float(os.getenv("BIBLE_PROFILE_INTERVAL", "0.005"))  # seconds between samples
+PROFILE_TOP = 20  # functions listed in the summary
+
+# Lookup server (python main.py --serve)
+SERVER_HOST = os.getenv("BIBLE_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("BIBLE_SERVER_PORT", "8080"))
+SERVER_CACHE_BYTES = 64 * 1024 * 1024  # LRU size for encoded range responses
+SERVER_RELOAD_INTERVAL = 5.0           # seconds between output file change checks
+
+# Distributed crawl (work_coordinator.py)
+COORDINATOR_DB = os.path.join(OUTPUT_DIR, "coordinator.db")
+COORDINATOR_HOST = os.getenv("BIBLE_COORDINATOR_HOST", "127.0.0.1")
+COORDINATOR_PORT = 8765
+COORDINATOR_TOKEN = os.getenv("BIBLE_COORDINATOR_TOKEN", "")  # shared secret; required by serve when set
+LEASE_SECONDS = 120.0  # a unit returns to the pool if its worker stops heartbeating this long
+CLAIM_BATCH = 5        # units leased per claim
 
 # Data
 TOTAL_VERSES_EXPECTED = 31102
@@ -0,0 +1,69 @@
+"""
+Loading of crawled outputs for the offline tools (exporters, analysis, server).
+
+A "version" is one crawl output: either a single JSON file (output/bible_krv.json)
+or a shard directory (output/shards/bible_krv/). Its name is the file stem without
+the "bible_" prefix, e.g. "krv", "niv_en", "kjv_en".
+"""
+
+import glob
+import json
+import os
+from typing import Dict, Iterator, Tuple
+
+from config import OUTPUT_DIR, SHARD_DIR, VERSION_FILES
+from shard_store import ShardReader, MANIFEST_NAME
+from verse_keys import parse_key, verse_id
+
+
+def version_name_for(path: str) -> str:
+    stem = os.path.splitext(os.path.basename(path.rstrip(os.sep)))[0]
+    return stem[len("bible_"):] if stem.startswith("bible_") else stem
+
+
+def version_lang(name: str) -> str:
+    """English outputs end with "_en" (bible_niv_en.json, bible_kjv_en.json); everything else is Korean."""
+    return "en" if name.endswith("_en") else "ko"
+
+
+def output_file_for(source: str, version: str, output_dir: str = OUTPUT_DIR) -> str:
+    """
+    Output file a crawler writes for `version` of `source` ("bskorea", "biblecom", "goodtv"):
+    VERSION_FILES for the first two, bible_<name>_<lang>.json for GoodTV.
+    """
+    if source == "goodtv":
+        from goodtv_crawler import VERSIONS
+        return os.path.join(output_dir, f"bible_{version}_{VERSIONS[version]['lang']}.json")
+    return os.path.join(output_dir, VERSION_FILES.get(version, f"bible_{version.lower()}.json"))
+
+
+def discover_outputs(output_dir: str = OUTPUT_DIR, shard_dir: str = SHARD_DIR) -> Dict[str, str]:
+    """
+    Returns {version_name: path} for every bible_*.json in output_dir and every
+    complete shard directory. A JSON file wins over shards of the same name.
+    """
+    outputs: Dict[str, str] = {}
+    for manifest in sorted(glob.glob(os.path.join(shard_dir, "bible_*", MANIFEST_NAME))):
+        shard_path = os.path.dirname(manifest)
+        outputs[version_name_for(shard_path)] = shard_path
+    for json_file in sorted(glob.glob(os.path.join(output_dir, "bible_*.json"))):
+        outputs[version_name_for(json_file)] = json_file
+    return dict(sorted(outputs.items()))
+
+
+def load_version(path: str) -> Dict[str, str]:
+    """Loads {key: text} from a JSON output file or a shard directory."""
+    if os.path.isdir(path):
+        return ShardReader(path).load_all()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_verses(data: Dict[str, str]) -> Iterator[Tuple[int, str, int, int, str]]:
+    """Yields (verse_id, book_abbr, chapter, verse, text) for every parseable key."""
+    for key, text in data.items():
+        parsed = parse_key(key)
+        if parsed is None:
+            continue
+        book_abbr, chapter, verse = parsed
+        yield verse_id(book_abbr, chapter, verse), book_abbr, chapter, verse, text
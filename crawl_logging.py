@@ -0,0 +1,181 @@
+"""
+Non-blocking logging for the crawlers.
+
+logging calls only put the record on an in-memory queue (QueueHandler); a
+QueueListener thread formats it and writes the file, so a fetch thread never
+waits on the handler lock or on disk during an error storm.
+
+Records are JSON lines by default (BIBLE_LOG_FORMAT=text for the old format).
+Pass per-chapter context through `extra`:
+
+    logging.info(f"Fetched {abbr} {chapter}", extra={"version": "krv", "book": abbr, "chapter": chapter,
+                                                     "latency_ms": 231.4})
+    {"ts": "...", "level": "INFO", "thread": "ThreadPoolExecutor-0_3", "msg": "Fetched 창 1",
+     "version": "krv", "book": "창", "chapter": 1, "latency_ms": 231.4}
+
+Warnings and errors that repeat (same text once digits are masked, e.g.
+"Error fetching 창 3: timeout") pass LOG_RATE_BURST times per LOG_RATE_WINDOW
+seconds; the rest are counted, and the count is attached as `suppressed` to the
+next one that passes (or written at shutdown).
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config import LOG_FORMAT, LOG_RATE_BURST, LOG_RATE_WINDOW
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+STRUCTURED_FIELDS = ("version", "book", "chapter", "task", "attempt", "status", "latency_ms", "suppressed")
+
+_DIGITS = re.compile(r'\d+')
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record; STRUCTURED_FIELDS are copied from `extra` when present."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formats the record into `msg` and drops the traceback, so the
+    listener's formatter would see the traceback inside "msg". This keeps them apart:
+    the message is merged with its args and the traceback is rendered into exc_text.
+    """
+
+    _tracebacks = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._tracebacks.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` similar WARNING+ records through per `window` seconds.
+    Runs in the logging thread before the record is queued, so dropped records cost
+    one dict lookup.
+    """
+
+    def __init__(self, burst: int = LOG_RATE_BURST, window: float = LOG_RATE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.lock = threading.Lock()
+        # key -> [window start, records passed in window, records suppressed]
+        self.counters: Dict[Tuple[str, int, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        key = (record.name, record.levelno, _DIGITS.sub("#", str(record.msg))[:200])
+        now = time.monotonic()
+        with self.lock:
+            counter = self.counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                self.counters[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if counter[1] < self.burst:
+                counter[1] += 1
+                return True
+            counter[2] += 1
+            return False
+
+    def pending(self) -> Dict[Tuple[str, int, str], int]:
+        """Suppressed counts not yet reported, by key; resets them."""
+        with self.lock:
+            pending = {key: counter[2] for key, counter in self.counters.items() if counter[2]}
+            for key in pending:
+                self.counters[key][2] = 0
+        return pending
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_rate_limit: Optional[RateLimitFilter] = None
+_file_handler: Optional[logging.Handler] = None
+_installed: Optional[Tuple[logging.Logger, logging.Handler]] = None
+_setup_lock = threading.Lock()  # crawl threads may call setup_logging at the same time
+
+
+def setup_logging(log_file: str, level: int = logging.INFO, log_format: str = LOG_FORMAT,
+                  logger: Optional[logging.Logger] = None) -> logging.handlers.QueueListener:
+    """
+    Routes `logger` (the root logger by default) through a queue to `log_file`.
+    Called by the crawl entry points, not at import, so parser-only users (re-parse
+    workers, the coordinator, tests) start no thread and open no file. Like
+    logging.basicConfig, only the first call configures anything; later calls
+    (another crawler started in the same process) return the running listener.
+    """
+    global _listener, _rate_limit, _file_handler, _installed
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        _file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        _file_handler.setFormatter(JsonLinesFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = RecordQueueHandler(records)
+        _rate_limit = RateLimitFilter()
+        queue_handler.addFilter(_rate_limit)
+
+        target = logger if logger is not None else logging.getLogger()
+        target.setLevel(level)
+        target.addHandler(queue_handler)
+        _installed = (target, queue_handler)
+        _listener = logging.handlers.QueueListener(records, _file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Drains the queue, reports still-suppressed counts and closes the file."""
+    global _listener, _rate_limit, _file_handler, _installed
+    if _listener is None:
+        return
+    target, queue_handler = _installed
+    target.removeHandler(queue_handler)
+    _listener.stop()
+    for (name, levelno, text), count in _rate_limit.pending().items():
+        record = logging.LogRecord(name, levelno, __file__, 0, f"{count} more like: {text}", None, None)
+        record.suppressed = count
+        _file_handler.handle(record)
+    _file_handler.close()
+    _listener = _rate_limit = _file_handler = _installed = None
@@ -0,0 +1,100 @@
+"""
+Chapter-by-chapter crawl shared by the BSKorea and Bible.com crawlers.
+
+Every chapter of the 66 books is requested once, in canonical order, with
+REQUEST_DELAY between requests. Failed chapters are retried from a RetryQueue
+between new requests instead of blocking. With VALIDATE_INLINE each chapter is
+checked right after parsing and refetched on errors. A book is put back into
+canonical verse order once all its chapters are settled, and in shards mode it
+is written in the background while the crawl continues.
+"""
+
+import logging
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from tqdm import tqdm
+
+from books_data import BOOKS, BOOK_ORDER
+from chapter_validation import ChapterValidator, reference_verse_counts
+from config import (
+    OUTPUT_MODE, REQUEST_DELAY, SHARD_DIR, SHARD_COMPRESSION, SHARD_WORKERS, TOTAL_VERSES_EXPECTED,
+    VALIDATE_INLINE
+)
+from retry_queue import RetryQueue, run_sequential
+from shard_store import ShardWriter, shard_dir_for
+from verse_keys import key_to_verse_id
+
+Task = Tuple[str, int]  # (book_abbr, chapter)
+
+
+def crawl_chapters(request_chapter: Callable[[str, int], Dict[str, str]], output_file: str,
+                   desc: str = "Total Progress", output_mode: str = OUTPUT_MODE,
+                   validate: bool = VALIDATE_INLINE, delay: float = REQUEST_DELAY,
+                   on_finished: Optional[Callable[[], None]] = None) -> Dict[str, str]:
+    """
+    Crawls every chapter with `request_chapter(book_abbr, chapter)`, which raises on failure,
+    and returns all verses in canonical order. `output_file` is the version's output: its
+    previous crawl gives the expected verse counts, and shards go to its shard directory.
+    `on_finished` runs once no more requests will be made (e.g. to close a page archive).
+    The caller saves the returned verses unless output_mode is "shards".
+    """
+    shard_writer = None
+    if output_mode == "shards":
+        shard_writer = ShardWriter(shard_dir_for(output_file, SHARD_DIR), SHARD_COMPRESSION, SHARD_WORKERS)
+
+    retry_queue = RetryQueue()
+    validator = None
+    if validate:
+        # Checked right after parsing; bad chapters are refetched through the retry queue
+        validator = ChapterValidator(reference_verse_counts(output_file))
+
+    def attempt(task: Task) -> Dict[str, str]:
+        chapter_data = request_chapter(*task)
+        if validator is not None:
+            retries_left = retry_queue.attempts.get(task, 0) < retry_queue.max_retries
+            chapter_data = validator.validate(*task, chapter_data, retries_left)
+        return chapter_data
+
+    tasks = [(book_abbr, chapter) for book_abbr in BOOK_ORDER
+             for chapter in range(1, BOOKS[book_abbr]['chapters'] + 1)]
+    book_results: Dict[str, Dict[str, str]] = {book_abbr: {} for book_abbr in BOOK_ORDER}
+    # Chapters not yet settled per book; the book's shard is written when it reaches 0
+    pending_chapters = {book_abbr: BOOKS[book_abbr]['chapters'] for book_abbr in BOOK_ORDER}
+
+    with tqdm(total=TOTAL_VERSES_EXPECTED, desc=desc) as pbar:
+        def on_success(task: Hashable, chapter_data: Dict[str, str]):
+            if chapter_data:
+                book_results[task[0]].update(chapter_data)
+                pbar.update(len(chapter_data))
+
+        def on_settled(task: Hashable):
+            if validator is not None:
+                validator.check_abort()
+            book_abbr = task[0]
+            pending_chapters[book_abbr] -= 1
+            if pending_chapters[book_abbr] == 0:
+                # Retried chapters arrive out of order; restore canonical verse order
+                book_verses = book_results[book_abbr]
+                book_results[book_abbr] = {k: book_verses[k] for k in sorted(book_verses, key=key_to_verse_id)}
+                logging.info(f"Finished {BOOKS[book_abbr]['name']} ({len(book_verses)} verses)")
+                # Book is complete: write its shard in the background while crawling continues
+                if shard_writer is not None:
+                    shard_writer.submit_book(book_abbr, book_results[book_abbr])
+
+        try:
+            run_sequential(tasks, attempt, on_success, on_settled, delay=delay, retry_queue=retry_queue)
+        finally:
+            if on_finished is not None:
+                on_finished()
+
+    results: Dict[str, str] = {}
+    for book_abbr in BOOK_ORDER:
+        results.update(book_results[book_abbr])
+    print(f"\n{retry_queue.summary()}")
+    if validator is not None:
+        print(validator.summary())
+
+    if shard_writer is not None:
+        manifest = shard_writer.close()
+        print(f"\n💾 Shards saved: {shard_writer.shard_dir} ({manifest['total_verses']:,} verses)")
+    return results
@@ -1,31 +1,30 @@
 import requests
 from bs4 import BeautifulSoup
 import time
-import json
 import os
 import logging
-from typing import Dict, Optional, List
-from tqdm import tqdm
+from typing import Dict
 from fake_useragent import UserAgent
 import re
 
 from config import (
-    READ_PAGE_URL, VERSION, REQUEST_TIMEOUT, REQUEST_DELAY,
-    MAX_RETRIES, RETRY_BACKOFF, OUTPUT_FILE, LOG_FILE, ENCODING,
-    TOTAL_VERSES_EXPECTED
-)
-from books_data import BOOKS, BOOK_ORDER
-
-# Setup Logging
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    READ_PAGE_URL, VERSION, REQUEST_TIMEOUT,
+    LOG_FILE, ENCODING, OUTPUT_MODE, ARCHIVE_RAW
 )
+from books_data import BOOKS
+from shard_store import write_json_atomic
+from crawl_pipeline import crawl_chapters
+from page_archive import ArchiveWriter
+from corpus import output_file_for
+from crawl_logging import setup_logging
 
 class BibleCrawler:
-    def __init__(self):
+    def __init__(self, version: str = VERSION, archive: bool = ARCHIVE_RAW):
+        self.version = version
+        # Output, shards and the previous crawl used for validation all follow the crawled version
+        self.output_file = output_file_for("bskorea", version)
+        # Raw responses for offline re-parsing (main.py --reparse)
+        self.archive = ArchiveWriter.for_version("bskorea", version) if archive else None
         self.session = requests.Session()
         self.ua = UserAgent()
         self.results: Dict[str, str] = {}
@@ -40,37 +39,43 @@ class BibleCrawler:
     def fetch_chapter(self, book_abbr: str, chapter: int) -> Dict[str, str]:
         """
         Fetches all verses for a given book and chapter.
-        Returns a dictionary of { "AbbrChapter:Verse": "Text" }
+        Returns a dictionary of { "AbbrChapter:Verse": "Text" }, or {} if the request failed.
+        A single attempt: crawl_all retries failed chapters through its RetryQueue.
         """
-        url = READ_PAGE_URL
+        try:
+            return self._request_chapter(book_abbr, chapter)
+        except Exception as e:
+            logging.error(f"Error fetching {book_abbr} {chapter}: {e}",
+                          extra={"version": self.version, "book": book_abbr, "chapter": chapter})
+            return {}
+
+    def _log_fetch(self, book_abbr: str, chapter: int, status: int, start: float):
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        logging.info(f"Fetched {book_abbr} {chapter} in {latency_ms:.0f}ms",
+                     extra={"version": self.version, "book": book_abbr, "chapter": chapter,
+                            "status": status, "latency_ms": latency_ms})
+
+    def _request_chapter(self, book_abbr: str, chapter: int) -> Dict[str, str]:
+        """One request for a chapter; raises on network/HTTP errors."""
         params = {
-            'version': VERSION,
+            'version': self.version,
             'book': BOOKS[book_abbr]['url_abbr'],
             'chap': chapter,
             'range': 'all'
         }
-        
-        retries = 0
-        while retries <= MAX_RETRIES:
-            try:
-                response = self.session.get(
-                    url, 
-                    params=params, 
-                    headers=self._get_headers(), 
-                    timeout=REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                response.encoding = ENCODING
-                return self._parse_verses(book_abbr, chapter, response.text)
-            except Exception as e:
-                retries += 1
-                wait_time = RETRY_BACKOFF ** retries
-                logging.error(f"Error fetching {book_abbr} {chapter}: {e}. Retry {retries}/{MAX_RETRIES} in {wait_time}s")
-                if retries > MAX_RETRIES:
-                    logging.critical(f"Failed to fetch {book_abbr} {chapter} after {MAX_RETRIES} retries.")
-                    return {}
-                time.sleep(wait_time)
-        return {}
+        start = time.perf_counter()
+        response = self.session.get(
+            READ_PAGE_URL, 
+            params=params, 
+            headers=self._get_headers(), 
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        response.encoding = ENCODING
+        self._log_fetch(book_abbr, chapter, response.status_code, start)
+        if self.archive:
+            self.archive.write("bskorea", self.version, book_abbr, chapter, response.url, response.status_code, response.text)
+        return self._parse_verses(book_abbr, chapter, response.text)
 
     def _parse_verses(self, book_abbr: str, chapter: int, html_content: str) -> Dict[str, str]:
         """
@@ -160,36 +165,31 @@ class BibleCrawler:
     def crawl_all(self):
         """
         Main loop to crawl all 66 books.
+        Failed chapters are retried from a RetryQueue between new requests instead of blocking.
         """
+        # Records go through a queue to a background writer thread (first call wins)
+        setup_logging(LOG_FILE)
         logging.info("Starting crawl of all 66 books.")
-        total_books = len(BOOK_ORDER)
-        
-        with tqdm(total=TOTAL_VERSES_EXPECTED, desc="Total Progress") as pbar:
-            for book_abbr in BOOK_ORDER:
-                book_info = BOOKS[book_abbr]
-                logging.info(f"Crawling {book_info['name']} ({book_info['chapters']} chapters)")
-                
-                for chapter in range(1, book_info['chapters'] + 1):
-                    chapter_data = self.fetch_chapter(book_abbr, chapter)
-                    if chapter_data:
-                        self.results.update(chapter_data)
-                        pbar.update(len(chapter_data))
-                    
-                    time.sleep(REQUEST_DELAY)
-                    
-        self.save_to_json()
+        self.results = crawl_chapters(self._request_chapter, self.output_file, desc="Total Progress",
+                                      on_finished=self.close_archive)
+        if OUTPUT_MODE != "shards":
+            self.save_to_json()
+
+    def close_archive(self):
+        """Flushes and closes the raw page archive once no more pages will be fetched."""
+        if self.archive:
+            self.archive.close()
+            self.archive = None
 
     def save_to_json(self):
         """
         Saves the results to output/bible_data.json
         """
-        os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
         try:
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
+            write_json_atomic(self.output_file, self.results)
             
-            file_size = os.path.getsize(OUTPUT_FILE) / (1024 * 1024)
-            print(f"\n💾 JSON saved: {OUTPUT_FILE} ({file_size:.1f} MB)")
+            file_size = os.path.getsize(self.output_file) / (1024 * 1024)
+            print(f"\n💾 JSON saved: {self.output_file} ({file_size:.1f} MB)")
             print(f"📊 Total verses: {len(self.results):,} items")
         except Exception as e:
             logging.error(f"Error saving JSON: {e}")
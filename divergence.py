@@ -0,0 +1,174 @@
+"""
+Cross-version verse-count matrix and divergence report.
+
+Every version is reduced to a sorted array of integer verse ids (verse_keys).
+From those, one np.bincount per version gives a (version x chapter) count
+matrix over the 1,189 chapters in books_data, and a searchsorted against the
+union of ids gives a (version x verse) presence mask. Divergent chapters,
+versification outliers and missing verses are then plain array operations.
+
+Versions are compared within a language only: Korean and English versions
+number some verses differently (e.g. Psalm titles), which is not an error.
+
+    python divergence.py                  # all outputs, report to output/reports/divergence.json
+    python divergence.py --lang ko
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from books_data import BOOKS, BOOK_ORDER
+from config import OUTPUT_DIR
+from corpus import discover_outputs, load_version, version_lang
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id
+from verse_range import CHAPTER_BASE, TOTAL_CHAPTERS
+
+REPORT_FILE = os.path.join(OUTPUT_DIR, "reports", "divergence.json")
+MAX_LISTED = 200  # per version, for missing verse / outlier lists in the report
+
+# chapter_base_by_book[book_no - 1] -> ordinal of the book's first chapter
+_CHAPTER_BASE_BY_BOOK = np.array([CHAPTER_BASE[abbr] for abbr in BOOK_ORDER], dtype=np.int64)
+_CHAPTERS_BY_BOOK = np.array([BOOKS[abbr]['chapters'] for abbr in BOOK_ORDER], dtype=np.int64)
+CHAPTER_LABELS = [f"{abbr}{chapter}" for abbr in BOOK_ORDER for chapter in range(1, BOOKS[abbr]['chapters'] + 1)]
+
+
+def verse_id_array(data: Dict[str, str]) -> np.ndarray:
+    """Sorted, unique verse ids of one version (unparseable keys dropped)."""
+    ids = [key_to_verse_id(key) for key in data]
+    return np.unique(np.array([vid for vid in ids if vid is not None], dtype=np.int64))
+
+
+def chapter_ordinals(ids: np.ndarray) -> np.ndarray:
+    """Global chapter ordinal (0..1188) per verse id; -1 for chapters beyond books_data."""
+    book_idx = ids // 1_000_000 - 1
+    chapter = ids // 1000 % 1000
+    valid = (chapter >= 1) & (chapter <= _CHAPTERS_BY_BOOK[book_idx])
+    return np.where(valid, _CHAPTER_BASE_BY_BOOK[book_idx] + chapter - 1, -1)
+
+
+def count_matrix(id_arrays: List[np.ndarray]) -> np.ndarray:
+    """(version x chapter) verse counts."""
+    matrix = np.zeros((len(id_arrays), TOTAL_CHAPTERS), dtype=np.int32)
+    for row, ids in enumerate(id_arrays):
+        ordinals = chapter_ordinals(ids)
+        matrix[row] = np.bincount(ordinals[ordinals >= 0], minlength=TOTAL_CHAPTERS)
+    return matrix
+
+
+def presence_matrix(id_arrays: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Union of verse ids and a (version x union) boolean mask of which versions have each verse."""
+    union = np.unique(np.concatenate(id_arrays)) if id_arrays else np.array([], dtype=np.int64)
+    mask = np.zeros((len(id_arrays), len(union)), dtype=bool)
+    for row, ids in enumerate(id_arrays):
+        pos = np.searchsorted(union, ids)
+        mask[row, pos] = True
+    return union, mask
+
+
+def _verse_label(vid: int) -> str:
+    book_no, rest = divmod(int(vid), 1_000_000)
+    return f"{BOOK_ORDER[book_no - 1]}{rest // 1000}:{rest % 1000}"
+
+
+def analyze_group(names: List[str], id_arrays: List[np.ndarray]) -> Dict:
+    """Divergence report for versions that share a versification (same language)."""
+    counts = count_matrix(id_arrays)
+    chapter_min = counts.min(axis=0)
+    chapter_max = counts.max(axis=0)
+    median = np.median(counts, axis=0)
+
+    divergent = np.flatnonzero(chapter_min != chapter_max)
+    # Outlier: a version's chapter count differs from the group median
+    outliers = (counts != median) & (chapter_min != chapter_max)
+    empty = (counts == 0) & (chapter_max > 0)
+
+    union, present = presence_matrix(id_arrays)
+    # Missing: held by a strict majority of the group but not by this version
+    majority = present.sum(axis=0) * 2 > len(names)
+    missing = majority & ~present
+    # Extra: held by this version but by no more than half of the group
+    extra = present & ~majority
+
+    report = {
+        "versions": names,
+        "total_verses": dict(zip(names, counts.sum(axis=1).tolist())),
+        "divergent_chapters": [
+            {"chapter": CHAPTER_LABELS[c], "counts": dict(zip(names, counts[:, c].tolist()))}
+            for c in divergent
+        ],
+        "by_version": {},
+    }
+    for row, name in enumerate(names):
+        outlier_chapters = np.flatnonzero(outliers[row])
+        missing_ids = union[missing[row]]
+        extra_ids = union[extra[row]]
+        report["by_version"][name] = {
+            "outlier_chapters": len(outlier_chapters),
+            "empty_chapters": [CHAPTER_LABELS[c] for c in np.flatnonzero(empty[row])][:MAX_LISTED],
+            "missing_verses": len(missing_ids),
+            "extra_verses": len(extra_ids),
+            "outliers": [
+                {"chapter": CHAPTER_LABELS[c], "count": int(counts[row, c]), "median": float(median[c])}
+                for c in outlier_chapters[:MAX_LISTED]
+            ],
+            "missing": [_verse_label(vid) for vid in missing_ids[:MAX_LISTED]],
+            "extra": [_verse_label(vid) for vid in extra_ids[:MAX_LISTED]],
+        }
+    return report
+
+
+def build_report(outputs: Optional[Dict[str, str]] = None, lang: Optional[str] = None) -> Dict:
+    if outputs is None:
+        outputs = discover_outputs()
+    groups: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, path in outputs.items():
+        version_language = version_lang(name)
+        if lang and version_language != lang:
+            continue
+        groups.setdefault(version_language, {})[name] = verse_id_array(load_version(path))
+
+    return {
+        language: analyze_group(list(arrays.keys()), list(arrays.values()))
+        for language, arrays in groups.items()
+    }
+
+
+def print_summary(report: Dict, top: int = 10):
+    for language, group in report.items():
+        print(f"\n[{language}] {len(group['versions'])} versions, "
+              f"{len(group['divergent_chapters'])} chapters with differing verse counts")
+        for name in group["versions"]:
+            stats = group["by_version"][name]
+            print(f"  - {name:<12} {group['total_verses'][name]:>6} verses | "
+                  f"outlier chapters: {stats['outlier_chapters']:<4} "
+                  f"missing: {stats['missing_verses']:<5} extra: {stats['extra_verses']}")
+        for entry in group["divergent_chapters"][:top]:
+            counts = ", ".join(f"{name}={count}" for name, count in entry["counts"].items())
+            print(f"    {entry['chapter']}: {counts}")
+        if len(group["divergent_chapters"]) > top:
+            print(f"    ... {len(group['divergent_chapters']) - top} more in the report file")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-version verse-count divergence report")
+    parser.add_argument("--lang", help="Only analyze one language (ko, en)")
+    parser.add_argument("--out", default=REPORT_FILE, help=f"Report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = build_report(lang=args.lang)
+    if not report:
+        print(f"No crawl outputs found in {OUTPUT_DIR}.")
+        return
+    write_json_atomic(args.out, report)
+    print_summary(report)
+    print(f"\n💾 Report saved: {args.out} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import requests
-import json
 import os
 import time
 import logging
@@ -9,10 +8,10 @@ from tqdm import tqdm
 import re
 import argparse
 
+from config import OUTPUT_DIR, LOG_DIR, OUTPUT_MODE, SHARD_DIR, SHARD_COMPRESSION, SHARD_WORKERS, ARCHIVE_RAW
+
 # Configuration
 API_BASE_URL = "https://goodtvbible.goodtv.co.kr/api/onlinebible/bibleread/read-all"
-OUTPUT_DIR = "output"
-LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "goodtv_crawler.log")
 
 # Version Mapping
@@ -43,22 +42,28 @@ except ImportError:
     BOOKS = {} 
     BOOK_ORDER = []
 
-# Setup Logging
-os.makedirs(LOG_DIR, exist_ok=True)
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from shard_store import ShardWriter, shard_dir_for, write_json_atomic
+from retry_queue import run_concurrent
+from page_archive import ArchiveWriter
+from corpus import discover_outputs
+from chapter_costs import load_costs, record_costs, order_longest_first, chapter_label
+from profiler import profiled
+from crawl_logging import setup_logging
+import divergence
 
 class GoodTVBibleCrawler:
-    def __init__(self, version_name: str, version_id: str, lang: str):
+    def __init__(self, version_name: str, version_id: str, lang: str, output_mode: str = OUTPUT_MODE,
+                 archive: bool = ARCHIVE_RAW):
         self.version_name = version_name
         self.version_id = version_id
         self.lang = lang
+        self.output_mode = output_mode
         self.results: Dict[str, str] = {}
+        self.failed_chapters: List[Tuple[int, int, str]] = []
         self.session = requests.Session()
         self.output_file = os.path.join(OUTPUT_DIR, f"bible_{version_name}_{lang}.json")
+        # Raw responses for offline re-parsing (main.py --reparse)
+        self.archive = ArchiveWriter.for_version("goodtv", version_name) if archive else None
         
     def clean_text(self, text: str) -> str:
         if not text:
@@ -68,6 +73,10 @@ class GoodTVBibleCrawler:
         return " ".join(text.split()).strip()
 
     def fetch_chapter(self, bible_code: int, chapter: int) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        One API request for a chapter. Raises on network/HTTP errors and on an empty
+        content list, so crawl() can hand the chapter to its RetryQueue.
+        """
         params = {
             'version1': self.version_id,
             'version2': '',
@@ -75,19 +84,50 @@ class GoodTVBibleCrawler:
             'bible_code': bible_code,
             'jang': chapter
         }
-        try:
-            response = self.session.get(API_BASE_URL, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            # The structure is data.data.version1.content
-            content = data.get("data", {}).get("data", {}).get("version1", {}).get("content", [])
-            bookname_abb = data.get("data", {}).get("bookname_abb", "")
-            return content, bookname_abb
-        except Exception as e:
-            logging.error(f"Error fetching version {self.version_name} code {bible_code} jang {chapter}: {e}")
-            return [], ""
+        start = time.perf_counter()
+        response = self.session.get(API_BASE_URL, params=params, timeout=15)
+        response.raise_for_status()
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        logging.info(f"Fetched {BOOK_ORDER[bible_code - 1]} {chapter} in {latency_ms:.0f}ms",
+                     extra={"version": self.version_name, "book": BOOK_ORDER[bible_code - 1], "chapter": chapter,
+                            "status": response.status_code, "latency_ms": latency_ms})
+        if self.archive:
+            self.archive.write("goodtv", self.version_name, BOOK_ORDER[bible_code - 1], chapter,
+                               response.url, response.status_code, response.text)
+        content, bookname_abb = self.parse_payload(response.json())
+        if not content:
+            raise ValueError("Empty content")
+        return content, bookname_abb
+
+    @staticmethod
+    def parse_payload(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+        # The structure is data.data.version1.content
+        content = data.get("data", {}).get("data", {}).get("version1", {}).get("content", [])
+        bookname_abb = data.get("data", {}).get("bookname_abb", "")
+        return content, bookname_abb
+
+    def chapter_items(self, chapter: int, book_abbr: str, result: Tuple[List[Dict[str, Any]], str]) -> List[Tuple[int, str, str]]:
+        """Turns a fetch_chapter result into (jul, key, cleaned_text) items."""
+        content, bookname_abb = result
+        if not bookname_abb:
+            # Use mapping or fallback
+            bookname_abb = BOOK_ABBR_MAP.get(book_abbr, book_abbr)
+
+        items = []
+        for item in content:
+            jul = item.get("jul")
+            text = item.get("text")
+            if jul is not None and text:
+                cleaned_text = self.clean_text(text)
+                # The requirement is bookname_abb + jang + ":" + jul
+                # For English versions, API still returns "창", "출" etc.
+                key = f"{bookname_abb}{chapter}:{jul}"
+                items.append((jul, key, cleaned_text))
+        return items
 
     def crawl(self):
+        # Up to 50 fetch threads log through a queue to one background writer (first call wins)
+        setup_logging(LOG_FILE)
         logging.info(f"Starting crawl for {self.version_name} (ID: {self.version_id})")
         
         # We'll store results in a structure that's easy to sort: (bible_code, chapter, jul)
@@ -100,30 +140,56 @@ class GoodTVBibleCrawler:
             for chapter in range(1, book_info['chapters'] + 1):
                 tasks.append((bible_code, chapter, book_abbr))
 
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_task = {executor.submit(self.fetch_chapter, bc, ch): (bc, ch, abbr) for bc, ch, abbr in tasks}
-            
-            with tqdm(total=len(tasks), desc=f"Crawling {self.version_name}", unit="chap") as pbar:
-                for future in as_completed(future_to_task):
-                    bc, ch, abbr = future_to_task[future]
-                    try:
-                        content, bookname_abb = future.result()
-                        if not bookname_abb:
-                            # Use mapping or fallback
-                            bookname_abb = BOOK_ABBR_MAP.get(abbr, abbr)
-                            
-                        for item in content:
-                            jul = item.get("jul")
-                            text = item.get("text")
-                            if jul is not None and text:
-                                cleaned_text = self.clean_text(text)
-                                # The requirement is bookname_abb + jang + ":" + jul
-                                # For English versions, API still returns "창", "출" etc.
-                                key = f"{bookname_abb}{ch}:{jul}"
-                                temp_results[(bc, ch, jul)] = (key, cleaned_text)
-                    except Exception as e:
-                        logging.error(f"Task failed for {abbr} {ch}: {e}")
-                    pbar.update(1)
+        # Longest chapters first so a heavy chapter (시119, 민7) never starts last;
+        # results are re-sorted into canonical order below
+        costs = load_costs(source="goodtv")
+        tasks = order_longest_first(tasks, lambda task: costs.get(chapter_label(task[2], task[1])))
+        fetch_seconds: Dict[str, float] = {}
+
+        def timed_fetch(task):
+            bc, ch, abbr = task
+            start = time.perf_counter()
+            result = self.fetch_chapter(bc, ch)
+            fetch_seconds[chapter_label(abbr, ch)] = time.perf_counter() - start
+            return result
+
+        shard_writer = None
+        if self.output_mode == "shards":
+            shard_writer = ShardWriter(shard_dir_for(self.output_file, SHARD_DIR), SHARD_COMPRESSION, SHARD_WORKERS)
+        # Chapters still outstanding per book; a book's shard is written when it hits 0
+        pending_chapters = {i + 1: BOOKS[abbr]['chapters'] for i, abbr in enumerate(BOOK_ORDER)}
+        book_keys: Dict[int, List[Tuple[int, int, int]]] = {}
+
+        with tqdm(total=len(tasks), desc=f"Crawling {self.version_name}", unit="chap") as pbar:
+            def on_success(task, result):
+                bc, ch, abbr = task
+                for jul, key, cleaned_text in self.chapter_items(ch, abbr, result):
+                    temp_results[(bc, ch, jul)] = (key, cleaned_text)
+                    book_keys.setdefault(bc, []).append((bc, ch, jul))
+
+            def on_settled(task):
+                bc, ch, abbr = task
+                pbar.update(1)
+                pending_chapters[bc] -= 1
+                if shard_writer is not None and pending_chapters[bc] == 0:
+                    shard_writer.submit_book(abbr, dict(temp_results[k] for k in sorted(book_keys.get(bc, []))))
+
+            try:
+                retry_queue = run_concurrent(
+                    tasks,
+                    timed_fetch,
+                    on_success,
+                    on_settled,
+                    max_workers=10,
+                )
+            finally:
+                self.close_archive()
+
+        if retry_queue.failed:
+            print(f"[{self.version_name}] {retry_queue.summary()}")
+        self.failed_chapters = list(retry_queue.failed)
+        if fetch_seconds:
+            record_costs(fetch_seconds, source="goodtv")
 
         # Sort by bible_code, chapter, jul
         sorted_keys = sorted(temp_results.keys())
@@ -131,26 +197,38 @@ class GoodTVBibleCrawler:
             json_key, text = temp_results[k]
             self.results[json_key] = text
 
-        self.save()
+        if shard_writer is not None:
+            shard_writer.close()
+            print(f"Saved {self.version_name} shards to {shard_writer.shard_dir}")
+        else:
+            self.save()
+
+    def close_archive(self):
+        """Flushes and closes the raw response archive once no more chapters will be fetched."""
+        if self.archive:
+            self.archive.close()
+            self.archive = None
 
     def save(self):
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        write_json_atomic(self.output_file, self.results)
         print(f"Saved {self.version_name} to {self.output_file}")
 
-def crawl_version(v_name):
+def crawl_version(v_name, output_mode=OUTPUT_MODE, archive=ARCHIVE_RAW):
     v_info = VERSIONS[v_name]
-    crawler = GoodTVBibleCrawler(v_name, v_info["id"], v_info["lang"])
+    crawler = GoodTVBibleCrawler(v_name, v_info["id"], v_info["lang"], output_mode, archive)
     crawler.crawl()
-    return v_name, len(crawler.results)
+    return v_name, len(crawler.results), crawler.failed_chapters
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--version", help="Specific version to crawl (krv, kjv, etc.)")
     parser.add_argument("--all", action="store_true", help="Crawl all versions")
     parser.add_argument("--lang", help="Crawl all versions of a specific language (ko, en)")
+    parser.add_argument("--shards", action="store_true", help="Write per-book compressed shards + manifest instead of one JSON file")
+    parser.add_argument("--archive", action="store_true", help="Archive raw API responses for main.py --reparse")
+    parser.add_argument("--profile", action="store_true", help="Sample the crawl and write a flame graph input + hot-function summary")
     args = parser.parse_args()
+    setup_logging(LOG_FILE)
 
     target_versions = []
     if args.version:
@@ -173,19 +251,30 @@ def main():
 
     # Parallel crawl target versions
     results = []
+    failures = {}
     # Use fewer workers for versions to avoid overwhelming the server
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_v = {executor.submit(crawl_version, name): name for name in target_versions}
+    with profiled(f"goodtv-{'-'.join(target_versions) if len(target_versions) < 3 else 'multi'}", enabled=args.profile), \
+            ThreadPoolExecutor(max_workers=5) as executor:
+        output_mode = "shards" if args.shards else OUTPUT_MODE
+        future_to_v = {executor.submit(crawl_version, name, output_mode, args.archive or ARCHIVE_RAW): name for name in target_versions}
         for future in as_completed(future_to_v):
             try:
-                v_name, count = future.result()
+                v_name, count, failed_chapters = future.result()
                 results.append((v_name, count))
+                if failed_chapters:
+                    failures[v_name] = failed_chapters
             except Exception as e:
                 print(f"Error crawling {future_to_v[future]}: {e}")
     
     print("\nCrawl Summary:")
     for v_name, count in results:
         print(f"- {v_name}: {count} verses")
+
+    if failures:
+        print("\n⚠️ Chapters that still failed after retries:")
+        for v_name, failed_chapters in failures.items():
+            chapters = ", ".join(f"{abbr}{ch}" for _, ch, abbr in failed_chapters)
+            print(f"  {v_name}: {chapters}")
     
     # Verify counts within same language
     lang_results = {}
@@ -203,5 +292,14 @@ def main():
                 if VERSIONS[v_name]["lang"] == lang:
                     print(f"  {v_name}: {count}")
 
+    # Per-chapter breakdown of where the crawled versions differ
+    if any(len(set(counts)) > 1 for counts in lang_results.values()):
+        crawled = {f"{v_name}_{VERSIONS[v_name]['lang']}" for v_name, _ in results}
+        outputs = {name: path for name, path in discover_outputs(OUTPUT_DIR, SHARD_DIR).items() if name in crawled}
+        report = divergence.build_report(outputs)
+        write_json_atomic(divergence.REPORT_FILE, report)
+        divergence.print_summary(report)
+        print(f"\n💾 Divergence report: {divergence.REPORT_FILE}")
+
 if __name__ == "__main__":
     main()
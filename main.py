@@ -1,24 +1,60 @@
 import argparse
 import sys
 import logging
+import time
 from crawler import BibleCrawler
 from bible_com_crawler import BibleComCrawler
 from validator import BibleValidator
-from config import VERSION, BIBLE_COM_VERSION_IDS
+from chapter_validation import CrawlAborted
+from config import VERSION, BIBLE_COM_VERSION_IDS, SERVER_HOST, SERVER_PORT, LOG_FILE
+from crawl_logging import setup_logging
+from profiler import profiled
 
 def main():
     parser = argparse.ArgumentParser(description="Bible Crawler & Validator")
     parser.add_argument('--crawl', action='store_true', help="Run the crawler")
     parser.add_argument('--validate', action='store_true', help="Run the validator")
     parser.add_argument('--full', action='store_true', help="Run full pipeline (crawl then validate)")
+    parser.add_argument('--reparse', action='store_true', help="Rebuild outputs from the raw page archive (no network)")
+    parser.add_argument('--serve', action='store_true', help="Serve verse/range/search lookups over HTTP")
+    parser.add_argument('--host', default=SERVER_HOST, help="Server host for --serve")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="Server port for --serve")
+    parser.add_argument('--profile', action='store_true', help="Sample the run and write a flame graph input + hot-function summary")
     
     args = parser.parse_args()
+    setup_logging(LOG_FILE)
     
     # Default to full if no args provided
-    if not (args.crawl or args.validate or args.full):
+    if not (args.crawl or args.validate or args.full or args.serve or args.reparse):
         print("No arguments provided. Use --help to see options.")
         return
 
+    if args.serve:
+        from verse_server import run_server
+        try:
+            run_server(args.host, args.port)
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped.")
+        return
+
+    action = "full" if args.full else "crawl" if args.crawl else "reparse" if args.reparse else "validate"
+    with profiled(f"main-{action}", enabled=args.profile):
+        run(args)
+
+def run(args):
+    if args.reparse:
+        from page_archive import reparse_archives
+        print("♻️ Re-parsing archived pages...")
+        start = time.perf_counter()
+        # Parse in this process when profiling so the sampler sees _parse_verses
+        counts = reparse_archives(max_workers=0 if args.profile else None)
+        if not counts:
+            print("No archives found. Crawl with BIBLE_ARCHIVE=1 first.")
+        for (source, version), count in counts.items():
+            print(f"  - {source}/{version}: {count:,} verses")
+        print(f"✅ Re-parse finished in {time.perf_counter() - start:.1f}s")
+        return
+
     if args.crawl or args.full:
         print(f"🚀 Starting Crawler for version: {VERSION}...")
         
@@ -34,11 +70,18 @@ def main():
         except KeyboardInterrupt:
             print("\n⚠️ Crawling interrupted by user.")
             sys.exit(1)
+        except CrawlAborted as e:
+            print(f"\n🛑 Crawling aborted early: {e}")
+            sys.exit(1)
         except Exception as e:
             print(f"❌ Crawling failed: {e}")
             sys.exit(1)
 
-    if args.validate or args.full:
+    if args.full:
+        # Chapters were already checked while crawling; only the whole-corpus checks remain
+        print("\n🔍 Validating crawled data...")
+        BibleValidator().run_on(crawler.results)
+    elif args.validate:
         print("\n🔍 Starting Validation...")
         validator = BibleValidator()
         validator.run()
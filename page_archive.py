@@ -0,0 +1,280 @@
+"""
+WARC-style archive of raw crawler responses, and offline re-parsing from it.
+
+Each crawler can append every response it receives to
+output/archive/<source>_<version>.warc.gz. A record is one gzip member holding
+a JSON header line (source, version, book, chapter, url, status, fetched_at,
+length) followed by `length` bytes of the raw body. Members are only ever
+appended, so a crash loses at most the record being written. A torn member
+left by a killed crawl is cut off when the archive is next opened for writing,
+and readers skip over any damaged member to the next intact one.
+
+`python main.py --reparse` rebuilds every version from the archive with the
+current _parse_verses logic on all CPU cores, without touching the network.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from config import ARCHIVE_DIR, OUTPUT_DIR
+from corpus import output_file_for
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id
+
+ARCHIVE_SUFFIX = ".warc.gz"
+REPARSE_BATCH = 64  # records per worker task
+GZIP_MAGIC = b"\x1f\x8b\x08"  # gzip id bytes + deflate method, the start of every member
+READ_CHUNK = 1 << 16
+
+
+def archive_path_for(source: str, version: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir, f"{source}_{version}{ARCHIVE_SUFFIX}")
+
+
+class ArchiveWriter:
+    """Thread-safe appender; one instance per archive file."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            _truncate_torn_tail(path)
+        self.file = open(path, 'ab')
+
+    @classmethod
+    def for_version(cls, source: str, version: str) -> "ArchiveWriter":
+        return cls(archive_path_for(source, version))
+
+    def write(self, source: str, version: str, book_abbr: str, chapter: int, url: str,
+              status: int, body: str):
+        payload = body.encode('utf-8')
+        header = {
+            "source": source,
+            "version": version,
+            "book": book_abbr,
+            "chapter": chapter,
+            "url": url,
+            "status": status,
+            "fetched_at": time.time(),
+            "length": len(payload),
+        }
+        record = json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n" + payload
+        # Compress outside the lock; only the append is serialized
+        member = gzip.compress(record, compresslevel=6)
+        with self.lock:
+            self.file.write(member)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _read_member(data, offset: int) -> Tuple[bytes, int]:
+    """Decompresses the gzip member starting at `offset`; returns (record, end offset)."""
+    decompressor = zlib.decompressobj(wbits=31)
+    parts = []
+    pos = offset
+    while not decompressor.eof:
+        if pos >= len(data):
+            raise EOFError("gzip member ends before its trailer")
+        chunk = data[pos:pos + READ_CHUNK]
+        pos += len(chunk)
+        parts.append(decompressor.decompress(chunk))
+    return b"".join(parts), pos - len(decompressor.unused_data)
+
+
+def _iter_members(path: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    (end offset, record) per intact gzip member. After a damaged member the scan
+    resumes at the next gzip header, so records appended after a torn one survive.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset < len(data):
+                try:
+                    record, end = _read_member(data, offset)
+                except (EOFError, zlib.error) as e:
+                    logging.warning(f"Skipping damaged record at byte {offset} of {path}: {e}")
+                    offset = data.find(GZIP_MAGIC, offset + 1)
+                    if offset < 0:
+                        return
+                    continue
+                yield end, record
+                offset = end
+
+
+def _truncate_torn_tail(path: str) -> int:
+    """Cuts bytes after the last intact member (a crash mid-append); returns how many were removed."""
+    intact = 0
+    for end, _ in _iter_members(path):
+        intact = end
+    torn = os.path.getsize(path) - intact
+    if torn:
+        logging.warning(f"Removing {torn} bytes of torn record from the end of {path}")
+        with open(path, 'r+b') as f:
+            f.truncate(intact)
+    return torn
+
+
+def iter_records(path: str) -> Iterator[Tuple[Dict, str]]:
+    """Yields (header, body) in write order. Damaged or truncated records are skipped."""
+    for _, record in _iter_members(path):
+        line, _, payload = record.partition(b"\n")
+        try:
+            header = json.loads(line)
+            length = header["length"]
+        except (ValueError, KeyError) as e:
+            logging.warning(f"Skipping record with a bad header in {path}: {e}")
+            continue
+        if len(payload) != length:
+            logging.warning(f"Skipping record of {length} bytes with {len(payload)} in {path}")
+            continue
+        yield header, payload.decode('utf-8')
+
+
+# Parsers are built lazily once per worker process
+_parsers = {}
+
+
+def _parser_for(source: str, version: str):
+    parser = _parsers.get((source, version))
+    if parser is None:
+        if source == "bskorea":
+            from crawler import BibleCrawler
+            parser = BibleCrawler(version, archive=False)
+        elif source == "biblecom":
+            from bible_com_crawler import BibleComCrawler
+            parser = BibleComCrawler(version, archive=False)
+        else:
+            from goodtv_crawler import GoodTVBibleCrawler, VERSIONS
+            parser = GoodTVBibleCrawler(version, VERSIONS[version]["id"], VERSIONS[version]["lang"], archive=False)
+        _parsers[(source, version)] = parser
+    return parser
+
+
+def parse_record(header: Dict, body: str) -> Dict[str, str]:
+    """Runs the current parser of the record's crawler over its archived body."""
+    parser = _parser_for(header["source"], header["version"])
+    book_abbr, chapter = header["book"], header["chapter"]
+    if header["source"] == "goodtv":
+        result = parser.parse_payload(json.loads(body))
+        return {key: text for _, key, text in parser.chapter_items(chapter, book_abbr, result)}
+    return parser._parse_verses(book_abbr, chapter, body)
+
+
+def _parse_batch(batch: List[Tuple[Dict, str]]) -> List[Tuple[str, str, str, int, Optional[Dict[str, str]]]]:
+    """Parsed verses per record; None when the parser raised or found no verses."""
+    results = []
+    for header, body in batch:
+        try:
+            verses = parse_record(header, body) or None
+            if verses is None:
+                logging.error(f"Re-parse found no verses in {header.get('url')}")
+        except Exception as e:
+            logging.error(f"Re-parse failed for {header.get('url')}: {e}")
+            verses = None
+        results.append((header["source"], header["version"], header["book"], header["chapter"], verses))
+    return results
+
+
+def _previous_chapters(path: str, wanted: Set[str]) -> Dict[str, str]:
+    """Verses of the `wanted` chapter labels ("창1") from the existing output file, if any."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read {path} to keep failed chapters: {e}")
+        return {}
+    return {key: text for key, text in data.items() if key.rpartition(":")[0] in wanted}
+
+
+def _latest_records(paths: List[str]) -> Iterator[Tuple[Dict, str]]:
+    """Only the newest successful response per (source, version, book, chapter)."""
+    for path in paths:
+        latest: Dict[Tuple, Tuple[Dict, str]] = {}
+        for header, body in iter_records(path):
+            if header.get("status") == 200:
+                latest[(header["source"], header["version"], header["book"], header["chapter"])] = (header, body)
+        yield from latest.values()
+
+
+def reparse_archives(archive_dir: str = ARCHIVE_DIR, output_dir: Optional[str] = None,
+                     max_workers: Optional[int] = None) -> Dict[Tuple[str, str], int]:
+    """
+    Rebuilds one output file per archived (source, version). Returns verse counts.
+    Batches of records are parsed on a process pool sized to the CPU count;
+    max_workers=0 parses in this process (e.g. under the sampling profiler).
+    Chapters that fail to parse keep their verses from the existing output file.
+    """
+    paths = sorted(glob.glob(os.path.join(archive_dir, f"*{ARCHIVE_SUFFIX}")))
+    chapters: Dict[Tuple[str, str], Dict[Tuple[str, int], Dict[str, str]]] = {}
+
+    def batches() -> Iterator[List[Tuple[Dict, str]]]:
+        batch: List[Tuple[Dict, str]] = []
+        for record in _latest_records(paths):
+            batch.append(record)
+            if len(batch) >= REPARSE_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    failed: Dict[Tuple[str, str], Set[str]] = {}
+
+    def collect(results: List[Tuple[str, str, str, int, Optional[Dict[str, str]]]]):
+        for source, version, book_abbr, chapter, verses in results:
+            by_chapter = chapters.setdefault((source, version), {})
+            if verses is None:
+                failed.setdefault((source, version), set()).add(f"{book_abbr}{chapter}")
+            else:
+                by_chapter[(book_abbr, chapter)] = verses
+
+    if max_workers == 0:
+        for batch in batches():
+            collect(_parse_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_parse_batch, batch) for batch in batches()]
+            for future in futures:
+                collect(future.result())
+
+    counts = {}
+    for (source, version), by_chapter in chapters.items():
+        path = output_file_for(source, version, output_dir or OUTPUT_DIR)
+        verses: Dict[str, str] = {}
+        if (source, version) in failed:
+            labels = failed[(source, version)]
+            verses.update(_previous_chapters(path, labels))
+            print(f"⚠️ {source}/{version}: {len(labels)} chapters failed to parse, kept from the previous output")
+        for chapter_verses in by_chapter.values():
+            verses.update(chapter_verses)
+        if not verses:
+            logging.error(f"No verses parsed for {source}/{version}; leaving {path} untouched")
+            continue
+        ordered = {key: verses[key] for key in sorted(verses, key=lambda k: key_to_verse_id(k) or 0)}
+        write_json_atomic(path, ordered)
+        counts[(source, version)] = len(ordered)
+    return counts
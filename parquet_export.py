@@ -0,0 +1,209 @@
+"""
+Columnar export of all crawled versions to Parquet and Arrow IPC.
+
+Columns (one row per verse per version):
+    version     dictionary<int8, string>   e.g. "krv", "niv_en"
+    lang        dictionary<int8, string>   "ko" / "en"
+    book        int8                       1-66 in canonical order
+    book_abbr   dictionary<int8, string>   books_data abbreviation
+    chapter     int16
+    verse       int16
+    verse_id    int32                      BBCCCVVV from verse_keys
+    text        string
+
+Rows are sorted by (book, version, verse_id) and the Parquet file has one row
+group per book, so a filter on book (or verse_id) skips whole row groups via
+their min/max statistics and only the requested columns are decoded. The Arrow
+IPC file is uncompressed and can be memory-mapped without a copy.
+
+    python parquet_export.py                 # output/bible.parquet + output/bible.arrow
+    python parquet_export.py --bench         # load-time comparison against the JSON outputs
+
+    read_corpus(books=["창"], columns=["version", "verse_id", "text"]).to_pandas()
+
+Requires pyarrow (pip install pyarrow); pandas only for to_pandas().
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from books_data import BOOK_ORDER
+from config import OUTPUT_DIR
+from corpus import discover_outputs, iter_verses, load_version, version_lang
+from verse_keys import BOOK_INDEX
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PARQUET_PATH = os.path.join(OUTPUT_DIR, "bible.parquet")
+ARROW_PATH = os.path.join(OUTPUT_DIR, "bible.arrow")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)")
+
+
+def _schema() -> "pa.Schema":
+    return pa.schema([
+        ("version", pa.dictionary(pa.int8(), pa.string())),
+        ("lang", pa.dictionary(pa.int8(), pa.string())),
+        ("book", pa.int8()),
+        ("book_abbr", pa.dictionary(pa.int8(), pa.string())),
+        ("chapter", pa.int16()),
+        ("verse", pa.int16()),
+        ("verse_id", pa.int32()),
+        ("text", pa.string()),
+    ])
+
+
+def _dictionary(indices: List[int], values: List[str]) -> "pa.DictionaryArray":
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int8()), pa.array(values, pa.string()))
+
+
+def build_book_tables(outputs: Dict[str, str]) -> Iterable["pa.Table"]:
+    """Yields one table per book (in canonical order), rows sorted by (version, verse_id)."""
+    _require_pyarrow()
+    names = list(outputs)
+    langs = sorted({version_lang(name) for name in names})
+    # book number -> rows of (version index, verse_id, chapter, verse, text)
+    by_book: Dict[int, List[tuple]] = {}
+    for version_index, name in enumerate(names):
+        for vid, abbr, chapter, verse, text in iter_verses(load_version(outputs[name])):
+            by_book.setdefault(BOOK_INDEX[abbr] + 1, []).append((version_index, vid, chapter, verse, text))
+
+    schema = _schema()
+    for book in sorted(by_book):
+        rows = sorted(by_book[book])
+        version_indices = [row[0] for row in rows]
+        yield pa.Table.from_arrays([
+            _dictionary(version_indices, names),
+            _dictionary([langs.index(version_lang(names[i])) for i in version_indices], langs),
+            pa.array([book] * len(rows), pa.int8()),
+            _dictionary([book - 1] * len(rows), BOOK_ORDER),
+            pa.array([row[2] for row in rows], pa.int16()),
+            pa.array([row[3] for row in rows], pa.int16()),
+            pa.array([row[1] for row in rows], pa.int32()),
+            pa.array([row[4] for row in rows], pa.string()),
+        ], schema=schema)
+
+
+def export_columnar(outputs: Optional[Dict[str, str]] = None, parquet_path: Optional[str] = PARQUET_PATH,
+                    arrow_path: Optional[str] = ARROW_PATH, compression: str = "zstd") -> int:
+    """
+    Writes the Parquet file (one row group per book) and/or the Arrow IPC file.
+    Both go through a temp file + rename. Returns the number of rows written.
+    """
+    _require_pyarrow()
+    if outputs is None:
+        outputs = discover_outputs()
+
+    schema = _schema()
+    tmp_paths = [f"{path}.tmp" for path in (parquet_path, arrow_path) if path]
+    writers = []
+    rows = 0
+    try:
+        try:
+            if parquet_path:
+                os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+                writers.append((parquet_path, pq.ParquetWriter(f"{parquet_path}.tmp", schema, compression=compression)))
+            if arrow_path:
+                os.makedirs(os.path.dirname(arrow_path) or ".", exist_ok=True)
+                writers.append((arrow_path, pa.ipc.new_file(f"{arrow_path}.tmp", schema)))
+
+            for table in build_book_tables(outputs):
+                rows += table.num_rows
+                for _, writer in writers:
+                    if isinstance(writer, pq.ParquetWriter):
+                        # row_group_size >= table size: exactly one row group per book
+                        writer.write_table(table, row_group_size=table.num_rows)
+                    else:
+                        writer.write_table(table)
+        finally:
+            for _, writer in writers:
+                writer.close()
+        for path, _ in writers:
+            os.replace(f"{path}.tmp", path)
+    finally:
+        # A failed export leaves no half-written temp files behind
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return rows
+
+
+def read_corpus(path: str = PARQUET_PATH, versions: Optional[List[str]] = None,
+                books: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> "pa.Table":
+    """
+    Reads the Parquet export with filters pushed down to row groups.
+    `books` takes books_data abbreviations (e.g. ["창", "출"]).
+    """
+    _require_pyarrow()
+    filters = []
+    if books:
+        filters.append(("book", "in", [BOOK_INDEX[abbr] + 1 for abbr in books]))
+    if versions:
+        filters.append(("version", "in", versions))
+    return pq.read_table(path, columns=columns, filters=filters or None)
+
+
+def read_arrow(path: str = ARROW_PATH) -> "pa.Table":
+    """Memory-maps the Arrow IPC file; columns are not copied until touched."""
+    _require_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def run_benchmark(outputs: Dict[str, str], parquet_path: str, arrow_path: str):
+    import pandas as pd
+
+    start = time.perf_counter()
+    frames = []
+    for name, path in outputs.items():
+        data = load_version(path)
+        frames.append(pd.DataFrame({"version": name, "key": list(data.keys()), "text": list(data.values())}))
+    pd.concat(frames, ignore_index=True)
+    print(f"  JSON -> DataFrame            : {time.perf_counter() - start:6.3f}s (keys still unparsed)")
+
+    start = time.perf_counter()
+    df = read_corpus(parquet_path).to_pandas()
+    print(f"  Parquet -> DataFrame         : {time.perf_counter() - start:6.3f}s ({len(df):,} rows)")
+
+    start = time.perf_counter()
+    read_corpus(parquet_path, books=["창"], columns=["version", "verse_id", "text"]).to_pandas()
+    print(f"  Parquet, 창 only, 3 columns  : {time.perf_counter() - start:6.3f}s")
+
+    start = time.perf_counter()
+    read_arrow(arrow_path).to_pandas()
+    print(f"  Arrow IPC (mmap) -> DataFrame: {time.perf_counter() - start:6.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export crawled versions to Parquet and Arrow IPC")
+    parser.add_argument("--parquet", default=PARQUET_PATH, help=f"Parquet path (default: {PARQUET_PATH})")
+    parser.add_argument("--arrow", default=ARROW_PATH, help=f"Arrow IPC path (default: {ARROW_PATH})")
+    parser.add_argument("--bench", action="store_true", help="Compare load times after exporting")
+    args = parser.parse_args()
+
+    outputs = discover_outputs()
+    if not outputs:
+        print(f"No crawl outputs found in {OUTPUT_DIR}.")
+        return
+
+    start = time.perf_counter()
+    rows = export_columnar(outputs, args.parquet, args.arrow)
+    print(f"💾 {rows:,} rows from {len(outputs)} versions in {time.perf_counter() - start:.2f}s")
+    print(f"  - {args.parquet} ({os.path.getsize(args.parquet) / (1024 * 1024):.1f} MB)")
+    print(f"  - {args.arrow} ({os.path.getsize(args.arrow) / (1024 * 1024):.1f} MB)")
+    if args.bench:
+        run_benchmark(outputs, args.parquet, args.arrow)
+
+
+if __name__ == "__main__":
+    main()
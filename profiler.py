@@ -0,0 +1,241 @@
+"""
+Sampling profiler for crawl and parse runs (main.py --profile, goodtv_crawler.py --profile).
+
+A daemon thread wakes every PROFILE_INTERVAL seconds and records the Python stack
+of every other thread from sys._current_frames(), so ThreadPoolExecutor workers
+are covered and the profiled code runs without tracing hooks.
+
+Written to output/profiles/<label>-<timestamp>.*:
+    .collapsed   "thread;module:function;... count" per unique stack, the input
+                 format of flamegraph.pl, speedscope and inferno
+    .txt         fetch/parse/write split and the top-N functions by self and total samples
+
+    python profiler.py parse                             # _parse_verses on sample.html, offline
+    python profiler.py parse page.html --book 시 --chapter 119 --repeat 50
+    python main.py --reparse --profile                   # archived pages, parsed in-process
+
+    flamegraph.pl output/profiles/main-crawl-*.collapsed > crawl.svg
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import PROFILE_DIR, PROFILE_INTERVAL, PROFILE_TOP
+
+# Stacks are classified by their innermost frame that matches one of these
+PHASE_MODULES = {
+    "fetch": ("requests", "urllib3", "http", "ssl", "socket", "selectors"),
+    "parse": ("bs4", "lxml", "html", "json.decoder"),
+    "write": ("shard_store", "json.encoder", "gzip", "zlib"),
+}
+PHASE_FUNCTIONS = {
+    "fetch": ("fetch_chapter", "_request_chapter", "timed_fetch"),
+    "parse": ("_parse_verses", "parse_payload", "chapter_items", "clean_text", "parse_record"),
+    "write": ("write_json_atomic", "save", "save_to_json", "write"),
+}
+# A thread whose innermost frame is in these modules is waiting, not working
+IDLE_MODULES = ("threading", "queue", "concurrent.futures._base", "concurrent.futures.thread")
+# ... or is one of these frames (the crawl_logging listener blocks in SimpleQueue.get, a C call)
+IDLE_FRAMES = ("logging.handlers:dequeue",)
+
+_WORKER_SUFFIX = re.compile(r'_\d+$')
+
+
+def _thread_label(name: str) -> str:
+    """
+    "ThreadPoolExecutor-0_3" -> "ThreadPoolExecutor-0": workers of one pool share a flame graph root.
+    Spaces ("Thread-2 (_monitor)") would break the collapsed format and become "_".
+    """
+    return _WORKER_SUFFIX.sub("", name).replace(" ", "_")
+
+
+def _in(module: str, packages: Tuple[str, ...]) -> bool:
+    return any(module == p or module.startswith(p + ".") for p in packages)
+
+
+def classify(stack: Tuple[str, ...]) -> str:
+    """Phase of one stack (root first): idle, fetch, parse, write or other."""
+    if stack and (stack[-1] in IDLE_FRAMES or _in(stack[-1].partition(":")[0], IDLE_MODULES)):
+        return "idle"
+    for frame in reversed(stack):
+        module, _, function = frame.partition(":")
+        for phase in PHASE_MODULES:
+            if _in(module, PHASE_MODULES[phase]) or function in PHASE_FUNCTIONS[phase]:
+                return phase
+    return "other"
+
+
+class SamplingProfiler:
+    """Samples all threads of this process; use as a context manager or start()/stop()."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()  # (thread label, stack root first) -> samples
+        self.ticks = 0
+        self.sampling_seconds = 0.0
+        self.wall_seconds = 0.0
+        self._labels: Dict = {}  # code object -> "module:function"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def _frame_label(self, frame) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[(_thread_label(names.get(ident, str(ident))), tuple(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            self._sample()
+            self.sampling_seconds += time.perf_counter() - start
+            self.ticks += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.wall_seconds += time.perf_counter() - self._started
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def collapsed(self) -> List[str]:
+        return [f"{';'.join((thread,) + stack)} {count}"
+                for (thread, stack), count in sorted(self.stacks.items())]
+
+    def phase_samples(self) -> Counter:
+        phases: Counter = Counter()
+        for (_, stack), count in self.stacks.items():
+            phases[classify(stack)] += count
+        return phases
+
+    def hot_functions(self) -> Tuple[Counter, Counter]:
+        """(self samples, total samples) per function, idle stacks excluded."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for (_, stack), count in self.stacks.items():
+            if not stack or classify(stack) == "idle":
+                continue
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+        return own, total
+
+    def summary(self, top: int = PROFILE_TOP) -> str:
+        busy = sum(self.stacks.values())
+        phases = self.phase_samples()
+        overhead = self.sampling_seconds / self.wall_seconds if self.wall_seconds else 0.0
+        lines = [f"⏱️ {self.ticks:,} ticks over {self.wall_seconds:.1f}s, {busy:,} thread samples "
+                 f"(sampler overhead {overhead:.1%})"]
+        working = busy - phases["idle"]
+        for phase in ("fetch", "parse", "write", "other"):
+            share = phases[phase] / working if working else 0.0
+            lines.append(f"  {phase:<6} {phases[phase]:>8,} samples  {share:6.1%}")
+        lines.append(f"  idle   {phases['idle']:>8,} samples  (waiting threads, excluded below)")
+
+        own, total = self.hot_functions()
+        lines.append(f"\nTop {top} by self samples:")
+        lines += [f"  {count:>8,}  {label}" for label, count in own.most_common(top)]
+        lines.append(f"\nTop {top} by total samples:")
+        lines += [f"  {count:>8,}  {label}" for label, count in total.most_common(top)]
+        return "\n".join(lines)
+
+    def save(self, label: str, profile_dir: str = PROFILE_DIR, top: int = PROFILE_TOP) -> Tuple[str, str]:
+        """Writes <label>-<timestamp>.collapsed and .txt; returns both paths."""
+        os.makedirs(profile_dir, exist_ok=True)
+        base = os.path.join(profile_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}")
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(self.summary(top) + "\n")
+        return f"{base}.collapsed", f"{base}.txt"
+
+
+@contextmanager
+def profiled(label: str, enabled: bool = True, profile_dir: str = PROFILE_DIR) -> Iterator[Optional[SamplingProfiler]]:
+    """Profiles the block when enabled; results are saved and summarized even if it raises."""
+    if not enabled:
+        yield None
+        return
+    profiler = SamplingProfiler().start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        collapsed_path, summary_path = profiler.save(label, profile_dir)
+        print(f"\n{profiler.summary()}")
+        print(f"\n🔥 Flame graph input: {collapsed_path}")
+        print(f"📄 Summary: {summary_path}")
+
+
+def profile_parse(html_path: str, source: str = "bskorea", book_abbr: str = "창", chapter: int = 1,
+                  repeat: int = 100) -> int:
+    """Runs a crawler's _parse_verses over a saved page `repeat` times under the profiler."""
+    with open(html_path, encoding='utf-8') as f:
+        html = f.read()
+    if source == "biblecom":
+        from bible_com_crawler import BibleComCrawler
+        parser = BibleComCrawler(archive=False)
+    else:
+        from crawler import BibleCrawler
+        parser = BibleCrawler(archive=False)
+
+    with profiled(f"parse-{source}"):
+        for _ in range(repeat):
+            verses = parser._parse_verses(book_abbr, chapter, html)
+    return len(verses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sampling profiler for crawl and parse runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parse = subparsers.add_parser("parse", help="Profile _parse_verses on a saved page (no network)")
+    parse.add_argument("html", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.html"))
+    parse.add_argument("--source", choices=["bskorea", "biblecom"], default="bskorea")
+    parse.add_argument("--book", default="창")
+    parse.add_argument("--chapter", type=int, default=1)
+    parse.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    count = profile_parse(args.html, args.source, args.book, args.chapter, args.repeat)
+    print(f"✅ {args.repeat} parses, {count} verses each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Deferred retry queue for chapter fetches.
+
+A failed chapter is not retried inline (which used to stall the crawl for
+2 + 4 + 8 seconds). It is scheduled with jittered exponential backoff and
+picked up again between new requests, so transient errors overlap with useful
+work instead of adding to wall-clock time. Each task has an attempt budget;
+tasks that exhaust it end up in `failed` for the final summary.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from config import MAX_RETRIES, RETRY_BACKOFF
+
+MAX_RETRY_DELAY = 60.0  # seconds
+RETRY_JITTER = 0.5      # delay is multiplied by uniform(1 - jitter, 1 + jitter)
+
+
+class RetryQueue:
+    """Min-heap of (due_time, task). Not thread-safe: drive it from one thread."""
+
+    def __init__(self, max_retries: int = MAX_RETRIES, backoff: float = RETRY_BACKOFF,
+                 max_delay: float = MAX_RETRY_DELAY, jitter: float = RETRY_JITTER):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.heap: List = []
+        self.queued: set = set()
+        self.attempts: Dict[Hashable, int] = {}
+        self.failed: Dict[Hashable, str] = {}
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.queued)
+
+    def __contains__(self, task: Hashable) -> bool:
+        return task in self.queued
+
+    def record_failure(self, task: Hashable, error: Any) -> bool:
+        """
+        Schedules a retry for `task`. Returns False once its attempt budget is spent
+        (the task is then listed in `failed`). A task already waiting is not queued twice.
+        """
+        if task in self.queued:
+            return True
+        retries = self.attempts.get(task, 0) + 1
+        self.attempts[task] = retries
+        if retries > self.max_retries:
+            self.failed[task] = str(error)
+            logging.critical(f"Giving up on {task} after {self.max_retries} retries: {error}",
+                             extra={"task": str(task), "attempt": retries})
+            return False
+
+        delay = min(self.backoff ** retries, self.max_delay)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(self.heap, (time.monotonic() + delay, next(self.counter), task))
+        self.queued.add(task)
+        logging.error(f"Error fetching {task}: {error}. Retry {retries}/{self.max_retries} in {delay:.1f}s",
+                      extra={"task": str(task), "attempt": retries})
+        return True
+
+    def record_success(self, task: Hashable):
+        self.failed.pop(task, None)
+
+    def pop_due(self, now: Optional[float] = None) -> List[Hashable]:
+        now = time.monotonic() if now is None else now
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, task = heapq.heappop(self.heap)
+            self.queued.discard(task)
+            due.append(task)
+        return due
+
+    def next_due_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next retry is due (0 if overdue), None if the queue is empty."""
+        if not self.heap:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.heap[0][0] - now)
+
+    def summary(self) -> str:
+        if not self.failed:
+            return "✅ All chapters fetched."
+        lines = [f"⚠️ {len(self.failed)} chapters still failed after {self.max_retries} retries:"]
+        for task, error in self.failed.items():
+            lines.append(f"  - {task}: {error}")
+        return "\n".join(lines)
+
+
+def run_sequential(tasks: Iterable[Hashable], attempt: Callable[[Hashable], Any],
+                   on_success: Callable[[Hashable, Any], None],
+                   on_settled: Optional[Callable[[Hashable], None]] = None,
+                   delay: float = 0.0, retry_queue: Optional[RetryQueue] = None) -> RetryQueue:
+    """
+    Runs `attempt(task)` for every task, one at a time with `delay` between requests.
+    Exceptions send the task to the retry queue; due retries are interleaved with new tasks.
+    `on_settled(task)` is called once per task when it succeeded or ran out of retries.
+    """
+    queue = retry_queue if retry_queue is not None else RetryQueue()
+
+    def run_one(task):
+        try:
+            result = attempt(task)
+        except Exception as e:
+            if queue.record_failure(task, e):
+                return
+        else:
+            queue.record_success(task)
+            on_success(task, result)
+        if on_settled:
+            on_settled(task)
+
+    for task in tasks:
+        run_one(task)
+        time.sleep(delay)
+        for retry_task in queue.pop_due():
+            run_one(retry_task)
+            time.sleep(delay)
+
+    # Only retries left: sleep until the next one is due
+    while len(queue):
+        time.sleep(queue.next_due_in())
+        for retry_task in queue.pop_due():
+            run_one(retry_task)
+            time.sleep(delay)
+    return queue
+
+
+def run_concurrent(tasks: Iterable[Hashable], attempt: Callable[[Hashable], Any],
+                   on_success: Callable[[Hashable, Any], None],
+                   on_settled: Optional[Callable[[Hashable], None]] = None,
+                   max_workers: int = 10, retry_queue: Optional[RetryQueue] = None) -> RetryQueue:
+    """
+    Same contract as run_sequential, on a thread pool. Callbacks run on the calling
+    thread; retries are resubmitted to the pool as soon as they come due.
+    """
+    queue = retry_queue if retry_queue is not None else RetryQueue()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(attempt, task): task for task in tasks}
+        while running or len(queue):
+            if running:
+                done, _ = wait(running, timeout=queue.next_due_in(), return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(queue.next_due_in())
+                done = set()
+
+            for future in done:
+                task = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if queue.record_failure(task, e):
+                        continue
+                else:
+                    queue.record_success(task)
+                    on_success(task, result)
+                if on_settled:
+                    on_settled(task)
+
+            for retry_task in queue.pop_due():
+                running[executor.submit(attempt, retry_task)] = retry_task
+    return queue
@@ -0,0 +1,201 @@
+"""
+Per-book sharded output with a manifest.
+
+Layout for one version (e.g. output/shards/bible_krv/):
+    manifest.json       # compression, per-book file name, verse counts, sha256
+    01_gen.json.gz      # {"창1:1": "...", ...} for one book
+    ...
+
+Shards are written through a temp file + os.replace, so a crash never leaves a
+half-written file behind. The manifest is written last; a directory without a
+manifest is an incomplete crawl.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional
+
+from books_data import BOOKS, BOOK_ORDER
+from verse_keys import parse_key, BOOK_INDEX
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_NAME = "manifest.json"
+COMPRESSION_SUFFIX = {
+    "none": ".json",
+    "gzip": ".json.gz",
+    "zstd": ".json.zst",
+}
+
+
+def write_json_atomic(path: str, data, indent: Optional[int] = 2):
+    """json.dump into a temp file next to `path`, then rename over it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def shard_dir_for(output_file: str, shard_root: str) -> str:
+    """output/bible_krv.json -> <shard_root>/bible_krv"""
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    return os.path.join(shard_root, stem)
+
+
+def _encode(payload: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=6)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(payload)
+    return payload
+
+
+def _decode(payload: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(payload)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd shards (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def group_by_book(verses: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """Splits a flat {key: text} dict into {book_abbr: {key: text}}, keys kept in input order."""
+    books: Dict[str, Dict[str, str]] = {}
+    for key, text in verses.items():
+        parsed = parse_key(key)
+        if parsed is None:
+            logging.warning(f"Skipping unparseable key while sharding: {key}")
+            continue
+        books.setdefault(parsed[0], {})[key] = text
+    return books
+
+
+class ShardWriter:
+    """
+    Writes one shard per book on a background pool as soon as the book is complete,
+    then the manifest on close().
+    """
+
+    def __init__(self, shard_dir: str, compression: str = "gzip", max_workers: int = 4):
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Unknown shard compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logging.warning("zstandard not installed, falling back to gzip shards")
+            compression = "gzip"
+        self.shard_dir = shard_dir
+        self.compression = compression
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures: List[Future] = []
+        self.entries: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        os.makedirs(shard_dir, exist_ok=True)
+
+    def submit_book(self, book_abbr: str, verses: Dict[str, str]):
+        """Queues one book's verses for writing. `verses` is copied, so callers may keep mutating theirs."""
+        self.futures.append(self.executor.submit(self._write_book, book_abbr, dict(verses)))
+
+    def _write_book(self, book_abbr: str, verses: Dict[str, str]):
+        book_no = BOOK_INDEX[book_abbr] + 1
+        filename = f"{book_no:02d}_{BOOKS[book_abbr]['url_abbr']}{COMPRESSION_SUFFIX[self.compression]}"
+        payload = json.dumps(verses, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data = _encode(payload, self.compression)
+
+        path = os.path.join(self.shard_dir, filename)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        chapters: Dict[str, int] = {}
+        for key in verses:
+            parsed = parse_key(key)
+            if parsed:
+                chapters[str(parsed[1])] = chapters.get(str(parsed[1]), 0) + 1
+
+        with self.lock:
+            self.entries[book_abbr] = {
+                "file": filename,
+                "verses": len(verses),
+                "chapters": chapters,
+                "sha256": hashlib.sha256(payload).hexdigest(),
+                "bytes": len(data),
+            }
+
+    def close(self) -> Dict:
+        """Waits for pending shards and writes the manifest. Returns the manifest."""
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.executor.shutdown(wait=True)
+
+        books = {abbr: self.entries[abbr] for abbr in BOOK_ORDER if abbr in self.entries}
+        manifest = {
+            "format": 1,
+            "compression": self.compression,
+            "total_verses": sum(entry["verses"] for entry in books.values()),
+            "books": books,
+        }
+        write_json_atomic(os.path.join(self.shard_dir, MANIFEST_NAME), manifest)
+        return manifest
+
+
+def write_shards(verses: Dict[str, str], shard_dir: str, compression: str = "gzip",
+                 max_workers: int = 4) -> Dict:
+    """Shards an already collected {key: text} dict in one call."""
+    writer = ShardWriter(shard_dir, compression, max_workers)
+    for book_abbr, book_verses in group_by_book(verses).items():
+        writer.submit_book(book_abbr, book_verses)
+    return writer.close()
+
+
+class ShardReader:
+    """Reads the manifest once and opens only the shards that are asked for."""
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        with open(os.path.join(shard_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.compression = self.manifest["compression"]
+
+    def books(self) -> List[str]:
+        return list(self.manifest["books"].keys())
+
+    def load_book(self, book_abbr: str, verify: bool = False) -> Dict[str, str]:
+        entry = self.manifest["books"].get(book_abbr)
+        if entry is None:
+            return {}
+        with open(os.path.join(self.shard_dir, entry["file"]), 'rb') as f:
+            payload = _decode(f.read(), self.compression)
+        if verify and hashlib.sha256(payload).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for shard {entry['file']}")
+        return json.loads(payload.decode('utf-8'))
+
+    def load_all(self, verify: bool = False) -> Dict[str, str]:
+        verses: Dict[str, str] = {}
+        for book_abbr in self.books():
+            verses.update(self.load_book(book_abbr, verify=verify))
+        return verses
@@ -0,0 +1,364 @@
+"""
+Offline "related verses" index: one sparse TF-IDF matrix per crawled version.
+
+Features are hashed n-grams, so no vocabulary is stored and every version
+shares one feature space (a krv verse can query the snkv index directly):
+    ko  character 2- and 3-grams inside Hangul runs
+    en  case-folded words and word bigrams
+Weights are (1 + log tf) * idf, rows L2-normalized, so a dot product is the
+cosine similarity. n-grams in more than MAX_DF_RATIO of a version's verses
+("하나", "the") are dropped; they match everything and say little.
+
+Files in output/similar/<version>/ (numpy .npy, opened with mmap_mode="r"):
+    verse_ids.npy       row -> verse id (BBCCCVVV), ascending
+    row_ptr.npy         CSR offsets per row
+    row_cols.npy        CSR column per nonzero (position in feat_keys)
+    row_vals.npy        CSR weight per nonzero
+    feat_keys.npy       sorted feature hashes; column = position
+    feat_idf.npy        idf per column
+    col_ptr.npy         CSC offsets per column (the inverted index)
+    col_rows.npy        CSC row per nonzero
+    col_vals.npy        CSC weight per nonzero
+    topk_rows.npy       (rows x TOP_K) precomputed most similar rows
+    topk_scores.npy     (rows x TOP_K) their cosine similarity
+    meta.json           written last; a directory without it is an incomplete build
+
+The top-k table comes from batched sparse products X[batch] @ X.T, done as
+posting-list expansion plus one bincount per batch. Queries for another
+version, or for free text, use the same product for a single row.
+
+    python similar_verses.py build
+    python similar_verses.py related 요3:16 --version krv
+    python similar_verses.py related 요3:16 --version krv --in snkv
+    python similar_verses.py query "하나님이 세상을 이처럼 사랑하사" --version krv
+"""
+
+import argparse
+import json
+import os
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from concordance import tokenize
+from config import OUTPUT_DIR
+from corpus import discover_outputs, iter_verses, load_version, version_lang
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id, split_verse_id
+
+SIMILAR_DIR = os.path.join(OUTPUT_DIR, "similar")
+
+TOP_K = 20
+MAX_DF_RATIO = 0.05
+MIN_DF_LIMIT = 10           # small corpora keep every n-gram in up to this many verses
+CHAR_NGRAMS = (2, 3)
+FEATURE_BITS = 31           # hashes fit a non-negative int32
+BATCH_ROWS = 128            # rows per batched product (BATCH_ROWS x rows float64 scores)
+
+ARRAYS = ("verse_ids", "row_ptr", "row_cols", "row_vals", "feat_keys", "feat_idf",
+          "col_ptr", "col_rows", "col_vals", "topk_rows", "topk_scores")
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_MASK = np.uint64((1 << FEATURE_BITS) - 1)
+
+
+def _finish(hashes: np.ndarray) -> np.ndarray:
+    hashes = (hashes ^ (hashes >> np.uint64(29))) * np.uint64(0xBF58476D1CE4E5B9)
+    return ((hashes ^ (hashes >> np.uint64(32))) & _MASK).astype(np.int64)
+
+
+def _char_ngram_features(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(row of each feature, feature hash) for Korean texts; n-grams never cross a non-Hangul character."""
+    runs = [" ".join(tokenize(text, "ko")) for text in texts]
+    lengths = np.fromiter(map(len, runs), dtype=np.int64, count=len(runs))
+    # One separator between texts so n-grams never span two verses
+    codes = np.frombuffer(" ".join(runs).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    row_of_char = np.repeat(np.arange(len(runs)), lengths + 1)[:len(codes)]
+    is_space = codes == ord(" ")
+
+    rows, features = [], []
+    for n in CHAR_NGRAMS:
+        if len(codes) < n:
+            continue
+        starts = np.arange(len(codes) - n + 1)
+        valid = np.ones(len(starts), dtype=bool)
+        hashes = np.full(len(starts), np.uint64(n), dtype=np.uint64)
+        for offset in range(n):
+            valid &= ~is_space[starts + offset]
+            hashes = (hashes ^ codes[starts + offset]) * _MIX
+        rows.append(row_of_char[starts[valid]])
+        features.append(_finish(hashes[valid]))
+    if not rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(features)
+
+
+def _word_ngram_features(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(row of each feature, feature hash) for English texts: words and word bigrams."""
+    token_lists = [tokenize(text, "en") for text in texts]
+    counts = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    # crc32 is stable across processes, unlike hash()
+    words = np.fromiter((zlib.crc32(token.encode()) for tokens in token_lists for token in tokens),
+                        dtype=np.uint64, count=int(counts.sum()))
+    row_of_word = np.repeat(np.arange(len(token_lists)), counts)
+
+    unigrams = _finish(words * _MIX)
+    same_verse = row_of_word[1:] == row_of_word[:-1]
+    bigrams = _finish(((words[:-1] * _MIX) ^ words[1:]) * _MIX)[same_verse]
+    return np.concatenate([row_of_word, row_of_word[1:][same_verse]]), np.concatenate([unigrams, bigrams])
+
+
+def featurize(texts: List[str], lang: str) -> Tuple[np.ndarray, np.ndarray]:
+    return _char_ngram_features(texts) if lang == "ko" else _word_ngram_features(texts)
+
+
+def _term_counts(rows: np.ndarray, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unique (row, feature) pairs sorted by row then feature, with their counts."""
+    keys = np.sort(rows.astype(np.int64) << FEATURE_BITS | features)
+    if not len(keys):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, len(keys)))
+    keys = keys[starts]
+    return keys >> FEATURE_BITS, keys & ((1 << FEATURE_BITS) - 1), counts
+
+
+def _expand(ptr: np.ndarray, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """For CSR/CSC slots, (index of the slot each element came from, element positions)."""
+    lengths = ptr[slots + 1] - ptr[slots]
+    owner = np.repeat(np.arange(len(slots)), lengths)
+    positions = np.repeat(ptr[slots], lengths) + (np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths))
+    return owner, positions
+
+
+def _scores(query_ids: np.ndarray, query_cols: np.ndarray, query_vals: np.ndarray, n_queries: int,
+            col_ptr: np.ndarray, col_rows: np.ndarray, col_vals: np.ndarray, n_rows: int) -> np.ndarray:
+    """(n_queries x n_rows) dot products of sparse query rows with the indexed rows."""
+    owner, positions = _expand(col_ptr, query_cols)
+    products = query_vals[owner] * col_vals[positions]
+    keys = query_ids[owner] * n_rows + col_rows[positions]
+    return np.bincount(keys, weights=products, minlength=n_queries * n_rows).reshape(n_queries, n_rows)
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(columns, scores) of the k highest scores per row, best first. Negates `scores` in place."""
+    k = min(k, scores.shape[1])
+    np.negative(scores, out=scores)
+    part = np.argpartition(scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), -np.take_along_axis(part_scores, order, axis=1)
+
+
+def build_version_index(data: Dict[str, str], lang: str, top_k: int = TOP_K) -> Dict[str, np.ndarray]:
+    """All arrays of one version's index (see the module docstring)."""
+    verses = sorted(iter_verses(data))
+    verse_ids = np.array([verse[0] for verse in verses], dtype=np.int32)
+    n_rows = len(verses)
+    rows, features = featurize([verse[4] for verse in verses], lang)
+    row_of, feature_of, tf = _term_counts(rows, features)
+
+    feat_keys, cols, df = np.unique(feature_of, return_inverse=True, return_counts=True)
+    idf = np.log((1 + n_rows) / (1 + df)) + 1
+    common = df > max(MAX_DF_RATIO * n_rows, MIN_DF_LIMIT)
+    keep = ~common[cols]
+    # Renumber the kept columns
+    kept_features = np.flatnonzero(~common)
+    column_of = np.full(len(feat_keys), -1, dtype=np.int64)
+    column_of[kept_features] = np.arange(len(kept_features))
+    feat_keys, idf = feat_keys[kept_features], idf[kept_features]
+    row_of, cols, tf = row_of[keep], column_of[cols[keep]], tf[keep]
+
+    weights = (1 + np.log(tf)) * idf[cols]
+    norms = np.sqrt(np.bincount(row_of, weights=weights ** 2, minlength=n_rows))
+    weights = (weights / np.maximum(norms[row_of], 1e-12)).astype(np.float32)
+    row_ptr = np.searchsorted(row_of, np.arange(n_rows + 1)).astype(np.int64)
+
+    by_column = np.argsort(cols, kind="stable")
+    col_ptr = np.searchsorted(cols[by_column], np.arange(len(feat_keys) + 1)).astype(np.int64)
+    col_rows, col_vals = row_of[by_column].astype(np.int32), weights[by_column]
+
+    # Precomputed neighbours: batched X[batch] @ X.T
+    k = min(top_k, max(n_rows - 1, 1))
+    topk_rows = np.zeros((n_rows, k), dtype=np.int32)
+    topk_scores = np.zeros((n_rows, k), dtype=np.float32)
+    for lo in range(0, n_rows, BATCH_ROWS):
+        hi = min(lo + BATCH_ROWS, n_rows)
+        span = slice(row_ptr[lo], row_ptr[hi])
+        scores = _scores(row_of[span] - lo, cols[span], weights[span], hi - lo,
+                         col_ptr, col_rows, col_vals, n_rows)
+        scores[np.arange(hi - lo), np.arange(lo, hi)] = -1.0  # not its own neighbour
+        topk_rows[lo:hi], topk_scores[lo:hi] = _top_k(scores, k)
+
+    return {
+        "verse_ids": verse_ids, "row_ptr": row_ptr, "row_cols": cols.astype(np.int32), "row_vals": weights,
+        "feat_keys": feat_keys.astype(np.int32), "feat_idf": idf.astype(np.float32),
+        "col_ptr": col_ptr, "col_rows": col_rows, "col_vals": col_vals,
+        "topk_rows": topk_rows, "topk_scores": topk_scores,
+    }
+
+
+def build_similar(outputs: Optional[Dict[str, str]] = None, out_dir: str = SIMILAR_DIR) -> Dict[str, int]:
+    """Builds one index per version. Returns verse counts by version."""
+    if outputs is None:
+        outputs = discover_outputs()
+    built = {}
+    for name, path in outputs.items():
+        version_dir = os.path.join(out_dir, name)
+        meta_path = os.path.join(version_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        lang = version_lang(name)
+        tables = build_version_index(load_version(path), lang)
+        os.makedirs(version_dir, exist_ok=True)
+        for array_name, array in tables.items():
+            array_path = os.path.join(version_dir, f"{array_name}.npy")
+            with open(f"{array_path}.tmp", 'wb') as f:
+                np.save(f, array)
+            os.replace(f"{array_path}.tmp", array_path)
+        write_json_atomic(meta_path, {"version": name, "lang": lang, "top_k": int(tables["topk_rows"].shape[1]),
+                                      "max_df_ratio": MAX_DF_RATIO})
+        built[name] = len(tables["verse_ids"])
+    return built
+
+
+def _label(vid: int) -> str:
+    abbr, chapter, verse = split_verse_id(int(vid))
+    return f"{abbr}{chapter}:{verse}"
+
+
+class VersionIndex:
+    """Memory-mapped index of one version."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+
+    def row_of(self, vid: int) -> Optional[int]:
+        verse_ids = self.arrays["verse_ids"]
+        row = int(np.searchsorted(verse_ids, vid))
+        return row if row < len(verse_ids) and verse_ids[row] == vid else None
+
+    def row_vector(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(feature hashes, weights) of one row, for querying another version."""
+        lo, hi = int(self.arrays["row_ptr"][row]), int(self.arrays["row_ptr"][row + 1])
+        cols = np.asarray(self.arrays["row_cols"][lo:hi])
+        return np.asarray(self.arrays["feat_keys"])[cols], np.asarray(self.arrays["row_vals"][lo:hi])
+
+    def search(self, feature_hashes: np.ndarray, weights: np.ndarray, k: int,
+               exclude_vid: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top-k rows for a query vector given as feature hashes (unknown features are ignored)."""
+        feat_keys = self.arrays["feat_keys"]
+        cols = np.searchsorted(feat_keys, feature_hashes)
+        found = cols < len(feat_keys)
+        found[found] = np.asarray(feat_keys)[cols[found]] == feature_hashes[found]
+        cols, weights = cols[found], weights[found]
+        n_rows = len(self.arrays["verse_ids"])
+        if n_rows == 0:
+            return []
+        scores = _scores(np.zeros(len(cols), dtype=np.int64), cols, weights, 1,
+                         self.arrays["col_ptr"], self.arrays["col_rows"], self.arrays["col_vals"], n_rows)
+        if exclude_vid is not None:
+            row = self.row_of(exclude_vid)
+            if row is not None:
+                scores[0, row] = -1.0
+        rows, top = _top_k(scores, min(k, n_rows))
+        return [(_label(self.arrays["verse_ids"][r]), float(s)) for r, s in zip(rows[0], top[0]) if s > 0]
+
+    def vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """TF-IDF vector of free text against this version's idf, as (feature hashes, weights)."""
+        _, features = featurize([text], self.meta["lang"])
+        feature_hashes, tf = np.unique(features, return_counts=True)
+        feat_keys = self.arrays["feat_keys"]
+        cols = np.searchsorted(feat_keys, feature_hashes)
+        known = cols < len(feat_keys)
+        known[known] = np.asarray(feat_keys)[cols[known]] == feature_hashes[known]
+        weights = (1 + np.log(tf[known])) * np.asarray(self.arrays["feat_idf"])[cols[known]]
+        return feature_hashes[known], weights / max(float(np.linalg.norm(weights)), 1e-12)
+
+
+class SimilarVerses:
+    """Related-verse lookups over the built indexes; versions are opened on first use."""
+
+    def __init__(self, directory: str = SIMILAR_DIR):
+        self.directory = directory
+        self.indexes: Dict[str, VersionIndex] = {}
+
+    def index(self, version: str) -> VersionIndex:
+        if version not in self.indexes:
+            version_dir = os.path.join(self.directory, version)
+            if not os.path.exists(os.path.join(version_dir, "meta.json")):
+                raise KeyError(f"No similar-verse index for {version}; run `python similar_verses.py build`")
+            self.indexes[version] = VersionIndex(version_dir)
+        return self.indexes[version]
+
+    def related(self, key: str, version: str, k: int = 10, target: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Verses most similar to `key` of `version`: from the precomputed table within the
+        same version, or scored on demand against `target` (the same verse id excluded).
+        A k beyond the precomputed TOP_K columns is also scored on demand.
+        """
+        vid = key_to_verse_id(key)
+        source = self.index(version)
+        row = source.row_of(vid) if vid is not None else None
+        if row is None:
+            raise KeyError(f"{key} is not in {version}")
+        if (target is None or target == version) and k <= source.arrays["topk_rows"].shape[1]:
+            rows = source.arrays["topk_rows"][row][:k]
+            scores = source.arrays["topk_scores"][row][:k]
+            return [(_label(source.arrays["verse_ids"][r]), float(s)) for r, s in zip(rows, scores) if s > 0]
+        feature_hashes, weights = source.row_vector(row)
+        return self.index(target or version).search(feature_hashes, weights, k, exclude_vid=vid)
+
+    def query(self, text: str, version: str, k: int = 10) -> List[Tuple[str, float]]:
+        index = self.index(version)
+        feature_hashes, weights = index.vectorize(text)
+        return index.search(feature_hashes, weights, k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TF-IDF related-verse index")
+    parser.add_argument("--dir", default=SIMILAR_DIR, help=f"Index directory (default: {SIMILAR_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Build one index per crawled version")
+    related = sub.add_parser("related", help="Verses similar to a verse")
+    related.add_argument("key", help='Verse key, e.g. "요3:16"')
+    related.add_argument("--version", required=True)
+    related.add_argument("--in", dest="target", help="Search another version of the same language")
+    related.add_argument("-k", type=int, default=10)
+    query = sub.add_parser("query", help="Verses similar to free text")
+    query.add_argument("text")
+    query.add_argument("--version", required=True)
+    query.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        outputs = discover_outputs()
+        if not outputs:
+            print(f"No crawl outputs found in {OUTPUT_DIR}.")
+            return
+        start = time.perf_counter()
+        built = build_similar(outputs, args.dir)
+        print(f"💾 Similar-verse indexes saved: {args.dir} ({time.perf_counter() - start:.2f}s)")
+        for name, count in built.items():
+            print(f"  - {name:<12} {count:,} verses")
+        return
+
+    similar = SimilarVerses(args.dir)
+    start = time.perf_counter()
+    if args.command == "related":
+        results = similar.related(args.key, args.version, args.k, args.target)
+    else:
+        results = similar.query(args.text, args.version, args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    for key, score in results:
+        print(f"  {key:<10} {score:.3f}")
+    print(f"({elapsed:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Binary delta patches between two snapshots of one version's crawl output.
+
+A re-crawl usually changes a handful of verses, but clients used to download the
+whole bible_*.json again. A delta lists only the added, changed and removed
+verses by integer verse id (verse_keys), so its size follows the size of the change.
+
+Format (.bdelta):
+    MAGIC
+    zlib-compressed body:
+        JSON header line: base/target content hash, op counts, key spellings
+        records in verse id order:
+            op byte (A/C/R) + varint gap from the previous verse id
+            [+ varint byte length + UTF-8 text, for A and C]
+
+The content hash covers (verse id, text) pairs in id order, so it does not depend
+on JSON formatting or key spelling ("눅" vs "누"). apply_delta refuses a base
+with the wrong hash and verifies the patched result against the target hash.
+
+    python snapshot_delta.py diff output/old/bible_krv.json output/bible_krv.json -o krv.bdelta
+    python snapshot_delta.py apply bible_krv.json krv.bdelta -o bible_krv.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from typing import Dict, List, Tuple
+
+from corpus import load_version
+from shard_store import write_json_atomic
+from verse_keys import KEY_PATTERN, key_to_verse_id, make_key, split_verse_id
+
+MAGIC = b"BIBLEDELTA1\n"
+OP_ADD, OP_CHANGE, OP_REMOVE = b"A", b"C", b"R"
+
+
+def _indexed(data: Dict[str, str]) -> Dict[int, Tuple[str, str]]:
+    """{verse_id: (key, text)}; keys that do not parse are left out of deltas."""
+    indexed = {}
+    for key, text in data.items():
+        vid = key_to_verse_id(key)
+        if vid is not None:
+            indexed[vid] = (key, text)
+    return indexed
+
+
+def content_hash(data: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    indexed = _indexed(data)
+    for vid in sorted(indexed):
+        digest.update(f"{vid}\t{indexed[vid][1]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _key_spellings(indexed: Dict[int, Tuple[str, str]]) -> Dict[str, str]:
+    """Book abbreviations written differently from books_data, e.g. {"누": "눅"} for GoodTV."""
+    spellings = {}
+    for vid, (key, _) in indexed.items():
+        abbr = split_verse_id(vid)[0]
+        written = KEY_PATTERN.match(key).group(1)
+        if written != abbr:
+            spellings[abbr] = written
+    return spellings
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def make_delta(base: Dict[str, str], target: Dict[str, str]) -> bytes:
+    old, new = _indexed(base), _indexed(target)
+    ops: List[Tuple[int, bytes, str]] = []
+    for vid in new.keys() - old.keys():
+        ops.append((vid, OP_ADD, new[vid][1]))
+    for vid in old.keys() - new.keys():
+        ops.append((vid, OP_REMOVE, ""))
+    for vid in old.keys() & new.keys():
+        if old[vid][1] != new[vid][1]:
+            ops.append((vid, OP_CHANGE, new[vid][1]))
+    ops.sort()
+
+    header = {
+        "base": content_hash(base),
+        "target": content_hash(target),
+        "added": sum(1 for op in ops if op[1] == OP_ADD),
+        "changed": sum(1 for op in ops if op[1] == OP_CHANGE),
+        "removed": sum(1 for op in ops if op[1] == OP_REMOVE),
+        "spellings": _key_spellings(new),
+    }
+    body = bytearray(json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n")
+    previous = 0
+    for vid, op, text in ops:
+        body += op
+        _write_varint(body, vid - previous)
+        previous = vid
+        if op != OP_REMOVE:
+            encoded = text.encode('utf-8')
+            _write_varint(body, len(encoded))
+            body += encoded
+    return MAGIC + zlib.compress(bytes(body), 9)
+
+
+def read_delta(delta: bytes) -> Tuple[Dict, List[Tuple[int, bytes, str]]]:
+    """Returns (header, [(verse_id, op, text), ...])."""
+    if not delta.startswith(MAGIC):
+        raise ValueError("Not a snapshot delta")
+    body = zlib.decompress(delta[len(MAGIC):])
+    newline = body.index(b"\n")
+    header = json.loads(body[:newline])
+    ops = []
+    pos, vid = newline + 1, 0
+    while pos < len(body):
+        op = body[pos:pos + 1]
+        gap, pos = _read_varint(body, pos + 1)
+        vid += gap
+        text = ""
+        if op != OP_REMOVE:
+            length, pos = _read_varint(body, pos)
+            text = body[pos:pos + length].decode('utf-8')
+            pos += length
+        ops.append((vid, op, text))
+    return header, ops
+
+
+def apply_delta(base: Dict[str, str], delta: bytes) -> Dict[str, str]:
+    """
+    Patches `base` and returns the target snapshot ordered by verse id.
+    Raises ValueError if `base` is not the snapshot the delta was made from,
+    or if the patched result does not hash to the target.
+    """
+    header, ops = read_delta(delta)
+    if content_hash(base) != header["base"]:
+        raise ValueError("Base snapshot does not match the delta (hash mismatch)")
+
+    indexed = _indexed(base)
+    spellings = header["spellings"]
+    for vid, op, text in ops:
+        if op == OP_REMOVE:
+            indexed.pop(vid, None)
+        elif vid in indexed:
+            indexed[vid] = (indexed[vid][0], text)
+        else:
+            abbr, chapter, verse = split_verse_id(vid)
+            indexed[vid] = (make_key(spellings.get(abbr, abbr), chapter, verse), text)
+
+    patched = {indexed[vid][0]: indexed[vid][1] for vid in sorted(indexed)}
+    if content_hash(patched) != header["target"]:
+        raise ValueError("Patched snapshot does not match the target hash")
+    return patched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary delta patches between crawl snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    diff = sub.add_parser("diff", help="Write a delta from BASE to TARGET")
+    diff.add_argument("base", help="Older output file or shard directory")
+    diff.add_argument("target", help="Newer output file or shard directory")
+    diff.add_argument("-o", "--out", required=True, help="Delta file to write")
+
+    apply_parser = sub.add_parser("apply", help="Patch BASE with DELTA")
+    apply_parser.add_argument("base", help="Local copy of the base snapshot")
+    apply_parser.add_argument("delta", help="Delta file")
+    apply_parser.add_argument("-o", "--out", help="Output path (default: overwrite BASE)")
+
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        target = load_version(args.target)
+        delta = make_delta(load_version(args.base), target)
+        with open(args.out, 'wb') as f:
+            f.write(delta)
+        header, _ = read_delta(delta)
+        full_size = len(gzip.compress(json.dumps(target, ensure_ascii=False).encode('utf-8')))
+        print(f"📦 {args.out}: +{header['added']} ~{header['changed']} -{header['removed']} verses, "
+              f"{len(delta):,} bytes (full gzipped snapshot: {full_size:,} bytes)")
+    else:
+        with open(args.delta, 'rb') as f:
+            delta = f.read()
+        out = args.out or args.base
+        if os.path.isdir(out):
+            print("❌ Shard directories cannot be patched in place; pass -o <file>.json")
+            raise SystemExit(1)
+        try:
+            patched = apply_delta(load_version(args.base), delta)
+        except ValueError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        write_json_atomic(out, patched)
+        print(f"✅ Patched and verified: {out} ({len(patched):,} verses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Exports all crawled versions into a single SQLite database.
+
+Tables:
+    versions(version_id, name, lang, source)
+    verses(version_id, verse_id, book, chapter, verse, text)   -- PK (version_id, verse_id)
+    verses_fts                                                 -- FTS5 over verses.text
+
+verse_id is the BBCCCVVV integer from verse_keys, so a chapter or a range is a
+contiguous verse_id interval and is answered straight from the primary key.
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import OUTPUT_DIR
+from books_data import BOOK_ORDER
+from corpus import discover_outputs, load_version, version_lang, iter_verses
+from verse_keys import BOOK_INDEX
+
+DEFAULT_DB_PATH = os.path.join(OUTPUT_DIR, "bible.db")
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE versions (
+    version_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    lang TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE books (
+    book INTEGER PRIMARY KEY,
+    abbr TEXT NOT NULL UNIQUE
+);
+CREATE TABLE verses (
+    version_id INTEGER NOT NULL REFERENCES versions(version_id),
+    verse_id INTEGER NOT NULL,
+    book INTEGER NOT NULL,
+    chapter INTEGER NOT NULL,
+    verse INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (version_id, verse_id)
+);
+"""
+
+# Created after the bulk load; building an index once is much cheaper than maintaining it per row
+INDEXES = """
+-- Covering (text included), so book/chapter range queries never visit the table
+CREATE INDEX idx_verses_book_chapter ON verses(book, chapter, version_id, verse, text);
+CREATE INDEX idx_verses_cross_version ON verses(verse_id, version_id);
+"""
+
+
+def _fts_tokenizer(conn: sqlite3.Connection) -> str:
+    """trigram (SQLite >= 3.34) gives substring search for Korean, which has no word spaces around particles."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp._probe")
+        return "trigram"
+    except sqlite3.OperationalError:
+        return "unicode61"
+
+
+def _batches(rows: Iterable[Tuple], size: int) -> Iterable[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_sqlite(db_path: str = DEFAULT_DB_PATH, outputs: Optional[Dict[str, str]] = None,
+                  batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Rebuilds db_path from the given {version_name: path} outputs (default: everything in OUTPUT_DIR).
+    Returns {version_name: verse_count}.
+    """
+    if outputs is None:
+        outputs = discover_outputs()
+
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    tmp_path = f"{db_path}.tmp"
+    for path in (tmp_path, f"{tmp_path}-wal", f"{tmp_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    counts: Dict[str, int] = {}
+    try:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-65536")
+            tokenizer = _fts_tokenizer(conn)
+
+            conn.execute("BEGIN")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.executemany("INSERT INTO books VALUES (?, ?)",
+                             [(BOOK_INDEX[abbr] + 1, abbr) for abbr in BOOK_ORDER])
+
+            for version_id, (name, path) in enumerate(outputs.items(), start=1):
+                conn.execute("INSERT INTO versions VALUES (?, ?, ?, ?)",
+                             (version_id, name, version_lang(name), os.path.basename(path)))
+                data = load_version(path)
+                rows = sorted(
+                    (version_id, vid, BOOK_INDEX[abbr] + 1, chapter, verse, text)
+                    for vid, abbr, chapter, verse, text in iter_verses(data)
+                )
+                for batch in _batches(rows, batch_size):
+                    conn.executemany("INSERT OR REPLACE INTO verses VALUES (?, ?, ?, ?, ?, ?)", batch)
+                counts[name] = len(rows)
+
+            for statement in INDEXES.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(
+                "CREATE VIRTUAL TABLE verses_fts USING fts5("
+                f"text, content='verses', content_rowid='rowid', tokenize='{tokenizer}')"
+            )
+            conn.execute("INSERT INTO verses_fts(verses_fts) VALUES ('rebuild')")
+            conn.execute("COMMIT")
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+    finally:
+        # A failed export leaves nothing behind; after a successful one only -wal/-shm remain
+        for path in (tmp_path, f"{tmp_path}-wal", f"{tmp_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export crawled versions into one SQLite database")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Database path (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--versions", nargs="*", help="Version names to export (e.g. krv niv_en). Default: all")
+    args = parser.parse_args()
+
+    outputs = discover_outputs()
+    if args.versions:
+        unknown = [v for v in args.versions if v not in outputs]
+        if unknown:
+            print(f"Unknown versions: {', '.join(unknown)} (available: {', '.join(outputs)})")
+            return
+        outputs = {name: outputs[name] for name in args.versions}
+    if not outputs:
+        print(f"No crawl outputs found in {OUTPUT_DIR}.")
+        return
+
+    start = time.perf_counter()
+    counts = export_sqlite(args.db, outputs)
+    elapsed = time.perf_counter() - start
+
+    print(f"💾 SQLite saved: {args.db} ({os.path.getsize(args.db) / (1024 * 1024):.1f} MB, {elapsed:.2f}s)")
+    for name, count in counts.items():
+        print(f"  - {name}: {count:,} verses")
+
+
+if __name__ == "__main__":
+    main()
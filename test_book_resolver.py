@@ -0,0 +1,25 @@
+import unittest
+from book_resolver import resolve_book, match_prefixes, chosung
+
+class TestBookResolver(unittest.TestCase):
+    def test_names_and_aliases(self):
+        cases = {
+            "창세기": "창", "Gen": "창", "gen.": "창", "1 Cor": "고전", "1cor": "고전", "I Corinthians": "고전",
+            "1 John": "요일", "요한1서": "요일", "눅": "누", "Song of Songs": "아", "탈출기": "출", "Ps": "시",
+        }
+        for name, abbr in cases.items():
+            self.assertEqual(resolve_book(name), abbr, name)
+        self.assertIsNone(resolve_book("Corinthians"))
+
+    def test_chosung(self):
+        self.assertEqual(chosung("창세기"), "ㅊㅅㄱ")
+        self.assertEqual(resolve_book("ㅊㅅㄱ"), "창")
+        self.assertEqual(resolve_book("ㅅㅁㅇㅅ"), "삼상")
+
+    def test_match_prefixes(self):
+        self.assertEqual(match_prefixes("요일 3:1"), [(1, "요"), (2, "요일")])
+        self.assertEqual(match_prefixes("x 요일", 2), [(3, "요"), (4, "요일")])
+        self.assertEqual(match_prefixes("없는책"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from unittest import mock
+from books_data import BOOKS, BOOK_ORDER
+from chapter_costs import (chapter_label, load_costs, record_costs, order_longest_first,
+                           simulate_makespan, _synthetic_verse_counts, EWMA_ALPHA)
+
+class TestChapterCosts(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cost_file = os.path.join(self.tmp_dir, "chapter_costs.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_order_longest_first(self):
+        costs = {"a": 1.0, "b": 5.0, "c": None, "d": 3.0}
+        # "c" gets the median known cost (3.0); ties keep their original order
+        self.assertEqual(order_longest_first(list(costs), costs.get), ["b", "c", "d", "a"])
+        self.assertEqual(order_longest_first(["x", "y"], lambda task: None), ["x", "y"])
+
+    def test_record_and_load_costs(self):
+        record_costs({"창1": 1.0, "시119": 4.0}, self.cost_file, source="goodtv")
+        record_costs({"창1": 2.0}, self.cost_file, source="goodtv")
+        record_costs({"창1": 9.0}, self.cost_file)
+        costs = load_costs(self.cost_file, source="goodtv")
+        self.assertAlmostEqual(costs["창1"], EWMA_ALPHA * 2.0 + (1 - EWMA_ALPHA) * 1.0, places=4)
+        self.assertEqual(costs["시119"], 4.0)
+        # Sections are kept apart
+        self.assertEqual(load_costs(self.cost_file), {"창1": 9.0})
+
+    def test_cost_file_outside_validated_outputs(self):
+        from config import OUTPUT_DIR
+        from chapter_costs import COST_FILE
+        self.assertNotEqual(os.path.dirname(COST_FILE), OUTPUT_DIR)
+
+    def test_legacy_cost_file_is_moved(self):
+        legacy = os.path.join(self.tmp_dir, "chapter_costs.json")
+        current = os.path.join(self.tmp_dir, "reports", "chapter_costs.json")
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump({"goodtv": {"창1": {"seconds": 1.5}}}, f, ensure_ascii=False)
+        with mock.patch("chapter_costs.COST_FILE", current), mock.patch("chapter_costs.LEGACY_COST_FILE", legacy):
+            self.assertEqual(load_costs(current, source="goodtv"), {"창1": 1.5})
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(current))
+
+    def test_load_costs_falls_back_to_verse_counts(self):
+        output = os.path.join(self.tmp_dir, "bible_krv.json")
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({"창1:1": "a", "창1:2": "b", "창2:1": "c"}, f, ensure_ascii=False)
+        with mock.patch("chapter_costs.discover_outputs", return_value={"krv": output}):
+            self.assertEqual(load_costs(self.cost_file, source="goodtv"), {"창1": 2.0, "창2": 1.0})
+
+    def test_synthetic_heavy_chapters_exist(self):
+        labels = {chapter_label(abbr, ch) for abbr in BOOK_ORDER for ch in range(1, BOOKS[abbr]['chapters'] + 1)}
+        counts = _synthetic_verse_counts()
+        self.assertEqual(set(counts), labels)
+        self.assertEqual((counts["누1"], counts["누22"]), (80, 71))
+
+    def test_simulate_makespan(self):
+        self.assertEqual(simulate_makespan([1, 1, 1, 1], 2), 2)
+        # Longest first never finishes later on this classic bad case
+        costs = [1, 1, 1, 1, 4]
+        self.assertLess(simulate_makespan(sorted(costs, reverse=True), 2), simulate_makespan(costs, 2))
+
+    def test_crawl_output_stays_canonical(self):
+        from goodtv_crawler import GoodTVBibleCrawler
+        crawler = GoodTVBibleCrawler("krv", "0", "ko", output_mode="json", archive=False)
+
+        def fake_fetch(bible_code, chapter):
+            return [{"jul": 2, "text": "b"}, {"jul": 1, "text": "a"}], ""
+
+        # Revelation 22 is dispatched first, Genesis 1 last
+        costs = {chapter_label(abbr, ch): float(i) for i, (abbr, ch) in enumerate(
+            (abbr, ch) for abbr in BOOK_ORDER for ch in range(1, BOOKS[abbr]['chapters'] + 1))}
+        with mock.patch.object(crawler, "fetch_chapter", side_effect=fake_fetch), \
+                mock.patch.object(crawler, "save"), \
+                mock.patch("goodtv_crawler.load_costs", return_value=costs), \
+                mock.patch("goodtv_crawler.record_costs") as record, \
+                mock.patch("goodtv_crawler.setup_logging"):
+            crawler.crawl()
+
+        keys = list(crawler.results)
+        self.assertEqual(len(keys), 2 * 1189)
+        self.assertEqual(keys[:3], ["창1:1", "창1:2", "창2:1"])
+        self.assertEqual(keys[-1], "계22:2")
+        self.assertEqual(len(record.call_args[0][0]), 1189)
+
+if __name__ == '__main__':
+    unittest.main()
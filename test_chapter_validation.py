@@ -0,0 +1,53 @@
+import unittest
+from chapter_validation import ChapterValidator, ChapterValidationError, CrawlAborted, check_chapter
+from retry_queue import RetryQueue, run_sequential
+
+GOOD = {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고 공허하며"}
+
+class TestChapterValidation(unittest.TestCase):
+    def test_check_chapter(self):
+        self.assertEqual(check_chapter("창", 1, GOOD), ([], []))
+        self.assertEqual(check_chapter("창", 1, {})[0], ["no verses parsed"])
+        errors, _ = check_chapter("창", 1, {"창2:1": "다른 장의 구절", "창1:2": "제 2 장 땅이"})
+        self.assertEqual(len(errors), 2)
+        _, warnings = check_chapter("창", 1, {"창1:1": "태초에", "창1:3": "빛이 있으라"}, expected_count=31)
+        self.assertEqual(len(warnings), 2)
+
+    def test_refetch_then_keep(self):
+        validator = ChapterValidator()
+        with self.assertRaises(ChapterValidationError):
+            validator.validate("창", 1, {}, retries_left=True)
+        self.assertEqual(validator.validate("창", 1, {}, retries_left=False), {})
+        self.assertIn(("창", 1), validator.errors)
+        validator.validate("창", 1, GOOD, retries_left=True)
+        self.assertNotIn(("창", 1), validator.errors)
+
+    def test_refetch_through_retry_queue(self):
+        validator = ChapterValidator()
+        queue = RetryQueue(max_retries=2, backoff=0.0)
+        responses = {("창", 1): [{}, GOOD]}
+        results = {}
+
+        def attempt(task):
+            retries_left = queue.attempts.get(task, 0) < queue.max_retries
+            return validator.validate(*task, responses[task].pop(0), retries_left)
+
+        run_sequential([("창", 1)], attempt, results.__setitem__, retry_queue=queue)
+        self.assertEqual(results[("창", 1)], GOOD)
+        self.assertEqual(validator.refetched, 1)
+
+    def test_abort_on_systematic_failure(self):
+        validator = ChapterValidator(abort_ratio=0.5, min_chapters=5)
+        queue = RetryQueue(max_retries=0, backoff=0.0)
+        tasks = [("창", chapter) for chapter in range(1, 51)]
+
+        def attempt(task):
+            return validator.validate(*task, {}, queue.attempts.get(task, 0) < queue.max_retries)
+
+        with self.assertRaises(CrawlAborted):
+            run_sequential(tasks, attempt, lambda task, data: None,
+                           lambda task: validator.check_abort(), retry_queue=queue)
+        self.assertLess(validator.checked, len(tasks))
+
+if __name__ == '__main__':
+    unittest.main()
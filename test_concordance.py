@@ -0,0 +1,47 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from concordance import build_concordance, Concordance, tokenize
+
+class TestConcordance(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        outputs = {}
+        samples = {
+            "krv": {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "하나님의 영은 수면 위에 운행하시니라", "출1:1": "하나님이 하나님이"},
+            "kjv_en": {"창1:1": "In the beginning God created the heaven.", "창1:2": "And the Spirit of God moved"},
+        }
+        for name, data in samples.items():
+            path = os.path.join(self.tmp_dir, f"bible_{name}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            outputs[name] = path
+        self.table_dir = os.path.join(self.tmp_dir, "concordance")
+        self.sizes = build_concordance(outputs, self.table_dir)
+        self.concordance = Concordance(self.table_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("In the beginning God's", "en"), ["in", "the", "beginning", "god's"])
+        self.assertEqual(tokenize("태초에, 하나님이(1)", "ko"), ["태초에", "하나님이"])
+
+    def test_frequency(self):
+        self.assertEqual(self.concordance.frequency("하나님이"), {"krv": 3})
+        self.assertEqual(self.concordance.frequency("하나님", prefix=True), {"krv": 4})
+        self.assertEqual(self.concordance.frequency("GOD"), {"kjv_en": 2})
+        self.assertEqual(self.concordance.frequency("없는말"), {})
+
+    def test_occurrences_and_chapters(self):
+        self.assertEqual(self.concordance.occurrences("하나님", prefix=True),
+                         [("krv", "창1:1"), ("krv", "창1:2"), ("krv", "출1:1")])
+        self.assertEqual(self.concordance.occurrences("god", version="kjv_en", limit=1), [("kjv_en", "창1:1")])
+        self.assertEqual(self.concordance.chapter_counts("하나님이"), {"창1": 1, "출1": 2})
+        self.assertEqual(self.concordance.book_counts("하나님", version="krv", prefix=True), {"창": 2, "출": 2})
+        self.assertEqual(self.concordance.top_words("krv", 1), [("하나님이", 3)])
+
+if __name__ == '__main__':
+    unittest.main()
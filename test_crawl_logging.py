@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import crawl_logging
+from crawl_logging import JsonLinesFormatter, RateLimitFilter, setup_logging, shutdown_logging
+
+
+class TestCrawlLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.tmp_dir, "crawl.log")
+        self.logger = logging.getLogger("test_crawl_logging")
+        self.logger.propagate = False
+        # A crawler module imported by another test may have configured the root logger;
+        # it is put back in tearDown
+        self.previous = None
+        if crawl_logging._listener is not None:
+            target, _ = crawl_logging._installed
+            handler = crawl_logging._file_handler
+            log_format = "json" if isinstance(handler.formatter, JsonLinesFormatter) else "text"
+            self.previous = (handler.baseFilename, target.level, log_format, target)
+        shutdown_logging()
+
+    def tearDown(self):
+        shutdown_logging()
+        if self.previous is not None:
+            log_file, level, log_format, target = self.previous
+            setup_logging(log_file, level, log_format, target)
+        shutil.rmtree(self.tmp_dir)
+
+    def _records(self):
+        with open(self.log_file, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_json_lines_from_threads(self):
+        setup_logging(self.log_file, log_format="json", logger=self.logger)
+
+        def fetch(chapter):
+            self.logger.info(f"Fetched 창 {chapter}", extra={"version": "krv", "book": "창", "chapter": chapter,
+                                                             "latency_ms": 12.5})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(fetch, range(1, 51)))
+        shutdown_logging()
+
+        records = self._records()
+        self.assertEqual(sorted(r["chapter"] for r in records), list(range(1, 51)))
+        self.assertEqual(records[0]["version"], "krv")
+        self.assertEqual(records[0]["latency_ms"], 12.5)
+        self.assertTrue(records[0]["thread"].startswith("ThreadPoolExecutor"))
+
+    def test_repeated_errors_are_rate_limited(self):
+        setup_logging(self.log_file, log_format="json", logger=self.logger)
+        for chapter in range(100):
+            self.logger.error(f"Error fetching 창 {chapter}: timeout")
+        self.logger.error("Another problem")
+        shutdown_logging()
+
+        records = self._records()
+        messages = [r["msg"] for r in records]
+        self.assertEqual(len(records), 5 + 1 + 1)
+        self.assertIn("Another problem", messages)
+        self.assertEqual(records[-1]["suppressed"], 95)
+
+    def test_exception_traceback_is_separate(self):
+        setup_logging(self.log_file, log_format="json", logger=self.logger)
+        try:
+            raise ValueError("bad payload")
+        except ValueError:
+            self.logger.exception("Parse failed for %s", "창 1")
+        shutdown_logging()
+
+        record = self._records()[0]
+        self.assertEqual(record["msg"], "Parse failed for 창 1")
+        self.assertIn("ValueError: bad payload", record["exc"])
+
+    def test_window_reports_suppressed_count(self):
+        rate_limit = RateLimitFilter(burst=1, window=0.0)
+        first = logging.LogRecord("x", logging.ERROR, __file__, 0, "boom 1", None, None)
+        self.assertTrue(rate_limit.filter(first))
+        rate_limit.window = 60.0
+        self.assertFalse(rate_limit.filter(logging.LogRecord("x", logging.ERROR, __file__, 0, "boom 2", None, None)))
+        rate_limit.window = 0.0
+        later = logging.LogRecord("x", logging.ERROR, __file__, 0, "boom 3", None, None)
+        self.assertTrue(rate_limit.filter(later))
+        self.assertEqual(later.suppressed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
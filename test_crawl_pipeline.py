@@ -0,0 +1,73 @@
+import unittest
+import os
+import shutil
+import tempfile
+from functools import partial
+from unittest import mock
+from crawl_pipeline import crawl_chapters
+from retry_queue import RetryQueue
+from shard_store import ShardReader, shard_dir_for
+
+class TestCrawlPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.tmp_dir, "bible_krv.json")
+        self.calls = []
+        self.failures = {("창", 2): 1, ("계", 22): 1}
+        # Retries come due almost at once
+        patcher = mock.patch("crawl_pipeline.RetryQueue", partial(RetryQueue, backoff=0.001))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def request_chapter(self, book_abbr, chapter):
+        self.calls.append((book_abbr, chapter))
+        if self.failures.get((book_abbr, chapter), 0):
+            self.failures[(book_abbr, chapter)] -= 1
+            raise ConnectionError("timeout")
+        return {f"{book_abbr}{chapter}:2": "둘째 절", f"{book_abbr}{chapter}:1": "첫째 절"}
+
+    def test_retries_and_canonical_order(self):
+        closed = []
+        results = crawl_chapters(self.request_chapter, self.output_file, output_mode="json",
+                                 validate=False, delay=0, on_finished=lambda: closed.append(True))
+        self.assertEqual(len(results), 2 * 1189)
+        # The retried chapter is back in its place, verses sorted within each chapter
+        self.assertEqual(list(results)[:4], ["창1:1", "창1:2", "창2:1", "창2:2"])
+        self.assertEqual(list(results)[-1], "계22:2")
+        self.assertEqual(self.calls.count(("창", 2)), 2)
+        self.assertEqual(closed, [True])
+
+    def test_shards_written_per_book(self):
+        shard_root = os.path.join(self.tmp_dir, "shards")
+        with mock.patch("crawl_pipeline.SHARD_DIR", shard_root):
+            results = crawl_chapters(self.request_chapter, self.output_file, output_mode="shards",
+                                     validate=False, delay=0)
+        reader = ShardReader(shard_dir_for(self.output_file, shard_root))
+        self.assertEqual(len(reader.books()), 66)
+        genesis = reader.load_book("창", verify=True)
+        self.assertEqual(list(genesis)[:3], ["창1:1", "창1:2", "창2:1"])
+        self.assertEqual(genesis, {k: v for k, v in results.items() if k.startswith("창")})
+
+    def test_crawlers_write_their_own_version(self):
+        from crawler import BibleCrawler
+        from bible_com_crawler import BibleComCrawler
+        verses = {"창1:1": "태초에"}
+        for crawler, expected in ((BibleCrawler("HAN", archive=False), "bible_ksv.json"),
+                                  (BibleComCrawler("ESV", archive=False), "bible_esv_en.json")):
+            self.assertEqual(os.path.basename(crawler.output_file), expected)
+            crawler.output_file = os.path.join(self.tmp_dir, expected)
+            module = type(crawler).__module__
+            with mock.patch(f"{module}.crawl_chapters", return_value=verses) as crawl, \
+                    mock.patch(f"{module}.OUTPUT_MODE", "json"), \
+                    mock.patch(f"{module}.setup_logging") as setup_logging:
+                crawler.crawl_all()
+            # The previous crawl of this version is the validation reference
+            self.assertEqual(crawl.call_args[0][1], crawler.output_file)
+            self.assertTrue(os.path.exists(crawler.output_file))
+            setup_logging.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
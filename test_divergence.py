@@ -0,0 +1,31 @@
+import unittest
+from divergence import verse_id_array, count_matrix, analyze_group, CHAPTER_LABELS
+from verse_range import CHAPTER_BASE
+
+BASE = {f"창1:{v}": "text" for v in range(1, 32)}
+BASE.update({f"시119:{v}": "text" for v in range(1, 177)})
+
+class TestDivergence(unittest.TestCase):
+    def test_count_matrix(self):
+        ids = verse_id_array(BASE)
+        matrix = count_matrix([ids])
+        self.assertEqual(matrix.shape, (1, len(CHAPTER_LABELS)))
+        self.assertEqual(matrix[0, CHAPTER_BASE["창"]], 31)
+        self.assertEqual(matrix[0, CHAPTER_BASE["시"] + 118], 176)
+        self.assertEqual(matrix.sum(), len(BASE))
+
+    def test_analyze_group(self):
+        short = dict(BASE)
+        del short["창1:5"]
+        extra = dict(BASE)
+        extra["시119:177"] = "text"
+        report = analyze_group(["a", "b", "c"], [verse_id_array(d) for d in (BASE, short, extra)])
+
+        self.assertEqual([e["chapter"] for e in report["divergent_chapters"]], ["창1", "시119"])
+        self.assertEqual(report["by_version"]["a"]["outlier_chapters"], 0)
+        self.assertEqual(report["by_version"]["b"]["missing"], ["창1:5"])
+        self.assertEqual(report["by_version"]["c"]["extra"], ["시119:177"])
+        self.assertEqual(report["total_verses"]["b"], len(BASE) - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from page_archive import ArchiveWriter, iter_records, reparse_archives, archive_path_for
+
+GOODTV_PAYLOAD = {"data": {"bookname_abb": "창", "data": {"version1": {"content": [
+    {"jul": 1, "text": "○태초에 하나님이 천지를 창조하시니라"},
+    {"jul": 2, "text": "땅이 혼돈하고  공허하며"},
+]}}}}
+
+class TestPageArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.tmp_dir, "archive")
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.html"), encoding='utf-8') as f:
+            self.html = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_archives(self):
+        bskorea = ArchiveWriter(archive_path_for("bskorea", "GAE", self.archive_dir))
+        bskorea.write("bskorea", "GAE", "창", 1, "https://example/gen1", 500, "error page")
+        bskorea.write("bskorea", "GAE", "창", 1, "https://example/gen1", 200, self.html)
+        bskorea.close()
+
+        goodtv = ArchiveWriter(archive_path_for("goodtv", "krv", self.archive_dir))
+        goodtv.write("goodtv", "krv", "창", 1, "https://example/api", 200, json.dumps(GOODTV_PAYLOAD, ensure_ascii=False))
+        goodtv.close()
+        # Simulate a crash in the middle of the next append
+        with open(goodtv.path, 'ab') as f:
+            f.write(b"\x1f\x8b\x08\x00garbage")
+
+    def test_iter_records(self):
+        self._write_archives()
+        records = list(iter_records(archive_path_for("bskorea", "GAE", self.archive_dir)))
+        self.assertEqual([h["status"] for h, _ in records], [500, 200])
+        self.assertEqual(records[1][1], self.html)
+        # Truncated tail is dropped, earlier records survive
+        self.assertEqual(len(list(iter_records(archive_path_for("goodtv", "krv", self.archive_dir)))), 1)
+
+    def test_append_after_torn_record(self):
+        path = archive_path_for("goodtv", "krv", self.archive_dir)
+        with ArchiveWriter(path) as writer:
+            writer.write("goodtv", "krv", "창", 1, "https://example/1", 200, "first")
+        # A crawl killed mid-append, then resumed
+        with open(path, 'ab') as f:
+            f.write(b"\x1f\x8b\x08\x00garbage")
+        with ArchiveWriter(path) as writer:
+            writer.write("goodtv", "krv", "창", 2, "https://example/2", 200, "second")
+        self.assertEqual([body for _, body in iter_records(path)], ["first", "second"])
+        # The torn tail was cut before appending
+        with open(path, 'rb') as f:
+            self.assertNotIn(b"garbage", f.read())
+
+    def test_damaged_record_in_the_middle_is_skipped(self):
+        path = archive_path_for("goodtv", "krv", self.archive_dir)
+        with ArchiveWriter(path) as writer:
+            writer.write("goodtv", "krv", "창", 1, "https://example/1", 200, "first")
+            writer.write("goodtv", "krv", "창", 2, "https://example/2", 200, "second")
+        # Archives written before the writer repaired torn tails can hold one between records
+        with open(path, 'rb') as f:
+            data = f.read()
+        second = data.index(b"\x1f\x8b\x08", 1)
+        with open(path, 'wb') as f:
+            f.write(data[:second] + b"\x1f\x8b\x08\x00garbage" + data[second:])
+        self.assertEqual([body for _, body in iter_records(path)], ["first", "second"])
+
+    def test_failed_chapter_keeps_previous_output(self):
+        self._write_archives()
+        reparse_archives(self.archive_dir, self.tmp_dir, max_workers=0)
+        # The newest response for 창1 no longer parses
+        with ArchiveWriter(archive_path_for("goodtv", "krv", self.archive_dir)) as writer:
+            writer.write("goodtv", "krv", "창", 1, "https://example/api", 200, "not json")
+        counts = reparse_archives(self.archive_dir, self.tmp_dir, max_workers=0)
+        self.assertEqual(counts[("goodtv", "krv")], 2)
+        with open(os.path.join(self.tmp_dir, "bible_krv_ko.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["창1:2"], "땅이 혼돈하고 공허하며")
+
+    def test_reparse(self):
+        self._write_archives()
+        counts = reparse_archives(self.archive_dir, self.tmp_dir, max_workers=1)
+        self.assertEqual(counts[("bskorea", "GAE")], 31)
+        self.assertEqual(counts[("goodtv", "krv")], 2)
+
+        with open(os.path.join(self.tmp_dir, "bible_krv.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["창1:1"], "태초에 하나님이 천지를 창조하시니라")
+        with open(os.path.join(self.tmp_dir, "bible_krv_ko.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고 공허하며"})
+
+        # In-process parsing (used under the profiler) gives the same result
+        self.assertEqual(reparse_archives(self.archive_dir, self.tmp_dir, max_workers=0), counts)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from unittest import mock
+import parquet_export
+from parquet_export import export_columnar, read_corpus, read_arrow
+
+@unittest.skipIf(parquet_export.pa is None, "pyarrow not installed")
+class TestParquetExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outputs = {}
+        samples = {
+            "krv": {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고 공허하며", "눅1:1": "우리 중에 이루어진 사실에 대하여"},
+            "kjv_en": {"창1:1": "In the beginning God created the heaven and the earth.", "출1:1": "Now these are the names"},
+        }
+        for name, data in samples.items():
+            path = os.path.join(self.tmp_dir, f"bible_{name}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            self.outputs[name] = path
+        self.parquet_path = os.path.join(self.tmp_dir, "bible.parquet")
+        self.arrow_path = os.path.join(self.tmp_dir, "bible.arrow")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_export_and_filters(self):
+        self.assertEqual(export_columnar(self.outputs, self.parquet_path, self.arrow_path), 5)
+        # One row group per book: 창, 출, 누
+        self.assertEqual(parquet_export.pq.ParquetFile(self.parquet_path).metadata.num_row_groups, 3)
+
+        table = read_corpus(self.parquet_path, versions=["krv"], books=["창"], columns=["verse_id", "text"])
+        self.assertEqual(table.column("verse_id").to_pylist(), [1001001, 1001002])
+
+        luke = read_corpus(self.parquet_path, books=["누"]).to_pylist()[0]
+        self.assertEqual((luke["version"], luke["book"], luke["book_abbr"], luke["chapter"], luke["verse"]), ("krv", 42, "누", 1, 1))
+
+        arrow = read_arrow(self.arrow_path)
+        self.assertEqual(arrow.num_rows, 5)
+        self.assertEqual(arrow.schema, read_corpus(self.parquet_path).schema)
+
+    def test_failed_export_leaves_no_tmp(self):
+        with mock.patch("parquet_export.build_book_tables", side_effect=ValueError("bad corpus")):
+            with self.assertRaises(ValueError):
+                export_columnar(self.outputs, self.parquet_path, self.arrow_path)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), sorted(os.path.basename(p) for p in self.outputs.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from profiler import SamplingProfiler, classify
+
+
+def busy_parse(n):
+    total = 0
+    for i in range(n):
+        total += sum(j * j for j in range(200))
+    return total
+
+
+class TestProfiler(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(classify(("crawler:crawl_all", "crawler:_request_chapter", "requests.sessions:get")), "fetch")
+        self.assertEqual(classify(("crawler:_request_chapter", "crawler:_parse_verses", "re:sub")), "parse")
+        self.assertEqual(classify(("main:run", "shard_store:write_json_atomic", "json.encoder:iterencode")), "write")
+        self.assertEqual(classify(("goodtv_crawler:main", "threading:wait")), "idle")
+        # The crawl_logging listener waiting for records
+        self.assertEqual(classify(("threading:_bootstrap", "logging.handlers:_monitor", "logging.handlers:dequeue")), "idle")
+        self.assertEqual(classify(("crawler:_request_chapter", "logging.handlers:emit")), "fetch")
+        self.assertEqual(classify(("main:run",)), "other")
+
+    def test_samples_worker_threads(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            with SamplingProfiler(interval=0.001) as profiler:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    list(executor.map(busy_parse, [3000, 3000]))
+            threads = {thread for thread, _ in profiler.stacks}
+            self.assertTrue(any(thread.startswith("ThreadPoolExecutor-") for thread in threads))
+            self.assertTrue(any("test_profiler:busy_parse" in stack for _, stack in profiler.stacks))
+
+            _, total = profiler.hot_functions()
+            self.assertIn("test_profiler:busy_parse", total)
+            for line in profiler.collapsed():
+                stack, count = line.rsplit(" ", 1)
+                self.assertGreater(int(count), 0)
+                self.assertNotIn(" ", stack.split(";")[0])
+
+            collapsed_path, summary_path = profiler.save("unit", tmp_dir)
+            self.assertTrue(os.path.getsize(collapsed_path) > 0)
+            with open(summary_path, encoding='utf-8') as f:
+                self.assertIn("busy_parse", f.read())
+        finally:
+            shutil.rmtree(tmp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import time
+from retry_queue import RetryQueue, run_sequential, run_concurrent
+
+class FlakyFetcher:
+    """Fails each task a fixed number of times before succeeding."""
+    def __init__(self, failures):
+        self.failures = dict(failures)
+        self.calls = []
+
+    def __call__(self, task):
+        self.calls.append(task)
+        if self.failures.get(task, 0) > 0:
+            self.failures[task] -= 1
+            raise ConnectionError(f"transient error for {task}")
+        return f"data-{task}"
+
+class TestRetryQueue(unittest.TestCase):
+    def test_budget_and_dedupe(self):
+        queue = RetryQueue(max_retries=2, backoff=0.001, jitter=0)
+        self.assertTrue(queue.record_failure("a", "boom"))
+        # Already waiting: not queued twice, attempt not counted
+        self.assertTrue(queue.record_failure("a", "boom"))
+        self.assertEqual(len(queue), 1)
+        time.sleep(0.01)
+        self.assertEqual(queue.pop_due(), ["a"])
+        self.assertTrue(queue.record_failure("a", "boom"))
+        time.sleep(0.01)
+        queue.pop_due()
+        self.assertFalse(queue.record_failure("a", "boom"))
+        self.assertIn("a", queue.failed)
+        self.assertIsNone(queue.next_due_in())
+
+    def _run(self, runner, **kwargs):
+        fetch = FlakyFetcher({2: 1, 4: 5})
+        results, settled = {}, []
+        queue = runner(range(6), fetch, results.__setitem__, settled.append,
+                       retry_queue=RetryQueue(max_retries=2, backoff=0.001), **kwargs)
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 5])
+        self.assertEqual(sorted(settled), list(range(6)))
+        self.assertEqual(list(queue.failed), [4])
+        # Task 4: first attempt + 2 retries
+        self.assertEqual(fetch.calls.count(4), 3)
+
+    def test_run_sequential(self):
+        self._run(run_sequential)
+
+    def test_run_concurrent(self):
+        self._run(run_concurrent, max_workers=3)
+
+if __name__ == '__main__':
+    unittest.main()
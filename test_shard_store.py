@@ -0,0 +1,74 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from unittest import mock
+from shard_store import ShardWriter, write_shards, ShardReader, write_json_atomic, MANIFEST_NAME
+from verse_keys import parse_key, verse_id, split_verse_id
+
+SAMPLE = {
+    "창1:1": "태초에 하나님이 천지를 창조하시니라",
+    "창1:2": "땅이 혼돈하고 공허하며",
+    "창2:1": "천지와 만물이 다 이루어지니라",
+    "눅1:1": "우리 중에 이루어진 사실에 대하여",
+    "계22:21": "주 예수의 은혜가 모든 자들에게 있을지어다 아멘",
+}
+
+class TestVerseKeys(unittest.TestCase):
+    def test_parse_key(self):
+        self.assertEqual(parse_key("삼상3:10"), ("삼상", 3, 10))
+        # GoodTV writes Luke as 눅
+        self.assertEqual(parse_key("눅1:1"), ("누", 1, 1))
+        self.assertIsNone(parse_key("없1:1"))
+        self.assertIsNone(parse_key("창1-1"))
+
+    def test_verse_id_roundtrip(self):
+        vid = verse_id("시", 119, 176)
+        self.assertEqual(vid, 19119176)
+        self.assertEqual(split_verse_id(vid), ("시", 119, 176))
+
+class TestShardStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_gzip(self):
+        shard_dir = os.path.join(self.tmp_dir, "bible_test")
+        manifest = write_shards(SAMPLE, shard_dir, compression="gzip")
+
+        self.assertEqual(manifest["total_verses"], len(SAMPLE))
+        self.assertEqual(list(manifest["books"].keys()), ["창", "누", "계"])
+        self.assertEqual(manifest["books"]["창"]["chapters"], {"1": 2, "2": 1})
+
+        reader = ShardReader(shard_dir)
+        self.assertEqual(reader.load_book("누", verify=True), {"눅1:1": SAMPLE["눅1:1"]})
+        self.assertEqual(reader.load_book("출"), {})
+        self.assertEqual(reader.load_all(verify=True), SAMPLE)
+
+    def test_roundtrip_uncompressed(self):
+        shard_dir = os.path.join(self.tmp_dir, "bible_plain")
+        write_shards(SAMPLE, shard_dir, compression="none")
+        self.assertTrue(os.path.exists(os.path.join(shard_dir, "01_gen.json")))
+        self.assertEqual(ShardReader(shard_dir).load_all(), SAMPLE)
+
+    def test_write_json_atomic(self):
+        path = os.path.join(self.tmp_dir, "out", "bible.json")
+        write_json_atomic(path, SAMPLE)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), SAMPLE)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["bible.json"])
+
+    def test_failed_shard_leaves_no_tmp(self):
+        shard_dir = os.path.join(self.tmp_dir, "bible_fail")
+        writer = ShardWriter(shard_dir, compression="none", max_workers=1)
+        with mock.patch("shard_store.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                writer._write_book("창", {"창1:1": SAMPLE["창1:1"]})
+        writer.executor.shutdown()
+        self.assertEqual(os.listdir(shard_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
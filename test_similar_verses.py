@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from functools import partial
+from unittest import mock
+from similar_verses import build_similar, build_version_index, SimilarVerses
+
+KO = {
+    "창1:1": "태초에 하나님이 천지를 창조하시니라",
+    "창1:2": "땅이 혼돈하고 공허하며 흑암이 깊음 위에 있고",
+    "창1:3": "하나님이 이르시되 빛이 있으라 하시니 빛이 있었고",
+    "요1:1": "태초에 말씀이 계시니라 이 말씀이 하나님과 함께 계셨으니",
+    "요3:16": "하나님이 세상을 이처럼 사랑하사 독생자를 주셨으니",
+    "요일4:8": "사랑하지 아니하는 자는 하나님을 알지 못하나니 이는 하나님은 사랑이심이라",
+}
+EN = {
+    "창1:1": "In the beginning God created the heaven and the earth.",
+    "창1:3": "And God said, Let there be light: and there was light.",
+    "요1:1": "In the beginning was the Word, and the Word was with God.",
+    "요3:16": "For God so loved the world, that he gave his only begotten Son.",
+}
+
+
+class TestSimilarVerses(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        outputs = {}
+        sibling = dict(KO, **{"창1:1": "태초에 하나님이 천지를 지으셨다"})
+        for name, data in (("krv", KO), ("snkv", sibling), ("kjv_en", EN)):
+            outputs[name] = os.path.join(self.tmp_dir, f"bible_{name}.json")
+            with open(outputs[name], 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        self.index_dir = os.path.join(self.tmp_dir, "similar")
+        self.assertEqual(build_similar(outputs, self.index_dir), {"krv": 6, "snkv": 6, "kjv_en": 4})
+        self.similar = SimilarVerses(self.index_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_related_within_version(self):
+        results = self.similar.related("창1:1", "krv", k=3)
+        self.assertEqual(results[0][0], "요1:1")  # shares 태초에
+        self.assertNotIn("창1:1", [key for key, _ in results])
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(self.similar.related("창1:1", "kjv_en", k=1)[0][0], "요1:1")
+
+    def test_related_in_other_version(self):
+        results = self.similar.related("요3:16", "krv", k=3, target="snkv")
+        self.assertNotIn("요3:16", [key for key, _ in results])
+        self.assertEqual(results[0][0], "요일4:8")  # 사랑, 하나님
+
+    def test_free_text_query(self):
+        key, score = self.similar.query("하나님은 사랑이시라", "krv", k=1)[0]
+        self.assertEqual(key, "요일4:8")
+        self.assertGreater(score, 0)
+        self.assertEqual(self.similar.query("the Word was with God", "kjv_en", k=1)[0][0], "요1:1")
+
+    def test_k_beyond_precomputed_table(self):
+        # Keep only 2 precomputed neighbours; a larger k is scored on demand
+        with mock.patch("similar_verses.build_version_index", partial(build_version_index, top_k=2)):
+            build_similar({"krv": os.path.join(self.tmp_dir, "bible_krv.json")}, self.index_dir)
+        similar = SimilarVerses(self.index_dir)
+        precomputed = similar.related("요3:16", "krv", k=2)
+        on_demand = similar.related("요3:16", "krv", k=5)
+        self.assertGreater(len(on_demand), 2)
+        self.assertNotIn("요3:16", [key for key, _ in on_demand])
+        self.assertEqual([key for key, _ in on_demand[:2]], [key for key, _ in precomputed])
+
+    def test_query_against_index_without_features(self):
+        path = os.path.join(self.tmp_dir, "bible_empty.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"창1:1": "...", "창1:2": "!"}, f)
+        build_similar({"empty": path}, self.index_dir)
+        self.assertEqual(self.similar.query("하나님", "empty"), [])
+
+    def test_unknown_verse(self):
+        with self.assertRaises(KeyError):
+            self.similar.related("창50:1", "krv")
+
+if __name__ == '__main__':
+    unittest.main()
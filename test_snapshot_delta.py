@@ -0,0 +1,38 @@
+import unittest
+from snapshot_delta import make_delta, apply_delta, read_delta, content_hash
+
+BASE = {
+    "창1:1": "태초에 하나님이 천지를 창조하시니라",
+    "창1:2": "땅이 혼돈하고 공허하며",
+    "누1:1": "데오빌로 각하여",
+}
+
+class TestSnapshotDelta(unittest.TestCase):
+    def test_round_trip(self):
+        target = dict(BASE)
+        target["창1:2"] = "땅이 혼돈하고 공허하며 흑암이 깊음 위에 있고"
+        target["창1:3"] = "하나님이 이르시되 빛이 있으라"
+        del target["누1:1"]
+
+        delta = make_delta(BASE, target)
+        header, ops = read_delta(delta)
+        self.assertEqual((header["added"], header["changed"], header["removed"]), (1, 1, 1))
+        self.assertEqual([op for _, op, _ in ops], [b"C", b"A", b"R"])
+        self.assertEqual(apply_delta(BASE, delta), target)
+
+    def test_key_spelling_preserved(self):
+        # GoodTV writes Luke as "눅"; added keys must keep that spelling
+        base = {"눅1:1": "데오빌로 각하여"}
+        target = {"눅1:1": "데오빌로 각하여", "눅1:2": "처음부터 목격자와"}
+        self.assertEqual(list(apply_delta(base, make_delta(base, target))), ["눅1:1", "눅1:2"])
+
+    def test_wrong_base_rejected(self):
+        delta = make_delta(BASE, {"창1:1": "태초에"})
+        with self.assertRaises(ValueError):
+            apply_delta({"창1:1": "다른 본문"}, delta)
+
+    def test_hash_ignores_order(self):
+        self.assertEqual(content_hash(BASE), content_hash(dict(reversed(list(BASE.items())))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import json
+import sqlite3
+import tempfile
+import shutil
+from sqlite_export import export_sqlite
+
+class TestSqliteExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outputs = {}
+        samples = {
+            "krv": {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고 공허하며", "눅1:1": "우리 중에 이루어진 사실에 대하여"},
+            "kjv_en": {"창1:1": "In the beginning God created the heaven and the earth.", "창2:1": "Thus the heavens and the earth were finished"},
+        }
+        for name, data in samples.items():
+            path = os.path.join(self.tmp_dir, f"bible_{name}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            self.outputs[name] = path
+        self.db_path = os.path.join(self.tmp_dir, "bible.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_export(self):
+        counts = export_sqlite(self.db_path, self.outputs, batch_size=2)
+        self.assertEqual(counts, {"krv": 3, "kjv_en": 2})
+
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT verse_id, text FROM verses JOIN versions USING (version_id) "
+            "WHERE name = 'krv' AND verse_id BETWEEN 1001001 AND 1001999 ORDER BY verse_id"
+        ).fetchall()
+        self.assertEqual([r[0] for r in rows], [1001001, 1001002])
+
+        # Luke is stored under its canonical book number regardless of the 눅/누 key spelling
+        self.assertEqual(conn.execute("SELECT book FROM verses WHERE verse_id = 42001001").fetchone(), (42,))
+
+        hits = conn.execute("SELECT rowid FROM verses_fts WHERE verses_fts MATCH ?", ('"창조하시"',)).fetchall()
+        self.assertEqual(len(hits), 1)
+
+        # Book/chapter ranges are answered from the covering index alone
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT verse, text FROM verses WHERE book = 1 AND chapter BETWEEN 1 AND 2"
+        ))
+        self.assertIn("COVERING INDEX idx_verses_book_chapter", plan)
+        conn.close()
+
+    def test_failed_export_leaves_no_temp_files(self):
+        with open(self.outputs["krv"], 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        with self.assertRaises(ValueError):
+            export_sqlite(self.db_path, self.outputs)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["bible_kjv_en.json", "bible_krv.json"])
+
+if __name__ == '__main__':
+    unittest.main()
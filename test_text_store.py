@@ -0,0 +1,47 @@
+import unittest
+import gzip
+import os
+import tempfile
+import shutil
+from text_store import TextStore, normalize_text
+from verse_range import VersionIndex
+
+KRV = {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고 공허하며"}
+KSV = {"창1:1": "태초에 하나님이 천지를 창조하시니라", "창1:2": "땅이 혼돈하고  공허하며", "창1:3": "빛이 있으라"}
+
+class TestTextStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_dedupe_and_round_trip(self):
+        store = TextStore()
+        store.add_version("krv", KRV)
+        store.add_version("ksv", KSV)
+        # Identical after whitespace normalization
+        self.assertEqual(len(store.texts), 3)
+        self.assertEqual(store.versions["krv"]["text_ids"], store.versions["ksv"]["text_ids"][:2])
+
+        store.save(self.tmp_dir)
+        loaded = TextStore.load(self.tmp_dir)
+        self.assertEqual(loaded.version("krv"), KRV)
+        self.assertEqual(loaded.version("ksv"), {k: normalize_text(v) for k, v in KSV.items()})
+
+    def test_checksum_verified(self):
+        store = TextStore()
+        store.add_version("krv", KRV)
+        store.save(self.tmp_dir)
+        with open(os.path.join(self.tmp_dir, "krv.json.gz"), 'wb') as f:
+            f.write(gzip.compress(b'{"keys":[],"text_ids":[]}'))
+        with self.assertRaises(ValueError):
+            TextStore.load(self.tmp_dir)
+
+    def test_indexes_share_strings(self):
+        a, b = VersionIndex(KRV), VersionIndex(KSV)
+        self.assertIs(a.texts[0], b.texts[0])
+        self.assertIs(a.texts[1], b.texts[1])
+
+if __name__ == '__main__':
+    unittest.main()
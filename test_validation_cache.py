@@ -0,0 +1,63 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import validation_cache
+from validation_cache import ValidationCache
+
+
+class TestValidationCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp_dir, "reports", "validation_cache.json")
+        self.output = os.path.join(self.tmp_dir, "bible_krv.json")
+        self._write({"창1:1": "태초에", "창1:2": "땅이", "bad": ""})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, data):
+        with open(self.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def _validate(self):
+        cache = ValidationCache(self.cache_path)
+        with mock.patch.object(validation_cache, "validate_file", wraps=validation_cache.validate_file) as run:
+            result, cached = cache.validate(self.output)
+        cache.save()
+        self.assertEqual(run.called, not cached)
+        return result, cached
+
+    def test_unchanged_file_comes_from_cache(self):
+        result, cached = self._validate()
+        self.assertFalse(cached)
+        self.assertEqual(result["verses"], 3)
+        self.assertEqual(result["book_counts"]["창"], 2)
+        self.assertEqual(result["error_count"], 2)  # bad key, empty text
+
+        self.assertEqual(self._validate(), (result, True))
+
+        # Touched but identical: matched by content hash
+        os.utime(self.output, ns=(0, 0))
+        self.assertTrue(self._validate()[1])
+
+    def test_changed_file_or_validator_is_revalidated(self):
+        self._validate()
+        self._write({"창1:1": "태초에", "창1:2": "땅이", "창1:3": "빛이"})
+        result, cached = self._validate()
+        self.assertFalse(cached)
+        self.assertEqual(result["error_count"], 0)
+
+        with mock.patch.object(validation_cache, "VALIDATOR_VERSION", 999):
+            self.assertFalse(self._validate()[1])
+
+    def test_deleted_files_are_pruned(self):
+        cache = ValidationCache(self.cache_path)
+        cache.validate(self.output)
+        cache.save(keep=set())
+        self.assertEqual(ValidationCache(self.cache_path).entries, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+import numpy as np
+from verse_anomalies import minhash_signatures, lsh_candidates, estimated_jaccard, analyze_group
+
+_rng = random.Random(3)
+WORDS = ["".join(_rng.choices("가나다라마바사아자차카타파하거너더러머버서어저처", k=_rng.randint(2, 4)))
+         for _ in range(500)]
+BASE = {f"창1:{v}": " ".join(_rng.choices(WORDS, k=_rng.randint(18, 26))) for v in range(1, 41)}
+
+
+def sibling(seed):
+    rng = random.Random(seed)
+    out = {}
+    for key, text in BASE.items():
+        words = text.split()
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+        out[key] = " ".join(words)
+    return out
+
+
+class TestVerseAnomalies(unittest.TestCase):
+    def test_signatures_estimate_similarity(self):
+        texts = [BASE["창1:1"], BASE["창1:1"] + " 끝", BASE["창1:2"], "가"]
+        signatures = minhash_signatures(texts)
+        similarity = estimated_jaccard(signatures, np.array([0, 0]), np.array([1, 2]))
+        self.assertGreater(similarity[0], 0.6)
+        self.assertLess(similarity[1], 0.3)
+        self.assertTrue((signatures[3] == np.iinfo(np.uint32).max).all())
+
+        pairs = lsh_candidates(signatures)
+        self.assertIn([0, 1], pairs.tolist())
+
+    def test_analyze_group_flags_parse_bugs(self):
+        clean = [sibling(seed) for seed in range(3)]
+        broken = sibling(9)
+        broken["창1:5"] = broken["창1:5"][:6]
+        broken["창1:10"] = broken["창1:10"] + " " + broken["창1:11"]
+        broken["창1:20"] = broken["창1:20"] + " " + broken.pop("창1:21")
+        broken["창1:30"], broken["창1:35"] = broken["창1:35"], broken["창1:30"]
+
+        report = analyze_group(["a", "b", "c", "broken"], clean + [broken])
+        kinds = {(e["verse"], e["kind"]) for e in report["flags"]["broken"]}
+        self.assertIn(("창1:5", "truncated"), kinds)
+        self.assertIn(("창1:10", "contains_next"), kinds)
+        self.assertIn(("창1:20", "swallowed_next"), kinds)
+        self.assertIn(("창1:30", "shifted"), kinds)
+        self.assertIn(("창1:35", "shifted"), kinds)
+        for name in ("a", "b", "c"):
+            self.assertEqual(report["flags"][name], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from verse_range import parse_reference, find_references, resolve_book, VersionIndex, VerseRef, TOTAL_CHAPTERS
+
+SAMPLE = {
+    "창1:1": "태초에", "창1:2": "땅이", "창1:3": "빛이 있으라",
+    "창2:1": "천지와 만물이", "창2:2": "일곱째 날에", "창2:3": "복되게 하사", "창2:4": "내력이니",
+    "시119:1": "행위가 온전하여", "시119:2": "여호와의 증거들을",
+    "눅1:1": "우리 중에",
+}
+
+class TestVerseRange(unittest.TestCase):
+    def setUp(self):
+        self.index = VersionIndex(SAMPLE)
+
+    def test_total_chapters(self):
+        self.assertEqual(TOTAL_CHAPTERS, 1189)
+
+    def test_resolve_book(self):
+        for name in ("창", "창세기", "Genesis", "gen", "GEN"):
+            self.assertEqual(resolve_book(name), "창")
+        self.assertEqual(resolve_book("1 Samuel"), "삼상")
+        self.assertEqual(resolve_book("눅"), "누")
+        self.assertIsNone(resolve_book("없는책"))
+
+    def test_parse_reference(self):
+        vrange = parse_reference("창1:1-2:3")
+        self.assertEqual(vrange.start, VerseRef("창", 1, 1))
+        self.assertEqual(vrange.end, VerseRef("창", 2, 3))
+        self.assertEqual(parse_reference("1sa 3:10").start, VerseRef("삼상", 3, 10))
+        with self.assertRaises(ValueError):
+            parse_reference("창 51")
+        with self.assertRaises(ValueError):
+            parse_reference("창2:1-1:1")
+        vrange = parse_reference("창세기 1장 1-5절")
+        self.assertEqual((vrange.start, vrange.end), (VerseRef("창", 1, 1), VerseRef("창", 1, 5)))
+        self.assertEqual(parse_reference("1 Cor 13").start, VerseRef("고전", 13, 0))
+
+    def test_find_references(self):
+        text = "본문은 요 3:16과 1 Cor 13:4-7, 시편 23편입니다. 나 1명이 감사 1번"
+        found = find_references(text)
+        self.assertEqual([m.text for m in found], ["요 3:16", "1 Cor 13:4-7", "시편 23편"])
+        self.assertEqual(found[1].range.end, VerseRef("고전", 13, 7))
+
+    def test_query(self):
+        keys = [k for k, _ in self.index.query("창1:1-2:3")]
+        self.assertEqual(keys, ["창1:1", "창1:2", "창1:3", "창2:1", "창2:2", "창2:3"])
+        self.assertEqual([k for k, _ in self.index.query("창1:2-3")], ["창1:2", "창1:3"])
+        self.assertEqual(len(self.index.query("시 119")), 2)
+        self.assertEqual(len(self.index.query("Genesis")), 7)
+        self.assertEqual(self.index.query("Luke 1:1"), [("눅1:1", "우리 중에")])
+        self.assertEqual(self.index.query("출1"), [])
+
+    def test_get(self):
+        self.assertEqual(self.index.get("창", 2, 2), "일곱째 날에")
+        self.assertIsNone(self.index.get("창", 2, 9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from verse_server import ByteLRUCache, VerseServer
+
+SAMPLE = {
+    "창1:1": "태초에 하나님이 천지를 창조하시니라",
+    "창1:2": "땅이 혼돈하고 공허하며",
+    "창1:3": "하나님이 이르시되 빛이 있으라 하시니",
+    "창2:1": "천지와 만물이 다 이루어지니라",
+}
+
+class TestVerseServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "bible_krv.json")
+        self._write(SAMPLE)
+        self.server = VerseServer(outputs={"krv": self.path})
+        self.server.load_all()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def _get(self, target):
+        status, body = self.server.handle(target)
+        return status, json.loads(body)
+
+    def test_verse_and_range(self):
+        status, body = self._get("/verse?version=krv&ref=창1:2")
+        self.assertEqual((status, body), (200, {"창1:2": SAMPLE["창1:2"]}))
+        status, body = self._get("/verse?version=krv&ref=창1:2-2:1")
+        self.assertEqual(list(body), ["창1:2", "창1:3", "창2:1"])
+        # Second request is served from the cache
+        hits = self.server.cache.hits
+        self._get("/verse?version=krv&ref=창1:2-2:1")
+        self.assertEqual(self.server.cache.hits, hits + 1)
+
+    def test_search(self):
+        status, body = self._get("/search?version=krv&q=하나님이")
+        self.assertEqual((status, list(body)), (200, ["창1:1", "창1:3"]))
+        self.assertEqual(list(self._get("/search?version=krv&q=하나님이&limit=1")[1]), ["창1:1"])
+        # Searches are dispatched to a worker thread
+        status, body = asyncio.run(self.server.handle_async("/search?version=krv&q=천지"))
+        self.assertEqual(list(json.loads(body)), ["창1:1", "창2:1"])
+
+    def test_errors(self):
+        self.assertEqual(self._get("/nowhere?version=krv")[0], 404)
+        self.assertIn("Unknown path", self._get("/nowhere")[1]["error"])
+        self.assertEqual(self._get("/verse?version=nkrv&ref=창1:1")[0], 404)
+        self.assertEqual(self._get("/verse?version=krv&ref=없는책1:1")[0], 400)
+        self.assertEqual(self._get("/search?version=krv")[0], 400)
+        self.assertEqual(self._get("/search?version=krv&q=땅&limit=abc")[0], 400)
+        self.assertEqual(self._get("/search?version=krv&q=땅&limit=0")[0], 400)
+
+    def _raw_request(self, target: bytes):
+        async def request():
+            server = await asyncio.start_server(self.server._serve_client, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET " + target + b" HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                response = await reader.read()
+                writer.close()
+                await writer.wait_closed()
+            return response
+        head, _, body = asyncio.run(request()).partition(b"\r\n\r\n")
+        return int(head.split(b" ")[1]), json.loads(body)
+
+    def test_raw_utf8_target(self):
+        # As sent by `curl 'http://host/verse?version=krv&ref=창1:1'`
+        status, body = self._raw_request("/verse?version=krv&ref=창1:1".encode('utf-8'))
+        self.assertEqual((status, body), (200, {"창1:1": SAMPLE["창1:1"]}))
+        status, body = self._raw_request(b"/verse?version=krv&ref=\xff1:1")
+        self.assertEqual((status, body), (400, {"error": "Request target is not valid UTF-8"}))
+
+    def test_lru_eviction(self):
+        cache = ByteLRUCache(10)
+        cache.put(("a",), b"1234")
+        cache.put(("b",), b"1234")
+        cache.get(("a",))
+        cache.put(("c",), b"1234")
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get(("a",)), b"1234")
+        self.assertLessEqual(cache.current_bytes, 10)
+        # Larger than the whole cache: not stored
+        cache.put(("d",), b"x" * 11)
+        self.assertIsNone(cache.get(("d",)))
+
+    def test_hot_reload_and_drop(self):
+        self._get("/verse?version=krv&ref=창1:1")
+        self._write({**SAMPLE, "창1:1": "새 본문"})
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+        asyncio.run(self.server.reload_changed())
+        # New generation, so the cached response is not reused
+        self.assertEqual(self._get("/verse?version=krv&ref=창1:1")[1], {"창1:1": "새 본문"})
+
+        os.remove(self.path)
+        asyncio.run(self.server.reload_changed())
+        self.assertEqual(self._get("/versions"), (200, {}))
+        self.assertEqual(self._get("/verse?version=krv&ref=창1:1")[0], 404)
+
+if __name__ == '__main__':
+    unittest.main()
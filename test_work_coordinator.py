@@ -0,0 +1,112 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+import sqlite3
+import requests
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from work_coordinator import WorkStore, RemoteWorkStore, CoordinatorHandler
+
+class TestWorkStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = WorkStore(os.path.join(self.tmp_dir, "coordinator.db"), output_dir=self.tmp_dir)
+        self.total = self.store.enqueue("bskorea", "GAE")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self.total, 1189)
+        self.assertEqual(self.store.enqueue("bskorea", "GAE"), 0)
+
+    def test_expired_lease_is_redispatched(self):
+        units = self.store.claim("lost-worker", limit=2, lease_seconds=0.01)
+        self.assertEqual(units, [("bskorea", "GAE", "창", 1), ("bskorea", "GAE", "창", 2)])
+        time.sleep(0.05)
+
+        reclaimed = self.store.claim("worker-2", limit=2)
+        self.assertEqual(reclaimed, units)
+        # The lost worker's late report is rejected
+        self.assertFalse(self.store.complete("lost-worker", units[0], {"창1:1": "x"}))
+        self.assertTrue(self.store.complete("worker-2", units[0], {"창1:1": "x"}))
+
+    def test_enqueue_rejects_unknown_versions(self):
+        with self.assertRaises(ValueError):
+            self.store.enqueue("goodtv", "nope")
+        with self.assertRaises(ValueError):
+            self.store.enqueue("biblecom", "GAE")
+        with self.assertRaises(ValueError):
+            self.store.enqueue("elsewhere", "GAE")
+        self.assertEqual(self.store.enqueue("goodtv", "krv"), 1189)
+
+    def test_expired_leases_use_up_attempts(self):
+        # A unit that hangs its worker every time is failed, not handed out forever
+        for _ in range(4):
+            unit = self.store.claim("hung", limit=1, lease_seconds=0.01, max_retries=3)[0]
+            self.assertEqual(unit, ("bskorea", "GAE", "창", 1))
+            time.sleep(0.02)
+        self.assertEqual(self.store.claim("w", limit=1, max_retries=3), [("bskorea", "GAE", "창", 2)])
+        self.assertEqual(self.store.status()[("bskorea", "GAE")]["failed"], 1)
+
+    def test_fail_budget(self):
+        for _ in range(4):
+            unit = self.store.claim("w", limit=1)[0]
+            self.store.fail("w", unit, "timeout", max_retries=3)
+        self.assertEqual(self.store.status()[("bskorea", "GAE")]["failed"], 1)
+
+    def test_merge_in_canonical_order(self):
+        while True:
+            units = self.store.claim("w", limit=200)
+            if not units:
+                break
+            # Report in reverse order; merge must still be canonical
+            for unit in reversed(units):
+                _, _, book, chapter = unit
+                self.store.complete("w", unit, {f"{book}{chapter}:2": "b", f"{book}{chapter}:1": "a"})
+
+        merged = self.store.merge_finished()
+        self.assertEqual(len(merged), 1)
+        with open(merged[0][2], 'r', encoding='utf-8') as f:
+            keys = list(json.load(f).keys())
+        self.assertEqual(keys[:3], ["창1:1", "창1:2", "창2:1"])
+        self.assertEqual(keys[-1], "계22:2")
+        self.assertEqual(self.store.merge_finished(), [])
+
+class TestCoordinatorHTTP(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = WorkStore(os.path.join(self.tmp_dir, "coordinator.db"), output_dir=self.tmp_dir)
+        self.store.enqueue("bskorea", "GAE")
+        handler = type("Handler", (CoordinatorHandler,), {"store": self.store, "token": "secret"})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_token_required(self):
+        with self.assertRaises(requests.HTTPError):
+            RemoteWorkStore(self.url, token="").claim("w", limit=1)
+        with self.assertRaises(requests.HTTPError):
+            RemoteWorkStore(self.url, token="wrong").claim("w", limit=1)
+        remote = RemoteWorkStore(self.url, token="secret")
+        unit = remote.claim("w", limit=1)[0]
+        self.assertTrue(remote.complete("w", unit, {"창1:1": "x"}))
+
+    def test_store_errors_answer_5xx(self):
+        def broken(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        self.store.claim = broken
+        response = RemoteWorkStore(self.url, token="secret").session.post(f"{self.url}/claim", json={"worker": "w"})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("locked", response.json()["error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Content-addressed verse text store shared by all versions.
+
+Closely related versions (개역한글/개역개정, 공동번역/공동번역 개정판, KJV/NKJV)
+share many identical verses, but every output file and every loaded index kept
+its own copy of each string. Here every unique normalized verse text is stored
+once and each version only keeps (key, text id) pairs.
+
+On disk (output/text_store/):
+    texts.json.gz           # ["text 0", "text 1", ...]; a text id is its position
+    <version>.json.gz       # {"keys": [...], "text_ids": [...]} in verse id order
+    manifest.json           # per-file sha256 and counts; written last
+
+In memory, VersionIndex interns its texts (intern_text), so versions loaded into
+one process (VerseLibrary, the lookup server) reference the same string objects.
+
+    python text_store.py build      # write the store from all outputs and print the savings
+    python text_store.py report     # savings only, nothing written
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import unicodedata
+from typing import Dict, List, Optional
+
+from config import OUTPUT_DIR
+from corpus import discover_outputs, load_version
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id
+
+STORE_DIR = os.path.join(OUTPUT_DIR, "text_store")
+TEXTS_FILE = "texts.json.gz"
+MANIFEST_NAME = "manifest.json"
+
+
+def normalize_text(text: str) -> str:
+    """NFC with runs of whitespace collapsed; crawler outputs already satisfy this."""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def intern_text(text: str) -> str:
+    """
+    Normalized text as a shared string object. sys.intern keeps one copy per process
+    and frees it once no version references it, so reloads do not leak old texts.
+    """
+    return sys.intern(normalize_text(text))
+
+
+class TextStore:
+    """Unique texts (addressed by their normalized content) plus per-version references into them."""
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.text_ids: Dict[str, int] = {}
+        self.versions: Dict[str, Dict[str, List]] = {}
+
+    def add_text(self, text: str) -> int:
+        text = normalize_text(text)
+        text_id = self.text_ids.get(text)
+        if text_id is None:
+            text_id = self.text_ids[text] = len(self.texts)
+            self.texts.append(text)
+        return text_id
+
+    def add_version(self, name: str, data: Dict[str, str]):
+        keys = sorted(data, key=lambda k: key_to_verse_id(k) or 0)
+        self.versions[name] = {"keys": keys, "text_ids": [self.add_text(data[key]) for key in keys]}
+
+    def version(self, name: str) -> Dict[str, str]:
+        refs = self.versions[name]
+        return {key: self.texts[text_id] for key, text_id in zip(refs["keys"], refs["text_ids"])}
+
+    def save(self, store_dir: str = STORE_DIR):
+        """Writes every file, then the manifest (a store without one is incomplete)."""
+        os.makedirs(store_dir, exist_ok=True)
+        manifest = {"texts": len(self.texts), "files": {}}
+        files = {TEXTS_FILE: self.texts}
+        files.update({f"{name}.json.gz": refs for name, refs in self.versions.items()})
+        for filename, content in files.items():
+            payload = json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            path = os.path.join(store_dir, filename)
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(gzip.compress(payload, compresslevel=6))
+            os.replace(f"{path}.tmp", path)
+            manifest["files"][filename] = hashlib.sha256(payload).hexdigest()
+        manifest["versions"] = {name: len(refs["keys"]) for name, refs in self.versions.items()}
+        write_json_atomic(os.path.join(store_dir, MANIFEST_NAME), manifest)
+
+    @classmethod
+    def load(cls, store_dir: str = STORE_DIR, verify: bool = True) -> "TextStore":
+        with open(os.path.join(store_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        def read(filename: str):
+            with open(os.path.join(store_dir, filename), 'rb') as f:
+                payload = gzip.decompress(f.read())
+            if verify and hashlib.sha256(payload).hexdigest() != manifest["files"][filename]:
+                raise ValueError(f"Checksum mismatch in {filename}")
+            return json.loads(payload)
+
+        store = cls()
+        store.texts = read(TEXTS_FILE)
+        store.text_ids = {text: i for i, text in enumerate(store.texts)}
+        for name in manifest["versions"]:
+            store.versions[name] = read(f"{name}.json.gz")
+        return store
+
+
+def build_store(outputs: Optional[Dict[str, str]] = None) -> TextStore:
+    store = TextStore()
+    for name, path in (outputs if outputs is not None else discover_outputs()).items():
+        store.add_version(name, load_version(path))
+    return store
+
+
+def _dir_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def _gzip_size(path: str) -> int:
+    """Compressed size of an output, for a like-for-like comparison with the gzip store."""
+    if os.path.isdir(path):
+        return _dir_size(path)  # shards are already compressed
+    with open(path, 'rb') as f:
+        return len(gzip.compress(f.read(), compresslevel=6))
+
+
+def savings_report(outputs: Dict[str, str], store: TextStore, store_dir: Optional[str] = None) -> Dict:
+    """
+    Memory: text bytes held by separate per-version dicts vs. the shared store.
+    Disk: the output files (raw and gzipped) vs. the store (when store_dir is written).
+    """
+    separate_bytes = sum(sys.getsizeof(store.texts[i]) for refs in store.versions.values() for i in refs["text_ids"])
+    shared_bytes = sum(sys.getsizeof(text) for text in store.texts)
+    references = sum(len(refs["text_ids"]) for refs in store.versions.values())
+    report = {
+        "versions": len(store.versions),
+        "verse_texts": references,
+        "unique_texts": len(store.texts),
+        "memory_separate_bytes": separate_bytes,
+        "memory_shared_bytes": shared_bytes,
+        "disk_outputs_bytes": sum(_dir_size(path) for path in outputs.values()),
+    }
+    if store_dir and os.path.isdir(store_dir):
+        report["disk_outputs_gzip_bytes"] = sum(_gzip_size(path) for path in outputs.values())
+        report["disk_store_bytes"] = _dir_size(store_dir)
+    return report
+
+
+def print_report(report: Dict):
+    mb = 1024 * 1024
+    saved = 1 - report["memory_shared_bytes"] / max(report["memory_separate_bytes"], 1)
+    print(f"📚 {report['versions']} versions, {report['verse_texts']:,} verse texts, "
+          f"{report['unique_texts']:,} unique ({report['unique_texts'] / max(report['verse_texts'], 1):.1%})")
+    print(f"  memory (text objects): {report['memory_separate_bytes'] / mb:8.1f} MB -> "
+          f"{report['memory_shared_bytes'] / mb:8.1f} MB  ({saved:.1%} saved)")
+    if "disk_store_bytes" in report:
+        print(f"  disk: outputs {report['disk_outputs_bytes'] / mb:.1f} MB "
+              f"({report['disk_outputs_gzip_bytes'] / mb:.1f} MB gzipped) -> "
+              f"store {report['disk_store_bytes'] / mb:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed verse text store")
+    parser.add_argument("command", choices=["build", "report"])
+    parser.add_argument("--dir", default=STORE_DIR, help=f"Store directory (default: {STORE_DIR})")
+    args = parser.parse_args()
+
+    outputs = discover_outputs()
+    if not outputs:
+        print(f"No crawl outputs found in {OUTPUT_DIR}.")
+        return
+    store = build_store(outputs)
+    if args.command == "build":
+        store.save(args.dir)
+        print(f"💾 Store saved: {args.dir}")
+    print_report(savings_report(outputs, store, args.dir if args.command == "build" else None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Persistent cache of validate_all results, so unchanged outputs are not re-validated.
+
+An entry is reused when the file's size and mtime match (no read at all), or
+when they changed but the sha256 of the content did not (e.g. a re-crawl that
+produced the same bytes). Entries also record VALIDATOR_VERSION; bumping it in
+validator.py invalidates every entry. The cache lives in
+output/reports/validation_cache.json and is written through a temp file.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from config import VALIDATION_CACHE_FILE
+from shard_store import write_json_atomic
+from validator import BibleValidator, VALIDATOR_VERSION
+
+MAX_STORED_ERRORS = 50  # one per bad key can be huge; the full count is kept separately
+HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_file(path: str) -> Dict:
+    """Runs the BibleValidator checks on one output file and returns a JSON-able result."""
+    validator = BibleValidator(path)
+    loaded = validator.load_data()
+    if loaded:
+        validator.validate_structure()
+        validator.validate_completeness()
+    return {
+        "loaded": loaded,
+        "verses": len(validator.data),
+        "error_count": len(validator.errors),
+        "warning_count": len(validator.warnings),
+        "errors": validator.errors[:MAX_STORED_ERRORS],
+        "warnings": validator.warnings,  # at most one per book + the total check
+        "book_counts": validator.book_counts,
+    }
+
+
+class ValidationCache:
+    """{file name: {size, mtime_ns, sha256, validator_version, result}} for one output directory."""
+
+    def __init__(self, path: str = VALIDATION_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, ValueError):
+                self.entries = {}  # unreadable cache: everything is validated again
+
+    def lookup(self, path: str) -> Optional[Dict]:
+        """Cached result for `path` if its content is unchanged, else None."""
+        entry = self.entries.get(os.path.basename(path))
+        if entry is None or entry["validator_version"] != VALIDATOR_VERSION:
+            return None
+        stat = os.stat(path)
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["result"]
+        if entry["size"] == stat.st_size and entry["sha256"] == file_sha256(path):
+            entry["mtime_ns"] = stat.st_mtime_ns  # touched, not changed
+            return entry["result"]
+        return None
+
+    def store(self, path: str, result: Dict, stat: os.stat_result, sha256: str):
+        self.entries[os.path.basename(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "validator_version": VALIDATOR_VERSION,
+            "result": result,
+        }
+
+    def validate(self, path: str) -> Tuple[Dict, bool]:
+        """(result, came from cache) for one output file."""
+        result = self.lookup(path)
+        if result is not None:
+            self.hits += 1
+            return result, True
+        self.misses += 1
+        # Fingerprint before validating: a file rewritten meanwhile is not cached as valid
+        stat, sha256 = os.stat(path), file_sha256(path)
+        result = validate_file(path)
+        self.store(path, result, stat, sha256)
+        return result, False
+
+    def save(self, keep: Optional[set] = None):
+        """Writes the cache; entries for files not in `keep` (deleted outputs) are dropped."""
+        if keep is not None:
+            self.entries = {name: entry for name, entry in self.entries.items() if name in keep}
+        write_json_atomic(self.path, {"files": self.entries}, indent=None)
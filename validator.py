@@ -6,6 +6,9 @@ from typing import Dict, List, Tuple
 from config import OUTPUT_FILE, TOTAL_VERSES_EXPECTED
 from books_data import BOOKS, BOOK_ORDER
 
+# Bump when a check changes, so cached results (validation_cache.py) are recomputed
+VALIDATOR_VERSION = 1
+
 # Setup minimal logging for validation
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
@@ -15,6 +18,7 @@ class BibleValidator:
         self.data: Dict[str, str] = {}
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.book_counts: Dict[str, int] = {}
 
     def load_data(self) -> bool:
         if not os.path.exists(self.json_path):
@@ -57,6 +61,7 @@ class BibleValidator:
                     book_counts[abbr] += 1
                 else:
                     self.errors.append(f"Unknown book abbreviation in key: {key}")
+        self.book_counts = book_counts
 
         # Check against expected counts (if we had exact verse counts per book, we'd check that.
         # For now, just check if we have > 0 verses for expected books)
@@ -80,6 +85,14 @@ class BibleValidator:
         self.validate_completeness()
         self._print_results()
 
+    def run_on(self, data: Dict[str, str]):
+        """Validates crawl results already in memory (main.py --full), without re-reading the file."""
+        logging.info(f"Validating {len(data):,} crawled verses...")
+        self.data = data
+        self.validate_structure()
+        self.validate_completeness()
+        self._print_results()
+
     def _print_results(self):
         if self.errors:
             logging.error("❌ Validation Failed with Errors:")
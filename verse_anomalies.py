@@ -0,0 +1,313 @@
+"""
+Corpus-wide detector for verses that look cut short or merged with a neighbour.
+
+Parse bugs in _parse_verses show up as truncated verses (a stop pattern firing
+too early) or as one verse swallowing the next, and pass the `len > 3` check.
+Comparing every verse with every other is quadratic, so this uses:
+
+  * length ratios: each verse's length against the median of the same verse in
+    sibling versions of the same language, scaled by how wordy each version is
+    overall. Far too short -> "truncated", far too long -> "too_long".
+  * MinHash signatures over character 3-grams (computed once per unique text,
+    vectorized with numpy) and LSH banding. Only texts sharing a band bucket are
+    compared, so the work stays near-linear in the corpus size.
+      - "contains_next": the verse contains most of the next verse of the same version
+      - "swallowed_next": too long, and the next verse is missing in this version only
+      - "shifted": the text matches a different verse number in a sibling version
+        better than the same verse number
+
+    python verse_anomalies.py                # report to output/reports/anomalies.json
+    python verse_anomalies.py --lang ko
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import OUTPUT_DIR
+from corpus import discover_outputs, load_version, version_lang
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id, split_verse_id
+
+REPORT_FILE = os.path.join(OUTPUT_DIR, "reports", "anomalies.json")
+
+SHINGLE = 3
+NUM_PERM = 32
+BANDS = 8               # NUM_PERM / BANDS rows per band; candidate threshold ~ (1/8) ** (1/4) = 0.59
+MAX_BUCKET = 64         # larger buckets are formulaic verses ("여호와께서 모세에게 일러 가라사대")
+CHUNK_TEXTS = 20_000    # texts per vectorized MinHash batch (bounds temporary memory)
+
+TRUNCATED_RATIO = 0.5   # length / expected length
+TOO_LONG_RATIO = 1.8
+MIN_EXPECTED_CHARS = 15
+MIN_SIBLINGS = 2
+CONTAINMENT = 0.7
+SHIFT_SIMILARITY = 0.6
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 61, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 61, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def _shingle_hashes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(hash of every character 3-gram, number of 3-grams per text), all texts concatenated."""
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    grams = np.maximum(lengths - (SHINGLE - 1), 0)
+    if not len(codes):
+        return np.array([], dtype=np.uint64), grams
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # Position of each gram start: text start + 0..grams-1
+    gram_pos = np.repeat(starts, grams) + (np.arange(grams.sum()) - np.repeat(np.cumsum(grams) - grams, grams))
+    hashes = codes[gram_pos] * np.uint64(0x9E3779B97F4A7C15)
+    for offset in range(1, SHINGLE):
+        hashes = (hashes ^ codes[gram_pos + offset]) * np.uint64(0xBF58476D1CE4E5B9)
+    return hashes, grams
+
+
+def minhash_signatures(texts: List[str], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """(len(texts) x num_perm) uint32 signatures; texts shorter than a shingle get all-max rows."""
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for chunk_start in range(0, len(texts), CHUNK_TEXTS):
+        chunk = texts[chunk_start:chunk_start + CHUNK_TEXTS]
+        hashes, grams = _shingle_hashes(chunk)
+        has_grams = np.flatnonzero(grams)
+        if not len(has_grams):
+            continue
+        segment_starts = (np.cumsum(grams) - grams)[has_grams]
+        for p in range(num_perm):
+            permuted = ((a[p] * hashes + b[p]) >> np.uint64(32)).astype(np.uint32)
+            signatures[chunk_start + has_grams, p] = np.minimum.reduceat(permuted, segment_starts)
+    return signatures
+
+
+def lsh_candidates(signatures: np.ndarray, bands: int = BANDS, max_bucket: int = MAX_BUCKET) -> np.ndarray:
+    """Unique (i, j), i < j, of rows sharing at least one band bucket."""
+    rows = signatures.shape[1] // bands
+    pairs = []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1], [True])))
+        sizes = np.diff(boundaries)
+        # Buckets of equal size are expanded together: one (buckets x size) block per size
+        for size in np.unique(sizes[(sizes > 1) & (sizes <= max_bucket)]):
+            starts = boundaries[:-1][sizes == size]
+            members = order[starts[:, None] + np.arange(size)]
+            i, j = np.triu_indices(size, k=1)
+            pairs.append(np.stack([members[:, i].ravel(), members[:, j].ravel()], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def estimated_jaccard(signatures: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    return (signatures[left] == signatures[right]).mean(axis=1)
+
+
+def _containment(jaccard: np.ndarray, size_outer: np.ndarray, size_inner: np.ndarray) -> np.ndarray:
+    """|A ∩ B| / |B| from J(A, B) and the set sizes."""
+    intersection = jaccard * (size_outer + size_inner) / (1 + jaccard)
+    return intersection / np.maximum(size_inner, 1)
+
+
+def _label(vid: int) -> str:
+    abbr, chapter, verse = split_verse_id(int(vid))
+    return f"{abbr}{chapter}:{verse}"
+
+
+def analyze_group(names: List[str], datas: List[Dict[str, str]]) -> Dict:
+    """Flags for versions of one language."""
+    # Rows: one per (version, verse); texts deduplicated before hashing
+    row_version, row_vid, row_text = [], [], []
+    for v, data in enumerate(datas):
+        for key, text in data.items():
+            vid = key_to_verse_id(key)
+            if vid is not None:
+                row_version.append(v)
+                row_vid.append(vid)
+                row_text.append(text)
+    row_version = np.array(row_version, dtype=np.int64)
+    row_vid = np.array(row_vid, dtype=np.int64)
+    order = np.lexsort((row_vid, row_version))
+    row_version, row_vid = row_version[order], row_vid[order]
+    row_text = [row_text[i] for i in order]
+
+    unique_index: Dict[str, int] = {}
+    row_unique = np.fromiter((unique_index.setdefault(t, len(unique_index)) for t in row_text),
+                             dtype=np.int64, count=len(row_text))
+    unique_texts = list(unique_index)
+    signatures = minhash_signatures(unique_texts)
+    unique_grams = np.maximum(np.fromiter(map(len, unique_texts), dtype=np.int64,
+                                          count=len(unique_texts)) - (SHINGLE - 1), 0).astype(float)
+    lengths = np.fromiter(map(len, row_text), dtype=np.float64, count=len(row_text))
+
+    flags: Dict[str, List[Dict]] = {name: [] for name in names}
+
+    def flag(row: int, kind: str, detail: str):
+        flags[names[row_version[row]]].append({"verse": _label(row_vid[row]), "kind": kind, "detail": detail})
+
+    # --- Length ratios against siblings -------------------------------------------
+    union, column = np.unique(row_vid, return_inverse=True)
+    matrix = np.full((len(names), len(union)), np.nan)
+    matrix[row_version, column] = lengths
+    present = (~np.isnan(matrix)).sum(axis=0)
+    with np.errstate(all="ignore"):
+        median = np.nanmedian(matrix, axis=0)
+        # How long each version runs compared to the group, over all its verses
+        scale = np.nanmedian(matrix / median, axis=1)
+        expected = median[column] * scale[row_version]
+        ratio = lengths / expected
+    comparable = (present[column] > MIN_SIBLINGS) & (expected >= MIN_EXPECTED_CHARS)
+    truncated = comparable & (ratio < TRUNCATED_RATIO)
+    too_long = comparable & (ratio > TOO_LONG_RATIO)
+    for row in np.flatnonzero(truncated):
+        flag(row, "truncated", f"{int(lengths[row])} chars, expected ~{expected[row]:.0f}")
+
+    # Next verse missing only in this version: swallowed by the long one
+    next_row_exists = np.zeros(len(row_vid), dtype=bool)
+    same_next = (row_version[1:] == row_version[:-1]) & (row_vid[1:] == row_vid[:-1] + 1)
+    next_row_exists[:-1] = same_next
+    next_column = np.searchsorted(union, row_vid + 1)
+    next_column = np.minimum(next_column, len(union) - 1)
+    next_elsewhere = (union[next_column] == row_vid + 1) & (present[next_column] > 1)
+    for row in np.flatnonzero(too_long):
+        if not next_row_exists[row] and next_elsewhere[row]:
+            flag(row, "swallowed_next", f"{int(lengths[row])} chars, next verse missing in this version only")
+        else:
+            flag(row, "too_long", f"{int(lengths[row])} chars, expected ~{expected[row]:.0f}")
+
+    # --- Adjacent containment within a version ---------------------------------------
+    current = np.flatnonzero(same_next)
+    following = current + 1
+    j_adjacent = estimated_jaccard(signatures, row_unique[current], row_unique[following])
+    contained = _containment(j_adjacent, unique_grams[row_unique[current]], unique_grams[row_unique[following]])
+    valid = (unique_grams[row_unique[following]] >= 5) & (lengths[current] > lengths[following])
+    for row, value in zip(current[valid & (contained >= CONTAINMENT)], contained[valid & (contained >= CONTAINMENT)]):
+        flag(row, "contains_next", f"~{value:.0%} of the next verse's text repeated here")
+
+    # --- Shifted verses across siblings (LSH candidates only) ------------------------
+    candidates = lsh_candidates(signatures)
+    if len(candidates) and len(names) > 1:
+        similarity = estimated_jaccard(signatures, candidates[:, 0], candidates[:, 1])
+        # Formulaic texts ("여호와께서 모세에게 이르시되") sit at several verse ids; skip them
+        text_vids = np.unique(np.stack([row_unique, row_vid], axis=1), axis=0)
+        formulaic = np.bincount(text_vids[:, 0], minlength=len(unique_texts)) > 1
+        unique_vid = np.zeros(len(unique_texts), dtype=np.int64)
+        unique_vid[row_unique] = row_vid
+        keep = ((similarity >= SHIFT_SIMILARITY) & ~formulaic[candidates[:, 0]] & ~formulaic[candidates[:, 1]]
+                & (unique_vid[candidates[:, 0]] != unique_vid[candidates[:, 1]]))
+        _flag_shifted(candidates[keep], similarity[keep], row_version, row_vid, row_unique, signatures,
+                      lambda row, detail: flag(row, "shifted", detail), names)
+
+    for name in names:
+        flags[name].sort(key=lambda entry: key_to_verse_id(entry["verse"]) or 0)
+    return {
+        "versions": names,
+        "verses": len(row_text),
+        "unique_texts": len(unique_texts),
+        "lsh_candidates": int(len(candidates)),
+        "counts": {name: _kind_counts(entries) for name, entries in flags.items()},
+        "flags": flags,
+    }
+
+
+def _flag_shifted(pairs: np.ndarray, similarity: np.ndarray, row_version: np.ndarray, row_vid: np.ndarray,
+                  row_unique: np.ndarray, signatures: np.ndarray, flag, names: List[str]):
+    """
+    For each similar text pair at different verse ids, flags the rows whose text matches
+    the other verse number in a sibling better than it matches its own verse number in
+    any sibling. Only pairs that survived LSH and the filters get here, so plain loops are fine.
+    """
+    if not len(pairs):
+        return
+    rows_by_unique = np.argsort(row_unique, kind="stable")
+    bounds = np.searchsorted(row_unique[rows_by_unique], np.arange(len(signatures) + 1))
+    rows_by_vid: Dict[int, List[int]] = {}
+    for row, vid in enumerate(row_vid.tolist()):
+        rows_by_vid.setdefault(vid, []).append(row)
+
+    def best_same(row: int) -> float:
+        others = [other for other in rows_by_vid[int(row_vid[row])] if row_version[other] != row_version[row]]
+        if not others:
+            return 0.0
+        return float(estimated_jaccard(signatures, row_unique[[row] * len(others)], row_unique[others]).max())
+
+    reported = set()
+    for (u1, u2), sim in zip(pairs, similarity):
+        rows1 = rows_by_unique[bounds[u1]:bounds[u1 + 1]]
+        rows2 = rows_by_unique[bounds[u2]:bounds[u2 + 1]]
+        for mine, theirs in ((rows1, rows2), (rows2, rows1)):
+            for r1 in mine:
+                sibling = next((r2 for r2 in theirs if row_version[r2] != row_version[r1]), None)
+                if sibling is None or r1 in reported:
+                    continue
+                same_sim = best_same(r1)
+                if same_sim < sim - 0.2:
+                    reported.add(r1)
+                    flag(r1, f"matches {names[row_version[sibling]]} {_label(row_vid[sibling])} "
+                             f"(~{sim:.0%}) better than the same verse anywhere (~{same_sim:.0%})")
+
+
+def _kind_counts(entries: List[Dict]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        counts[entry["kind"]] = counts.get(entry["kind"], 0) + 1
+    return counts
+
+
+def build_report(outputs: Optional[Dict[str, str]] = None, lang: Optional[str] = None) -> Dict:
+    if outputs is None:
+        outputs = discover_outputs()
+    groups: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for name, path in outputs.items():
+        version_language = version_lang(name)
+        if lang and version_language != lang:
+            continue
+        groups.setdefault(version_language, {})[name] = load_version(path)
+    return {
+        language: analyze_group(list(datas.keys()), list(datas.values()))
+        for language, datas in groups.items()
+    }
+
+
+def print_summary(report: Dict, top: int = 5):
+    for language, group in report.items():
+        print(f"\n[{language}] {len(group['versions'])} versions, {group['verses']:,} verses "
+              f"({group['unique_texts']:,} unique texts, {group['lsh_candidates']:,} LSH candidate pairs)")
+        for name in group["versions"]:
+            counts = ", ".join(f"{kind}={count}" for kind, count in group["counts"][name].items()) or "none"
+            print(f"  - {name:<12} {counts}")
+            for entry in group["flags"][name][:top]:
+                print(f"      {entry['verse']:<10} {entry['kind']:<15} {entry['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag truncated or merged verses across the corpus")
+    parser.add_argument("--lang", help="Only analyze one language (ko, en)")
+    parser.add_argument("--out", default=REPORT_FILE, help=f"Report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = build_report(lang=args.lang)
+    if not report:
+        print(f"No crawl outputs found in {OUTPUT_DIR}.")
+        return
+    write_json_atomic(args.out, report)
+    print_summary(report)
+    print(f"\n💾 Report saved: {args.out} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Helpers for the "BookAbbrChapter:Verse" keys used in every output file (e.g. "창1:1").
+Also provides a compact integer verse id (BBCCCVVV) ordered like the canonical Bible.
+"""
+
+import re
+from typing import Optional, Tuple
+
+from books_data import BOOKS, BOOK_ORDER
+
+KEY_PATTERN = re.compile(r'^([가-힣A-Za-z]+)([0-9]+):([0-9]+)$')
+
+# Abbreviations that appear in output keys but differ from books_data
+# (the GoodTV API writes Luke as "눅", see goodtv_crawler.BOOK_ABBR_MAP)
+ABBR_ALIASES = {
+    "눅": "누",
+}
+
+# Position of each book in canonical order (0-based)
+BOOK_INDEX = {abbr: i for i, abbr in enumerate(BOOK_ORDER)}
+
+
+def canonical_abbr(abbr: str) -> Optional[str]:
+    """Maps an abbreviation found in a key to the books_data abbreviation."""
+    abbr = ABBR_ALIASES.get(abbr, abbr)
+    return abbr if abbr in BOOKS else None
+
+
+def parse_key(key: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Splits "창1:1" into ("창", 1, 1).
+    Returns None for malformed keys or unknown books.
+    """
+    match = KEY_PATTERN.match(key)
+    if not match:
+        return None
+    abbr = canonical_abbr(match.group(1))
+    if abbr is None:
+        return None
+    return abbr, int(match.group(2)), int(match.group(3))
+
+
+def make_key(book_abbr: str, chapter: int, verse: int) -> str:
+    return f"{book_abbr}{chapter}:{verse}"
+
+
+def verse_id(book_abbr: str, chapter: int, verse: int) -> int:
+    """Integer id: book number (1-66) * 1_000_000 + chapter * 1000 + verse."""
+    return (BOOK_INDEX[book_abbr] + 1) * 1_000_000 + chapter * 1000 + verse
+
+
+def split_verse_id(vid: int) -> Tuple[str, int, int]:
+    book_no, rest = divmod(vid, 1_000_000)
+    chapter, verse = divmod(rest, 1000)
+    return BOOK_ORDER[book_no - 1], chapter, verse
+
+
+def key_to_verse_id(key: str) -> Optional[int]:
+    parsed = parse_key(key)
+    if parsed is None:
+        return None
+    return verse_id(*parsed)
@@ -0,0 +1,226 @@
+"""
+Verse reference parsing and range queries over crawled versions.
+
+    index = VersionIndex.from_path("output/bible_krv.json")
+    index.query("창1:1-2:3")        # [("창1:1", "..."), ..., ("창2:3", "...")]
+    index.query("시 119")           # whole chapter
+    index.query("Genesis 1:1-5")    # english_name / url_abbr work too
+    index.query("창세기 1장 1-5절")   # book names resolve through book_resolver's trie
+    find_references("오늘 본문은 요 3:16과 1 Cor 13:4-7입니다")
+
+Each version is held as verse-id-sorted parallel lists plus a cumulative chapter
+offset table, so a range resolves to one list slice: O(log chapter) to find the
+bounds and O(range length) to copy the verses out.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from book_resolver import match_prefixes, resolve_book
+from books_data import BOOKS, BOOK_ORDER
+from corpus import discover_outputs, load_version
+from text_store import intern_text
+from verse_keys import parse_key, verse_id
+
+# Global chapter ordinal: CHAPTER_BASE[book] + chapter - 1 (창1 -> 0, 계22 -> 1188)
+CHAPTER_BASE: Dict[str, int] = {}
+_total = 0
+for _abbr in BOOK_ORDER:
+    CHAPTER_BASE[_abbr] = _total
+    _total += BOOKS[_abbr]['chapters']
+TOTAL_CHAPTERS = _total
+
+# Chapter/verse part after a book name: "1:1", "1:1-5", "1:1-2:3", "1-3",
+# and the Korean forms "1장 1절", "23편", "1장 1-5절"
+TAIL_PATTERN = re.compile(
+    r'\.?\s*(?P<c1>\d+)(?:\s*[:장편]\s*(?P<v1>\d+)(?:\s*절)?|\s*(?P<mark>[장편]))?'
+    r'(?:\s*[-~]\s*(?:(?P<c2>\d+)\s*[:장편]\s*)?(?P<v2>\d+)(?:\s*[장편절])?)?'
+)
+
+MAX_VERSE = 999
+
+
+class VerseRef(NamedTuple):
+    book: str
+    chapter: int
+    verse: int
+
+
+class VerseRange(NamedTuple):
+    start: VerseRef
+    end: VerseRef
+
+
+def _check_chapter(book_abbr: str, chapter: int):
+    if not 1 <= chapter <= BOOKS[book_abbr]['chapters']:
+        raise ValueError(f"{BOOKS[book_abbr]['name']} has no chapter {chapter}")
+
+
+def _range_from_match(book_abbr: str, match: "re.Match") -> VerseRange:
+    c1 = int(match.group('c1'))
+    v1 = match.group('v1')
+    c2 = match.group('c2')
+    v2 = match.group('v2')
+
+    if v1 is None:
+        # "시 119" or chapter range "창1-3"
+        end_chapter = int(v2) if v2 is not None else c1
+        start = VerseRef(book_abbr, c1, 0)
+        end = VerseRef(book_abbr, end_chapter, MAX_VERSE)
+    else:
+        start = VerseRef(book_abbr, c1, int(v1))
+        if v2 is None:
+            end = start
+        else:
+            end = VerseRef(book_abbr, int(c2) if c2 is not None else c1, int(v2))
+
+    _check_chapter(book_abbr, start.chapter)
+    _check_chapter(book_abbr, end.chapter)
+    if (end.chapter, end.verse) < (start.chapter, start.verse):
+        raise ValueError(f"Range end precedes start: {match.string!r}")
+    return VerseRange(start, end)
+
+
+def parse_reference(text: str) -> VerseRange:
+    """
+    Parses "창1:1", "창1:1-5", "창1:1-2:3", "시 119", "창1-3", "창세기 1장 1절",
+    "1 Cor 13:4-7" or a bare book name.
+    Raises ValueError for unknown books or malformed references.
+    """
+    text = text.strip()
+    book_abbr = resolve_book(text)
+    if book_abbr:
+        last = BOOKS[book_abbr]['chapters']
+        return VerseRange(VerseRef(book_abbr, 1, 0), VerseRef(book_abbr, last, MAX_VERSE))
+
+    prefixes = match_prefixes(text)
+    if not prefixes:
+        raise ValueError(f"Unknown book: {text!r}")
+    # Longest book name first: "요일 3" is 요한일서, not 요한복음
+    for end, book_abbr in reversed(prefixes):
+        match = TAIL_PATTERN.fullmatch(text, end)
+        if match:
+            return _range_from_match(book_abbr, match)
+    raise ValueError(f"Malformed reference: {text!r}")
+
+
+class ReferenceMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+    range: VerseRange
+
+
+def find_references(text: str) -> List[ReferenceMatch]:
+    """
+    Every reference in free text, in one left-to-right pass. Book names are only
+    tried at word starts, each with one trie walk, so the cost is linear in the text.
+    """
+    found: List[ReferenceMatch] = []
+    pos = 0
+    while pos < len(text):
+        if pos and text[pos - 1].isalnum():
+            pos += 1
+            continue
+        hit = None
+        for end, book_abbr in reversed(match_prefixes(text, pos)):
+            match = TAIL_PATTERN.match(text, end)
+            if not match:
+                continue
+            # A bare number glued to a word ("나 1명") is not a chapter reference
+            bare = match.group('v1') is None and match.group('mark') is None and match.group('v2') is None
+            if bare and match.end() < len(text) and text[match.end()].isalnum():
+                continue
+            try:
+                hit = ReferenceMatch(pos, match.end(), text[pos:match.end()], _range_from_match(book_abbr, match))
+            except ValueError:
+                continue
+            break
+        if hit:
+            found.append(hit)
+            pos = hit.end
+        else:
+            pos += 1
+    return found
+
+
+class VersionIndex:
+    """One loaded version as sorted (verse_id, key, text) columns with a chapter offset table."""
+
+    def __init__(self, data: Dict[str, str]):
+        rows = []
+        for key, text in data.items():
+            parsed = parse_key(key)
+            # Chapters outside books_data would land in the next book's offsets
+            if parsed is not None and 1 <= parsed[1] <= BOOKS[parsed[0]]['chapters']:
+                rows.append((verse_id(*parsed), key, text))
+        rows.sort()
+        self.ids: List[int] = [row[0] for row in rows]
+        self.keys: List[str] = [row[1] for row in rows]
+        # Interned, so identical verses of related versions share one string object
+        self.texts: List[str] = [intern_text(row[2]) for row in rows]
+
+        # chapter_offsets[n] = position of the first verse of chapter ordinal n;
+        # chapter_offsets[n + 1] is its end (missing chapters are empty slices)
+        self.chapter_offsets: List[int] = [0] * (TOTAL_CHAPTERS + 1)
+        counts = [0] * TOTAL_CHAPTERS
+        for vid in self.ids:
+            book_no, rest = divmod(vid, 1_000_000)
+            counts[CHAPTER_BASE[BOOK_ORDER[book_no - 1]] + rest // 1000 - 1] += 1
+        for n, count in enumerate(counts):
+            self.chapter_offsets[n + 1] = self.chapter_offsets[n] + count
+
+    @classmethod
+    def from_path(cls, path: str) -> "VersionIndex":
+        return cls(load_version(path))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _position(self, ref: VerseRef, side: str) -> int:
+        ordinal = CHAPTER_BASE[ref.book] + ref.chapter - 1
+        lo = self.chapter_offsets[ordinal]
+        hi = self.chapter_offsets[ordinal + 1]
+        target = verse_id(ref.book, ref.chapter, ref.verse)
+        if side == "left":
+            return bisect_left(self.ids, target, lo, hi)
+        return bisect_right(self.ids, target, lo, hi)
+
+    def slice_bounds(self, vrange: VerseRange) -> Tuple[int, int]:
+        return self._position(vrange.start, "left"), self._position(vrange.end, "right")
+
+    def get_range(self, vrange: VerseRange) -> List[Tuple[str, str]]:
+        start, end = self.slice_bounds(vrange)
+        return list(zip(self.keys[start:end], self.texts[start:end]))
+
+    def get(self, book_abbr: str, chapter: int, verse: int) -> Optional[str]:
+        ref = VerseRef(book_abbr, chapter, verse)
+        pos = self._position(ref, "left")
+        if pos < len(self.ids) and self.ids[pos] == verse_id(*ref):
+            return self.texts[pos]
+        return None
+
+    def query(self, reference: str) -> List[Tuple[str, str]]:
+        return self.get_range(parse_reference(reference))
+
+
+class VerseLibrary:
+    """Several versions by name, each indexed once on first use."""
+
+    def __init__(self, outputs: Optional[Dict[str, str]] = None):
+        self.outputs = outputs if outputs is not None else discover_outputs()
+        self.indexes: Dict[str, VersionIndex] = {}
+
+    def versions(self) -> List[str]:
+        return list(self.outputs.keys())
+
+    def index(self, version: str) -> VersionIndex:
+        if version not in self.indexes:
+            if version not in self.outputs:
+                raise KeyError(f"Unknown version: {version}")
+            self.indexes[version] = VersionIndex.from_path(self.outputs[version])
+        return self.indexes[version]
+
+    def query(self, version: str, reference: str) -> List[Tuple[str, str]]:
+        return self.index(version).query(reference)
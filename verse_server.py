@@ -0,0 +1,272 @@
+"""
+Long-running verse lookup server (python main.py --serve).
+
+Endpoints (all GET, JSON responses):
+    /versions                               loaded versions and verse counts
+    /verse?version=krv&ref=창1:1-2:3        single verse or range
+    /search?version=krv&q=태초에&limit=20   substring search (run off the event loop)
+
+Every version in OUTPUT_DIR is indexed once at startup. Encoded range and search
+responses are kept in a byte-size bounded LRU. A background task polls the output files
+and, when a crawl rewrites one, rebuilds that version off the event loop and
+swaps it in atomically (old readers keep the old index until they finish);
+versions whose output disappears are dropped.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from config import SERVER_HOST, SERVER_PORT, SERVER_CACHE_BYTES, SERVER_RELOAD_INTERVAL
+from corpus import discover_outputs
+from shard_store import MANIFEST_NAME
+from verse_range import VersionIndex
+
+SEARCH_LIMIT_DEFAULT = 20
+
+
+class ByteLRUCache:
+    """
+    LRU of encoded responses, evicting least recently used entries once max_bytes is exceeded.
+    Locked, since searches use it from worker threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.current_bytes = 0
+        self.entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self.entries[key] = value
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+
+def _error(status: int, message: str) -> Tuple[int, bytes]:
+    return status, json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+
+
+def _output_mtime(path: str) -> int:
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_NAME)
+    return os.stat(path).st_mtime_ns
+
+
+class VerseServer:
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                 cache_bytes: int = SERVER_CACHE_BYTES, reload_interval: float = SERVER_RELOAD_INTERVAL,
+                 outputs: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.cache = ByteLRUCache(cache_bytes)
+        self.fixed_outputs = outputs
+        # version -> (index, generation); replaced as a whole on reload
+        self.indexes: Dict[str, Tuple[VersionIndex, int]] = {}
+        self.paths: Dict[str, str] = {}
+        self.mtimes: Dict[str, int] = {}  # st_mtime_ns
+        self.generation = 0
+
+    def _outputs(self) -> Dict[str, str]:
+        return self.fixed_outputs if self.fixed_outputs is not None else discover_outputs()
+
+    def load_all(self):
+        for name, path in self._outputs().items():
+            self._load(name, path)
+
+    def _load(self, name: str, path: str):
+        start = time.perf_counter()
+        mtime = _output_mtime(path)
+        index = VersionIndex.from_path(path)
+        self.generation += 1
+        # Single assignment: requests see either the old or the new index, never a mix
+        self.indexes[name] = (index, self.generation)
+        self.paths[name] = path
+        self.mtimes[name] = mtime
+        logging.info(f"Loaded {name} ({len(index)} verses) in {time.perf_counter() - start:.2f}s")
+
+    def _drop(self, name: str):
+        self.indexes.pop(name, None)
+        self.paths.pop(name, None)
+        self.mtimes.pop(name, None)
+
+    async def reload_changed(self):
+        """One poll: reloads rewritten outputs and drops versions whose output is gone."""
+        loop = asyncio.get_running_loop()
+        outputs = await loop.run_in_executor(None, self._outputs)
+        for name, path in outputs.items():
+            try:
+                mtime = _output_mtime(path)
+            except OSError:
+                continue
+            if self.paths.get(name) != path or self.mtimes.get(name) != mtime:
+                await loop.run_in_executor(None, self._load, name, path)
+                print(f"🔄 Reloaded {name}")
+        for name in list(self.indexes):
+            if name not in outputs or not os.path.exists(outputs[name]):
+                self._drop(name)
+                print(f"🗑️ Dropped {name}")
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload_changed()
+            except Exception as e:
+                logging.error(f"Reload check failed: {e}")
+
+    def handle(self, target: str) -> Tuple[int, bytes]:
+        """Routes one request target to (status, JSON body)."""
+        url = urlsplit(target)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/versions":
+            body = {name: len(index) for name, (index, _) in self.indexes.items()}
+            return 200, json.dumps(body, ensure_ascii=False).encode('utf-8')
+        if url.path not in ("/verse", "/search"):
+            return _error(404, f"Unknown path: {url.path}")
+
+        version = params.get("version")
+        entry = self.indexes.get(version)
+        if entry is None:
+            return _error(404, f"Unknown version: {version}")
+        index, generation = entry
+
+        if url.path == "/verse":
+            reference = params.get("ref", "")
+            cache_key = (version, generation, reference)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return 200, cached
+            try:
+                verses = index.query(reference)
+            except ValueError as e:
+                return _error(400, str(e))
+            body = json.dumps(dict(verses), ensure_ascii=False).encode('utf-8')
+            self.cache.put(cache_key, body)
+            return 200, body
+
+        query = params.get("q", "")
+        if not query:
+            return _error(400, "Missing q")
+        try:
+            limit = int(params.get("limit", SEARCH_LIMIT_DEFAULT))
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return _error(400, f"limit must be a positive integer: {params.get('limit')}")
+        cache_key = (version, generation, "search", query, limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return 200, cached
+        hits = {}
+        for key, text in zip(index.keys, index.texts):
+            if query in text:
+                hits[key] = text
+                if len(hits) >= limit:
+                    break
+        body = json.dumps(hits, ensure_ascii=False).encode('utf-8')
+        self.cache.put(cache_key, body)
+        return 200, body
+
+    async def handle_async(self, target: str) -> Tuple[int, bytes]:
+        """Searches scan every verse of a version, so they run on a worker thread."""
+        if urlsplit(target).path == "/search":
+            return await asyncio.get_running_loop().run_in_executor(None, self.handle, target)
+        return self.handle(target)
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, _, header_block = head.partition(b"\r\n")
+                parts = request_line.split(b" ")
+                if len(parts) != 3:
+                    break
+                method, raw_target, http_version = parts[0].decode('latin-1'), parts[1], parts[2].decode('latin-1')
+                headers = {}
+                for line in header_block.decode('latin-1').split("\r\n"):
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                # curl and most scripts send references like 창1:1 unencoded, as UTF-8
+                try:
+                    target = raw_target.decode('utf-8')
+                except UnicodeDecodeError:
+                    target = None
+
+                if method != "GET":
+                    status, body = 405, b'{"error": "Only GET is supported"}'
+                elif target is None:
+                    status, body = _error(400, "Request target is not valid UTF-8")
+                else:
+                    try:
+                        status, body = await self.handle_async(target)
+                    except Exception as e:
+                        logging.error(f"Error handling {target}: {e}")
+                        status, body = 500, b'{"error": "Internal error"}'
+
+                keep_alive = headers.get("connection", "").lower() != "close" and http_version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.load_all()
+        server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        print(f"📡 Serving {len(self.indexes)} versions on http://{self.host}:{self.port}")
+        watcher = asyncio.create_task(self._watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    asyncio.run(VerseServer(host, port).serve())
+
+
+if __name__ == "__main__":
+    run_server()
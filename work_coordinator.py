@@ -0,0 +1,488 @@
+"""
+Distributed crawl with a lease-based work coordinator.
+
+Work units are (source, version, book, chapter) rows in a SQLite store. Workers
+claim a few units at a time under a time-limited lease, keep the lease alive with
+heartbeats while fetching, and report each chapter's verses back. A lease that is
+not renewed (crashed worker, lost host) simply expires and the unit becomes
+claimable again. When every unit of a version is settled, the coordinator merges
+the results into the usual canonical output file.
+
+Workers on the same machine can open the store directly (--db); workers on other
+hosts talk to `coordinator serve` over HTTP (--coordinator http://host:8765).
+The server listens on 127.0.0.1 unless --host says otherwise; when it is reachable
+from other hosts, set the same BIBLE_COORDINATOR_TOKEN on the coordinator and every
+worker so only they can claim units and post results.
+
+    python work_coordinator.py enqueue --source bskorea --version GAE HAN
+    BIBLE_COORDINATOR_TOKEN=... python work_coordinator.py serve --host 0.0.0.0 --port 8765
+    BIBLE_COORDINATOR_TOKEN=... python work_coordinator.py worker --coordinator http://coordinator:8765
+    python work_coordinator.py status
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+
+import requests
+
+from books_data import BOOKS, BOOK_ORDER
+from config import (
+    OUTPUT_DIR, VERSION_FILES, BIBLE_COM_VERSION_IDS, MAX_RETRIES, REQUEST_DELAY, REQUEST_TIMEOUT,
+    LOG_FILE, COORDINATOR_DB, COORDINATOR_HOST, COORDINATOR_PORT, COORDINATOR_TOKEN, LEASE_SECONDS, CLAIM_BATCH
+)
+from corpus import output_file_for
+from crawl_logging import setup_logging
+from shard_store import write_json_atomic
+from verse_keys import key_to_verse_id, verse_id
+
+SOURCES = ("bskorea", "biblecom", "goodtv")
+TOKEN_HEADER = "X-Coordinator-Token"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_units (
+    source TEXT NOT NULL,
+    version TEXT NOT NULL,
+    book TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending, leased, done, failed
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (source, version, book, chapter)
+);
+CREATE INDEX IF NOT EXISTS idx_work_units_claim ON work_units(status, lease_expires, seq);
+CREATE TABLE IF NOT EXISTS merged_versions (
+    source TEXT NOT NULL,
+    version TEXT NOT NULL,
+    output_file TEXT NOT NULL,
+    verses INTEGER NOT NULL,
+    merged_at REAL NOT NULL,
+    PRIMARY KEY (source, version)
+);
+"""
+
+Unit = Tuple[str, str, str, int]  # (source, version, book, chapter)
+
+
+def known_versions(source: str) -> Set[str]:
+    """Versions each crawler can fetch, so a typo fails at enqueue instead of at merge time."""
+    if source == "biblecom":
+        return set(BIBLE_COM_VERSION_IDS)
+    if source == "bskorea":
+        return set(VERSION_FILES) - set(BIBLE_COM_VERSION_IDS)
+    if source == "goodtv":
+        from goodtv_crawler import VERSIONS
+        return set(VERSIONS)
+    raise ValueError(f"Unknown source: {source}")
+
+
+class WorkStore:
+    """SQLite-backed unit table. Safe to share between processes on one host (WAL + busy timeout)."""
+
+    def __init__(self, db_path: str = COORDINATOR_DB, output_dir: str = OUTPUT_DIR):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.local = threading.local()
+        # Concurrent /complete handlers must not write the same output file twice
+        self.merge_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; the HTTP server handles requests on worker threads
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self.local.conn = conn
+        return conn
+
+    def enqueue(self, source: str, version: str) -> int:
+        """Adds every chapter of the version; unknown versions are rejected before any work is queued."""
+        if version not in known_versions(source):
+            raise ValueError(f"Unknown {source} version: {version}")
+        rows = []
+        for book_abbr in BOOK_ORDER:
+            for chapter in range(1, BOOKS[book_abbr]['chapters'] + 1):
+                rows.append((source, version, book_abbr, chapter, verse_id(book_abbr, chapter, 0)))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO work_units (source, version, book, chapter, seq) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        added = conn.total_changes - before
+        if added:
+            # New units: the version has to be merged again when they finish
+            conn.execute("DELETE FROM merged_versions WHERE source = ? AND version = ?", (source, version))
+        conn.execute("COMMIT")
+        return added
+
+    def claim(self, worker_id: str, limit: int = CLAIM_BATCH, lease_seconds: float = LEASE_SECONDS,
+              max_retries: int = MAX_RETRIES) -> List[Unit]:
+        """
+        Leases up to `limit` pending units. Expired leases count as a failed attempt first,
+        so a unit that keeps killing or hanging its worker ends up failed like any other.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE work_units SET attempts = attempts + 1, error = 'lease expired', "
+                "lease_owner = NULL, lease_expires = NULL, "
+                "status = CASE WHEN attempts + 1 > ? THEN 'failed' ELSE 'pending' END "
+                "WHERE status = 'leased' AND lease_expires < ?", (max_retries, now)
+            )
+            rows = conn.execute(
+                "SELECT source, version, book, chapter FROM work_units "
+                "WHERE status = 'pending' ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE work_units SET status = 'leased', lease_owner = ?, lease_expires = ? "
+                "WHERE source = ? AND version = ? AND book = ? AND chapter = ?",
+                [(worker_id, now + lease_seconds) + tuple(row) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [tuple(row) for row in rows]
+
+    def heartbeat(self, worker_id: str, units: List[Unit], lease_seconds: float = LEASE_SECONDS) -> int:
+        """Extends the leases this worker still owns. Returns how many were extended."""
+        conn = self._conn()
+        cursor = conn.executemany(
+            "UPDATE work_units SET lease_expires = ? WHERE lease_owner = ? AND status = 'leased' "
+            "AND source = ? AND version = ? AND book = ? AND chapter = ?",
+            [(time.time() + lease_seconds, worker_id) + tuple(unit) for unit in units]
+        )
+        return cursor.rowcount
+
+    def complete(self, worker_id: str, unit: Unit, verses: Dict[str, str]) -> bool:
+        """Stores a chapter's verses. Ignored (returns False) if the lease was lost to another worker."""
+        cursor = self._conn().execute(
+            "UPDATE work_units SET status = 'done', result = ?, error = NULL, lease_owner = NULL "
+            "WHERE lease_owner = ? AND status = 'leased' AND source = ? AND version = ? AND book = ? AND chapter = ?",
+            (json.dumps(verses, ensure_ascii=False), worker_id) + tuple(unit)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, worker_id: str, unit: Unit, error: str, max_retries: int = MAX_RETRIES) -> bool:
+        """Returns the unit to the pool, or marks it failed once its attempts are used up."""
+        cursor = self._conn().execute(
+            "UPDATE work_units SET attempts = attempts + 1, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "status = CASE WHEN attempts + 1 > ? THEN 'failed' ELSE 'pending' END "
+            "WHERE lease_owner = ? AND status = 'leased' AND source = ? AND version = ? AND book = ? AND chapter = ?",
+            (error, max_retries, worker_id) + tuple(unit)
+        )
+        return cursor.rowcount == 1
+
+    def status(self) -> Dict[Tuple[str, str], Dict[str, int]]:
+        summary: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for source, version, status, count in self._conn().execute(
+            "SELECT source, version, status, COUNT(*) FROM work_units GROUP BY source, version, status"
+        ):
+            summary.setdefault((source, version), {})[status] = count
+        return summary
+
+    def merge_finished(self) -> List[Tuple[str, str, str, int]]:
+        """
+        Writes the output file of every version whose units are all done/failed and that
+        has not been merged yet. Returns (source, version, output_file, verses) per merge.
+        """
+        with self.merge_lock:
+            return self._merge_finished()
+
+    def _merge_finished(self) -> List[Tuple[str, str, str, int]]:
+        conn = self._conn()
+        finished = conn.execute(
+            "SELECT source, version FROM work_units GROUP BY source, version "
+            "HAVING SUM(status IN ('pending', 'leased')) = 0 "
+            "EXCEPT SELECT source, version FROM merged_versions"
+        ).fetchall()
+
+        merged = []
+        for source, version in finished:
+            verses: Dict[str, str] = {}
+            for (result,) in conn.execute(
+                "SELECT result FROM work_units WHERE source = ? AND version = ? AND status = 'done' ORDER BY seq",
+                (source, version)
+            ):
+                chapter_verses = json.loads(result)
+                for key in sorted(chapter_verses, key=lambda k: key_to_verse_id(k) or 0):
+                    verses[key] = chapter_verses[key]
+
+            output_file = output_file_for(source, version, self.output_dir)
+            write_json_atomic(output_file, verses)
+            conn.execute("INSERT OR REPLACE INTO merged_versions VALUES (?, ?, ?, ?, ?)",
+                         (source, version, output_file, len(verses), time.time()))
+            merged.append((source, version, output_file, len(verses)))
+            logging.info(f"Merged {source}/{version}: {len(verses)} verses -> {output_file}")
+        return merged
+
+
+class RemoteWorkStore:
+    """Same claim/heartbeat/complete/fail interface as WorkStore, over the coordinator's HTTP API."""
+
+    def __init__(self, base_url: str, token: str = COORDINATOR_TOKEN):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        if token:
+            self.session.headers[TOKEN_HEADER] = token
+
+    def _post(self, path: str, payload: Dict):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def claim(self, worker_id: str, limit: int = CLAIM_BATCH, lease_seconds: float = LEASE_SECONDS) -> List[Unit]:
+        units = self._post("/claim", {"worker": worker_id, "limit": limit, "lease_seconds": lease_seconds})
+        return [tuple(unit) for unit in units]
+
+    def heartbeat(self, worker_id: str, units: List[Unit], lease_seconds: float = LEASE_SECONDS) -> int:
+        return self._post("/heartbeat", {"worker": worker_id, "units": units, "lease_seconds": lease_seconds})
+
+    def complete(self, worker_id: str, unit: Unit, verses: Dict[str, str]) -> bool:
+        return self._post("/complete", {"worker": worker_id, "unit": unit, "verses": verses})
+
+    def fail(self, worker_id: str, unit: Unit, error: str) -> bool:
+        return self._post("/fail", {"worker": worker_id, "unit": unit, "error": error})
+
+
+class ChapterFetcher:
+    """Builds one crawler per (source, version) and fetches a single chapter as {key: text}."""
+
+    def __init__(self):
+        self.crawlers = {}
+
+    def fetch(self, source: str, version: str, book_abbr: str, chapter: int) -> Dict[str, str]:
+        crawler = self.crawlers.get((source, version))
+        if crawler is None:
+            if source == "bskorea":
+                from crawler import BibleCrawler
+                crawler = BibleCrawler(version)
+            elif source == "biblecom":
+                from bible_com_crawler import BibleComCrawler
+                crawler = BibleComCrawler(version)
+            else:
+                from goodtv_crawler import GoodTVBibleCrawler, VERSIONS
+                crawler = GoodTVBibleCrawler(version, VERSIONS[version]["id"], VERSIONS[version]["lang"])
+            self.crawlers[(source, version)] = crawler
+
+        if source == "goodtv":
+            result = crawler.fetch_chapter(BOOK_ORDER.index(book_abbr) + 1, chapter)
+            return {key: text for _, key, text in crawler.chapter_items(chapter, book_abbr, result)}
+        return crawler._request_chapter(book_abbr, chapter)
+
+
+def run_worker(store, worker_id: Optional[str] = None, idle_exit: bool = True, poll_interval: float = 5.0):
+    """Claims, fetches and reports units until the pool is empty (or forever with idle_exit=False)."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    fetcher = ChapterFetcher()
+    held: List[Unit] = []
+    held_lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat_loop():
+        while not stop.wait(LEASE_SECONDS / 3):
+            with held_lock:
+                units = list(held)
+            if units:
+                try:
+                    store.heartbeat(worker_id, units)
+                except Exception as e:
+                    logging.error(f"[{worker_id}] Heartbeat failed: {e}")
+
+    heartbeat_thread = threading.Thread(target=heartbeat_loop, daemon=True)
+    heartbeat_thread.start()
+    done = 0
+    print(f"👷 Worker {worker_id} started")
+    try:
+        while True:
+            units = store.claim(worker_id)
+            if not units:
+                if idle_exit:
+                    break
+                time.sleep(poll_interval)
+                continue
+            with held_lock:
+                held.extend(units)
+
+            for unit in units:
+                try:
+                    verses = fetcher.fetch(*unit)
+                    if not verses:
+                        raise ValueError("No verses parsed")
+                    store.complete(worker_id, unit, verses)
+                    done += 1
+                except Exception as e:
+                    logging.error(f"[{worker_id}] {unit} failed: {e}")
+                    store.fail(worker_id, unit, str(e))
+                finally:
+                    with held_lock:
+                        held.remove(unit)
+                time.sleep(REQUEST_DELAY)
+    finally:
+        stop.set()
+    print(f"👷 Worker {worker_id} finished ({done} chapters)")
+    return done
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    store: WorkStore = None
+    token: str = ""
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def _reply(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        if hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.token):
+            return True
+        self._reply(401, {"error": "Missing or wrong coordinator token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/status":
+            status = {f"{source}/{version}": counts for (source, version), counts in self.store.status().items()}
+            self._reply(200, status)
+        else:
+            self._reply(404, {"error": "Unknown path"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            worker = payload.get("worker", "")
+            if self.path == "/claim":
+                result = self.store.claim(worker, payload.get("limit", CLAIM_BATCH),
+                                          payload.get("lease_seconds", LEASE_SECONDS))
+                if not result:
+                    # The last units may have just failed by lease expiry
+                    self.store.merge_finished()
+            elif self.path == "/heartbeat":
+                result = self.store.heartbeat(worker, [tuple(u) for u in payload["units"]],
+                                              payload.get("lease_seconds", LEASE_SECONDS))
+            elif self.path == "/complete":
+                result = self.store.complete(worker, tuple(payload["unit"]), payload["verses"])
+                if result:
+                    self.store.merge_finished()
+            elif self.path == "/fail":
+                result = self.store.fail(worker, tuple(payload["unit"]), payload.get("error", ""))
+                if result:
+                    self.store.merge_finished()
+            else:
+                self._reply(404, {"error": "Unknown path"})
+                return
+        except (KeyError, ValueError, AttributeError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        except sqlite3.Error as e:
+            # e.g. "database is locked" past the busy timeout; the worker retries or fails the unit
+            logging.error(f"Work store error on {self.path}: {e}")
+            self._reply(503, {"error": f"Work store error: {e}"})
+            return
+        self._reply(200, result)
+
+
+def serve(store: WorkStore, host: str = COORDINATOR_HOST, port: int = COORDINATOR_PORT,
+          token: str = COORDINATOR_TOKEN):
+    handler = type("Handler", (CoordinatorHandler,), {"store": store, "token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"📡 Coordinator on http://{host}:{port} (store: {store.db_path})")
+    if not token and host not in ("127.0.0.1", "localhost", "::1"):
+        print("⚠️ No BIBLE_COORDINATOR_TOKEN set: any host that can reach this port can post results")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def print_status(store: WorkStore):
+    status = store.status()
+    if not status:
+        print("No work units. Use `enqueue` first.")
+        return
+    print(f"{'Source/Version':<20} | {'pending':>7} | {'leased':>6} | {'done':>5} | {'failed':>6}")
+    for (source, version), counts in sorted(status.items()):
+        print(f"{source + '/' + version:<20} | {counts.get('pending', 0):>7} | {counts.get('leased', 0):>6} | "
+              f"{counts.get('done', 0):>5} | {counts.get('failed', 0):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease-based distributed crawl coordinator")
+    parser.add_argument("--db", default=COORDINATOR_DB, help=f"Work store path (default: {COORDINATOR_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = sub.add_parser("enqueue", help="Add every chapter of the given versions")
+    enqueue_parser.add_argument("--source", choices=SOURCES, required=True)
+    enqueue_parser.add_argument("--version", nargs="+", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Serve the work store to remote workers")
+    serve_parser.add_argument("--host", default=COORDINATOR_HOST)
+    serve_parser.add_argument("--port", type=int, default=COORDINATOR_PORT)
+
+    worker_parser = sub.add_parser("worker", help="Claim and crawl units")
+    worker_parser.add_argument("--coordinator", help="Coordinator URL; omit to use the local --db directly")
+    worker_parser.add_argument("--forever", action="store_true", help="Keep polling when the pool is empty")
+
+    sub.add_parser("status", help="Show unit counts per version")
+    sub.add_parser("merge", help="Write output files for finished versions")
+    args = parser.parse_args()
+    setup_logging(LOG_FILE)
+
+    if args.command == "worker" and args.coordinator:
+        run_worker(RemoteWorkStore(args.coordinator), idle_exit=not args.forever)
+        return
+
+    store = WorkStore(args.db)
+    if args.command == "enqueue":
+        for version in args.version:
+            try:
+                print(f"➕ {args.source}/{version}: {store.enqueue(args.source, version)} units added")
+            except ValueError as e:
+                print(f"❌ {e} (known: {', '.join(sorted(known_versions(args.source)))})")
+    elif args.command == "serve":
+        serve(store, args.host, args.port)
+    elif args.command == "worker":
+        run_worker(store, idle_exit=not args.forever)
+        for source, version, output_file, verses in store.merge_finished():
+            print(f"💾 {source}/{version}: {verses:,} verses -> {output_file}")
+    elif args.command == "status":
+        print_status(store)
+    elif args.command == "merge":
+        for source, version, output_file, verses in store.merge_finished():
+            print(f"💾 {source}/{version}: {verses:,} verses -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()